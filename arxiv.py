@@ -1,4 +1,5 @@
-import requests
+import http_client
+import pdf_download
 from bs4 import BeautifulSoup
 import os
 from urllib.parse import urljoin
@@ -46,7 +47,7 @@ def download_topic_pdfs(topic_code, total_entries_past_week):
   folder_location = f'/Users/apple/Downloads/papers/script/downloads/{topic_code}'
   if not os.path.exists(folder_location):os.mkdir(folder_location)
 
-  response = requests.get(url)
+  response = http_client.get(url)
   #print(response.text)
 
   soup = BeautifulSoup(response.text, 'html.parser')
@@ -58,8 +59,10 @@ def download_topic_pdfs(topic_code, total_entries_past_week):
     print(a.get('href'))
     pdf_link = a.get('href')
     filename = os.path.join(folder_location,pdf_link.split('/')[-1] + '.pdf')
-    with open(filename, 'wb') as f:
-      f.write(requests.get(urljoin(url,pdf_link)).content)
+    try:
+      pdf_download.download_pdf(urljoin(url,pdf_link), filename)
+    except Exception as error:
+      print(f"{topic_code} {pdf_link}: {error}")
 
 
 def scan_topics():
@@ -70,7 +73,7 @@ def scan_topics():
 
     recent_url = f'https://export.arxiv.org/list/{topic_code}/recent'
 
-    response = requests.get(recent_url)
+    response = http_client.get(recent_url)
 
     num_result = re.search('total of (.+?) entries', response.text)
     total_entries_past_week = 0
@@ -0,0 +1,121 @@
+"""asyncio engine for fetching arXiv listing pages.
+
+All listing fetches share one event loop and one keep-alive connection pool
+(`http_client.async_session`), capped at `concurrency` in-flight requests.
+HTML parsing is handed to a small process pool so a 1000-entry page never
+blocks the loop while other fetches wait.
+
+The engine is format-agnostic: callers pass the same `listing_url` and
+`parse_page` functions their Pool path uses, plus an `on_topic` callback that
+writes the collected entries with the script's usual CSV/log writer.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import http_client
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PARSE_WORKERS = 2
+
+
+async def _fetch_and_parse(session, executor, url, parse_page, topic_code):
+    html = await http_client.fetch_text(session, url)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, parse_page, html, topic_code)
+
+
+async def _crawl_topic(session, executor, topic_code, listing_url, parse_page, page_size,
+                       stop_paging=None):
+    """Fetch every listing page of one topic and return its entries in page order.
+
+    Pages are requested at multiples of the page size, like the Pool engine,
+    so an entry the parser drops does not shift the following pages.
+    """
+    page_size = page_size(topic_code) if callable(page_size) else page_size
+    total, entries = await _fetch_and_parse(
+        session, executor, listing_url(topic_code, 0), parse_page, topic_code)
+    print(f'{topic_code} : {total}')
+    failed_pages = 0
+
+    if stop_paging:
+        # Each page decides whether the next one is needed, so fetch them in turn
+        page_entries = entries
+        skip = page_size
+        while page_entries and skip < total and not stop_paging(topic_code, page_entries):
+            try:
+                _, page_entries = await _fetch_and_parse(
+                    session, executor, listing_url(topic_code, skip), parse_page, topic_code)
+                entries.extend(page_entries)
+            except Exception as e:
+                print(f"Error fetching {topic_code} from {skip}: {e}")
+                failed_pages += 1
+            skip += page_size
+        if failed_pages:
+            print(f'{topic_code} : partial, {failed_pages} pages failed, {len(entries)} entries kept')
+        return entries
+
+    # Remaining pages are independent of each other, so fetch them together.
+    # A page that fails for good is reported and the others are kept.
+    skips = range(page_size, total, page_size)
+    pages = await asyncio.gather(*(
+        _fetch_and_parse(session, executor, listing_url(topic_code, skip), parse_page, topic_code)
+        for skip in skips
+    ), return_exceptions=True)
+    for skip, page in zip(skips, pages):
+        if isinstance(page, Exception):
+            print(f"Error fetching {topic_code} from {skip}: {page}")
+            failed_pages += 1
+            continue
+        entries.extend(page[1])
+    if failed_pages:
+        print(f'{topic_code} : partial, {failed_pages} pages failed, {len(entries)} entries kept')
+
+    return entries
+
+
+async def crawl_topics(topic_codes, listing_url, parse_page, on_topic,
+                       page_size=1000, concurrency=DEFAULT_CONCURRENCY,
+                       parse_workers=DEFAULT_PARSE_WORKERS, stop_paging=None):
+    """Crawl all topics concurrently and return the entry count per topic.
+
+    Args:
+        topic_codes: arXiv topic codes to crawl.
+        listing_url: `listing_url(topic_code, skip)` -> URL of one listing page.
+        parse_page: `parse_page(html, topic_code)` -> `(total, entries)`. Must be
+            a module-level function so it can run in the parse process pool.
+        on_topic: `on_topic(topic_code, entries)`, called once a topic is
+            complete; used to hand entries to the output writer and the paper
+            store. Runs on one worker thread, so its blocking SQLite calls
+            neither stall the loop nor contend with each other.
+            May return the number of entries it kept, which is then reported
+            instead of `len(entries)`.
+        page_size: Entries per listing page, used to compute follow-up pages;
+            either a number or a `page_size(topic_code)` function.
+        concurrency: Maximum number of simultaneous HTTP requests.
+        parse_workers: Number of processes used for HTML parsing.
+        stop_paging: Optional `stop_paging(topic_code, page_entries)` -> bool.
+            When given, a topic's pages are fetched one after another until it
+            returns True (used by delta crawls that stop at known papers).
+    """
+    with ProcessPoolExecutor(max_workers=parse_workers) as executor, \
+            ThreadPoolExecutor(max_workers=1) as topic_executor:
+        async with http_client.async_session(concurrency) as session:
+            loop = asyncio.get_running_loop()
+
+            async def run(topic_code):
+                try:
+                    entries = await _crawl_topic(
+                        session, executor, topic_code, listing_url, parse_page, page_size, stop_paging)
+                except Exception as e:
+                    print(f"Error processing {topic_code}: {e}")
+                    return 0
+                kept = await loop.run_in_executor(topic_executor, on_topic, topic_code, entries)
+                return len(entries) if kept is None else kept
+
+            return await asyncio.gather(*(run(topic_code) for topic_code in topic_codes))
+
+
+def run_crawl(topic_codes, listing_url, parse_page, on_topic, **kwargs):
+    """Synchronous wrapper around `crawl_topics` for use from `__main__` blocks."""
+    return asyncio.run(crawl_topics(topic_codes, listing_url, parse_page, on_topic, **kwargs))
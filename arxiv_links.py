@@ -1,12 +1,11 @@
 import threading
 from multiprocessing import Pool, cpu_count
-import requests
+import http_client
 from bs4 import BeautifulSoup
 import os
 from urllib.parse import urljoin
 from datetime import datetime
 import re
-import time
 
 start_time = datetime.now()
 
@@ -95,9 +94,7 @@ def download_topic_pdfs(topic_entry):
   total_entries_past_week = topic_entry[1]
   url = f'https://export.arxiv.org/list/{topic_code}/pastweek?show={total_entries_past_week}'
 
-  time.sleep(0.1)
-  useragent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.75 Safari/537.36"
-  response = requests.get(url, headers={"User-Agent": useragent})
+  response = http_client.get(url)
   soup = BeautifulSoup(response.text, 'html.parser')
 
   pdf_links = soup.findAll('a', attrs={"title": "Download PDF"})
@@ -122,11 +119,9 @@ def scan_topics():
 
   topic_entries_list = []
   for topic_code in topic_codes: 
-    time.sleep(0.1)
     recent_url = f'https://export.arxiv.org/list/{topic_code}/recent'
 
-    useragent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.75 Safari/537.36"
-    response = requests.get(recent_url, headers={"User-Agent": useragent})
+    response = http_client.get(recent_url)
 
     num_result = re.search('Total of (.+?) entries', response.text) or re.search('total of (.+?) entries', response.text)
     total_entries_past_week = 0
@@ -143,7 +138,6 @@ def scan_topics():
 
 if __name__ == '__main__':
   topic_entries = scan_topics()
-  time.sleep(0.1)
   pool = Pool(processes=cpu_count())
   try:
     pool.map(download_topic_pdfs, topic_entries)
@@ -1,11 +1,17 @@
 import os
-from multiprocessing import Pool, cpu_count, Manager
-import requests
+import argparse
+from multiprocessing import Pool, cpu_count
+import http_client
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from datetime import datetime
 import re
-import time
+
+import arxiv_async
+import paper_index
+import paper_store
+import result_writer
+import retry
 
 start_time = datetime.now()
 
@@ -25,105 +31,123 @@ topic_codes = [
 
 execution_timestamp = datetime.today().strftime("%d_%m_%Y_%H_%M")
 
-def download_topic_pdfs(args):
-    topic_code, total_entries_past_week, shared_counter, shared_lock, log_file_path = args
-    
-    if int(total_entries_past_week) == 0:
-        return 0
-    
-    page_size = 1000
-    url = f'https://export.arxiv.org/list/{topic_code}/pastweek?show={page_size}'
-    
-    useragent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.75 Safari/537.36"
-    
+PAGE_SIZE = 1000
+LISTING_BASE_URL = os.environ.get('ARXIV_LISTING_BASE_URL', 'https://export.arxiv.org')
+
+def listing_url(topic_code, skip=0):
+    return f'{LISTING_BASE_URL}/list/{topic_code}/pastweek?skip={skip}&show={PAGE_SIZE}'
+
+def parse_listing_page(html, topic_code):
+    """Parse one listing page into its "Total of N entries" count and log lines."""
+    num_result = re.search(r'Total of (\d+) entries', html, re.IGNORECASE)
+    total_entries_past_week = int(num_result.group(1)) if num_result else 0
+
+    soup = BeautifulSoup(html, 'html.parser')
+    entries = []
+
+    for a in soup.findAll('a', attrs={"title": "Download PDF"}):
+        pdf_link = a.get('href')
+        if pdf_link:
+            paper_id = pdf_link.split('/')[2]
+            entries.append(f"{topic_code} {paper_id}\n")
+
+    return total_entries_past_week, entries
+
+def log_lines(entries):
+    # Listing pages are newest first; the log keeps the oldest paper first
+    return entries[::-1]
+
+def store_entries(topic_code, entries):
+    """Upsert one topic's log lines into the paper store as a single transaction."""
+    rows = [(line.split()[1], None, topic_code, None) for line in entries]
+    paper_store.record(rows, execution_timestamp)
+
+def download_topic_pdfs(topic_code):
     try:
-        time.sleep(0.1)
-        response = requests.get(url, headers={"User-Agent": useragent}, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        pdf_links = soup.findAll('a', attrs={"title": "Download PDF"})
-        pdf_links.reverse()
-        
-        local_count = 0
         entries = []
-        
-        for a in pdf_links:
-            pdf_link = a.get('href')
-            if pdf_link:
-                paper_id = pdf_link.split('/')[2]
-                entries.append(f"{topic_code} {paper_id}\n")
-                local_count += 1
-        
-        with shared_lock:
-            shared_counter.value += local_count
-            with open(log_file_path, 'a') as f:
-                f.writelines(entries)
-                
-        return local_count
-        
+        skip = 0
+        total_entries_past_week = None
+
+        # The first listing page also carries the "Total of N entries" count,
+        # so further pages are only requested when the total exceeds a page.
+        while total_entries_past_week is None or skip < total_entries_past_week:
+            response = http_client.get(listing_url(topic_code, skip))
+            response.raise_for_status()
+
+            total, page_entries = parse_listing_page(response.text, topic_code)
+            if total_entries_past_week is None:
+                total_entries_past_week = total
+                print(f'{topic_code} : {total_entries_past_week}')
+
+            if not page_entries:
+                break
+
+            entries.extend(page_entries)
+            skip += PAGE_SIZE
+
+        result_writer.submit(topic_code, log_lines(entries))
+        store_entries(topic_code, entries)
+
+        return len(entries)
+
     except Exception as e:
         print(f"Error processing {topic_code}: {e}")
         return 0
 
-def scan_topics():
-    topic_entries_list = []
-    sum_of_papers = 0
-    
-    for topic_code in topic_codes:
-        time.sleep(0.1)
-        recent_url = f'https://export.arxiv.org/list/{topic_code}/recent'
-        
-        useragent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.75 Safari/537.36"
-        
-        try:
-            response = requests.get(recent_url, headers={"User-Agent": useragent}, timeout=30)
-            response.raise_for_status()
-            
-            num_result = re.search(r'Total of (\d+) entries', response.text, re.IGNORECASE)
-            total_entries_past_week = 0
-            
-            if num_result:
-                total_entries_past_week = int(num_result.group(1))
-                sum_of_papers += total_entries_past_week
-            
-            print(f'{topic_code} : {total_entries_past_week}')
-            topic_entries_list.append((topic_code, str(total_entries_past_week)))
-            
-        except Exception as e:
-            print(f"Error scanning {topic_code}: {e}")
-            topic_entries_list.append((topic_code, "0"))
-    
-    print(f'sum of papers {sum_of_papers}')
-    return topic_entries_list
+def run_pool(log_file_path, flush_interval=result_writer.FLUSH_INTERVAL):
+    """Crawl all topics with a multiprocessing Pool, one topic per task.
+
+    Workers send their log lines to a single writer process.
+    """
+    with result_writer.ResultWriter(log_file_path, 'lines', flush_interval) as writer:
+        with Pool(processes=min(cpu_count(), 8), initializer=result_writer.init_worker,
+                  initargs=(writer.queue,)) as pool:
+            return pool.map(download_topic_pdfs, topic_codes)
+
+def run_async(log_file_path, concurrency=arxiv_async.DEFAULT_CONCURRENCY,
+              flush_interval=result_writer.FLUSH_INTERVAL):
+    """Crawl all topics on one event loop, fetching up to `concurrency` pages at once."""
+    with result_writer.ResultWriter(log_file_path, 'lines', flush_interval) as writer:
+        def on_topic(topic_code, entries):
+            writer.put(topic_code, log_lines(entries))
+            store_entries(topic_code, entries)
+
+        return arxiv_async.run_crawl(topic_codes, listing_url, parse_listing_page, on_topic,
+                                     page_size=PAGE_SIZE, concurrency=concurrency)
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Collect past-week arXiv paper ids into a log file.')
+    parser.add_argument('--engine', choices=['pool', 'async'], default='pool',
+                        help='multiprocessing Pool (default) or asyncio crawl engine')
+    parser.add_argument('--concurrency', type=int, default=arxiv_async.DEFAULT_CONCURRENCY,
+                        help='maximum simultaneous requests for the async engine')
+    parser.add_argument('--flush-interval', type=float, default=result_writer.FLUSH_INTERVAL,
+                        help='seconds between log file flushes')
+    cli_args = parser.parse_args()
+    retry.start_run()
+
     os.makedirs('data', exist_ok=True)
     log_file_path = f'data/arxiv_{execution_timestamp}.log'
-    
-    topic_entries = scan_topics()
-    
-    if not topic_entries:
+
+    if not topic_codes:
         print("No topics to process")
         exit(1)
-    
-    with Manager() as manager:
-        shared_counter = manager.Value('i', 0)
-        shared_lock = manager.Lock()
-        
-        args_list = [(topic_code, count, shared_counter, shared_lock, log_file_path) 
-                     for topic_code, count in topic_entries]
-        
-        with Pool(processes=min(cpu_count(), 8)) as pool:
-            try:
-                results = pool.map(download_topic_pdfs, args_list)
-                
-                end_time = datetime.now()
-                total_downloaded = sum(results)
-                
-                print(f'Files downloaded: {total_downloaded}')
-                print(f'Duration: {end_time - start_time}')
-                print(f'Log saved to: {log_file_path}')
-                
-            except Exception as error:
-                print(f"Pool execution error: {error}")
+
+    try:
+        if cli_args.engine == 'async':
+            results = run_async(log_file_path, cli_args.concurrency, cli_args.flush_interval)
+        else:
+            results = run_pool(log_file_path, cli_args.flush_interval)
+
+        end_time = datetime.now()
+        total_downloaded = sum(results)
+
+        print(f'Files downloaded: {total_downloaded}')
+        print(f'Duration: {end_time - start_time}')
+        print(f'Log saved to: {log_file_path}')
+        print(f'Paper store: {paper_store.DEFAULT_DB_PATH}')
+        print(f'New ids in {paper_index.DEFAULT_INDEX_PATH}: {paper_index.build([log_file_path])}')
+        print(retry.summary())
+
+    except Exception as error:
+        print(f"Crawl execution error: {error}")
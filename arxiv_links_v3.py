@@ -1,12 +1,20 @@
 import os
-from multiprocessing import Pool, cpu_count, Manager
-import requests
-from bs4 import BeautifulSoup
+import argparse
+from multiprocessing import Pool, cpu_count
+import http_client
 from urllib.parse import urljoin
 from datetime import datetime
-import re
 import time
 import csv
+import functools
+
+import arxiv_async
+import checkpoint
+import listing_parser
+import paper_index
+import paper_store
+import result_writer
+import retry
 
 start_time = datetime.now()
 
@@ -28,155 +36,261 @@ topic_codes = [
 
 execution_timestamp = datetime.today().strftime("%d_%m_%Y_%H_%M")
 
-def download_topic_pdfs(args):
-    topic_code, total_entries_past_week, shared_counter, shared_lock, log_file_path = args
+PAGE_SIZE = 1000
+DELTA_PAGE_SIZE = 250  # --delta usually only needs the newest page or two
+STREAM_CHUNK_SIZE = 16 * 1024
+LISTING_BASE_URL = os.environ.get('ARXIV_LISTING_BASE_URL', 'https://arxiv.org')
+#LISTING_BASE_URL = 'https://export.arxiv.org'
 
-    if int(total_entries_past_week) == 0:
-        return 0
+def listing_url(topic_code, skip=0, show=PAGE_SIZE):
+    return f'{LISTING_BASE_URL}/list/{topic_code}/recent?skip={skip}&show={show}'
 
-    page_size = 1000
-    #url = f'https://export.arxiv.org/list/{topic_code}/recent?show={page_size}'
-    url = f'https://arxiv.org/list/{topic_code}/recent?show={page_size}'
+def csv_row(entry):
+    title, pdf_url, topic, date = entry
+    return [title, '', pdf_url, topic, date]
 
-    useragent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.75 Safari/537.36"
+def parse_listing_page(html, topic_code, parser=listing_parser.DEFAULT_PARSER):
+    """Parse one listing page into its "Total of N entries" count and CSV rows."""
+    entries = [csv_row(entry) for entry in listing_parser.parse_entries(html, topic_code, parser)]
+    return listing_parser.parse_total(html), entries
 
-    try:
-        response = requests.get(url, headers={"User-Agent": useragent}, timeout=30)
+def fetch_listing_page_streaming(topic_code, skip, show=PAGE_SIZE):
+    """Fetch one listing page, parsing entries while the response is still arriving.
+
+    Network transfer overlaps with parsing, and no DOM of the full page is
+    ever held in memory.
+    """
+    with http_client.get(listing_url(topic_code, skip, show), stream=True) as response:
+        response.raise_for_status()
+        stream = listing_parser.ListingStream(topic_code)
+        entries = []
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+            entries.extend(csv_row(entry) for entry in stream.feed(chunk))
+        entries.extend(csv_row(entry) for entry in stream.close())
+    return stream.total, entries
+
+def fetch_listing_page(topic_code, skip, show, parser, stream, run_checkpoint=None):
+    """Return `(total, entries)` of one listing page, from the run checkpoint if it was fetched before."""
+    if run_checkpoint:
+        page = run_checkpoint.load_page(topic_code, skip)
+        if page is not None:
+            return page
+    if stream:
+        total, entries = fetch_listing_page_streaming(topic_code, skip, show)
+    else:
+        response = http_client.get(listing_url(topic_code, skip, show))
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        total, entries = parse_listing_page(response.text, topic_code, parser)
+    if run_checkpoint:
+        run_checkpoint.save_page(topic_code, skip, total, entries)
+    return total, entries
+
+def store_entries(entries):
+    """Upsert one topic's CSV rows into the paper store as a single transaction."""
+    rows = [(paper_store.paper_id_from_url(pdf_url), title, topic, date)
+            for title, _, pdf_url, topic, date in entries]
+    paper_store.record(rows, execution_timestamp)
+
+def reached_watermark(entries, watermark):
+    """True once every paper on a page is at or below the topic's high-watermark.
+
+    Listing pages run newest first, so every page after this one only holds
+    papers an earlier run has already recorded. Cross-lists of older papers
+    sit among the new submissions and cannot be told apart from them, so a
+    single old id proves nothing; the page's newest id must be old too.
+    """
+    watermark_key = paper_store.paper_id_key(watermark)
+    return max(paper_store.paper_id_key(paper_store.paper_id_from_url(pdf_url))
+               for _, _, pdf_url, _, _ in entries) <= watermark_key
+
+def new_entries(topic_code, entries):
+    """Drop entries the paper store already has for this topic.
+
+    Cross-lists of older papers can appear above the watermark, so entries
+    are checked against the store rather than the watermark alone.
+    """
+    known = paper_store.known_papers(topic_code, (paper_store.paper_id_from_url(entry[2]) for entry in entries))
+    return [entry for entry in entries if paper_store.paper_id_from_url(entry[2]) not in known]
 
-        # Find ALL articles dl elements (there can be multiple, one per date)
-        articles_dls = soup.find_all('dl', id='articles')
-        if not articles_dls:
-            print(f"No articles found for {topic_code}")
-            return 0
+def download_topic_pdfs(args):
+    topic_code, parser, stream, delta, run_checkpoint = args
 
-        local_count = 0
+    try:
         entries = []
+        skip = 0
+        total_entries_past_week = None
+        failed_pages = 0
+        watermark = paper_store.watermarks().get(topic_code) if delta else None
+        show = DELTA_PAGE_SIZE if watermark else PAGE_SIZE
+
+        # The first listing page also carries the "Total of N entries" count,
+        # so further pages are only requested when the total exceeds a page.
+        while total_entries_past_week is None or skip < total_entries_past_week:
+            try:
+                total, page_entries = fetch_listing_page(topic_code, skip, show, parser, stream, run_checkpoint)
+            except Exception as e:
+                if total_entries_past_week is None:
+                    raise
+                # Later pages do not depend on this one: keep what was fetched
+                # and go on, reporting the topic as partial
+                print(f"Error fetching {topic_code} from {skip}: {e}")
+                failed_pages += 1
+                skip += show
+                continue
+            if total_entries_past_week is None:
+                total_entries_past_week = total
+                print(f'{topic_code} : {total_entries_past_week}')
+
+            if not page_entries:
+                if skip == 0:
+                    print(f"No articles found for {topic_code}")
+                break
+
+            entries.extend(page_entries)
+            skip += show
+            if watermark and reached_watermark(page_entries, watermark):
+                break
+
+        if failed_pages:
+            print(f'{topic_code} : partial, {failed_pages} pages failed, {len(entries)} entries kept')
+
+        if delta:
+            fetched = len(entries)
+            entries = new_entries(topic_code, entries)
+            print(f'{topic_code} : {len(entries)} new of {fetched} fetched')
 
-        # Iterate through each dl element (each represents a different date)
-        for articles_dl in articles_dls:
-            current_date = "[Date not found]"
-
-            # Iterate through all children of this dl element
-            for element in articles_dl.children:
-                # Skip text nodes
-                if not hasattr(element, 'name'):
-                    continue
-
-                # Check if it's an h3 tag (date header)
-                if element.name == 'h3':
-                    date_text = element.get_text().strip()
-                    # Extract date from format like "Mon, 15 Dec 2025 (showing 101 of 101 entries )"
-                    date_match = re.search(r'(\w+,\s+\d{1,2}\s+\w+\s+\d{4})', date_text)
-                    if date_match:
-                        current_date = date_match.group(1)
-                    continue
-
-                # Check if it's a dt tag (paper entry)
-                if element.name == 'dt':
-                    # Find the PDF link in the dt tag
-                    pdf_link_tag = element.find('a', attrs={"title": "Download PDF"})
-                    if not pdf_link_tag:
-                        continue
-
-                    pdf_link = pdf_link_tag.get('href')
-                    if not pdf_link:
-                        continue
-
-                    paper_id = pdf_link.split('/')[2]
-                    pdf_url = f"https://arxiv.org/pdf/{paper_id}.pdf"
-
-                    # Find the title in the next dd sibling
-                    dd = element.find_next_sibling('dd')
-                    if dd:
-                        title_div = dd.find('div', class_='list-title')
-                        if title_div:
-                            title = title_div.get_text().replace('Title:', '').strip()
-                        else:
-                            title = "[Title not found]"
-                    else:
-                        title = "[Title not found]"
-
-                    entries.append([title, '', pdf_url, topic_code, current_date])
-                    local_count += 1
-
-        # Write all entries at once with lock
         if entries:
-            with shared_lock:
-                shared_counter.value += local_count
-                with open(log_file_path, 'a', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerows(entries)
+            result_writer.submit(topic_code, entries)
+            store_entries(entries)
 
-        return local_count
+        return len(entries)
 
     except Exception as e:
         print(f"Error processing {topic_code}: {e}")
         return 0
 
-def scan_topics():
-    topic_entries_list = []
-    sum_of_papers = 0
-
-    for topic_code in topic_codes:
-        recent_url = f'https://export.arxiv.org/list/{topic_code}/recent'
-
-        useragent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.75 Safari/537.36"
-
-        try:
-            response = requests.get(recent_url, headers={"User-Agent": useragent}, timeout=30)
-            response.raise_for_status()
-
-            num_result = re.search(r'Total of (\d+) entries', response.text, re.IGNORECASE)
-            total_entries_past_week = 0
+def run_pool(csv_file_path, parser=listing_parser.DEFAULT_PARSER, stream=False, delta=False,
+             flush_interval=result_writer.FLUSH_INTERVAL, done_topics=()):
+    """Crawl all topics with a multiprocessing Pool, one topic per task.
+
+    With `stream`, each page is parsed incrementally as it downloads
+    (`fetch_listing_page_streaming`) and `parser` is not used. With `delta`,
+    paging stops at each topic's high-watermark and only papers missing
+    from the paper store are written. Workers send their rows to a single
+    writer process.
+
+    The run keeps a checkpoint next to the CSV (see `checkpoint.py`): every
+    listing page fetched and every topic flushed to the CSV. Topics in
+    `done_topics` are skipped and saved pages are not fetched again, so a
+    crashed run continues with `--resume`. The checkpoint is removed once
+    the run completes.
+    """
+    run_checkpoint = checkpoint.RunCheckpoint(checkpoint.checkpoint_dir(csv_file_path))
+    args_list = [(topic_code, parser, stream, delta, run_checkpoint)
+                 for topic_code in topic_codes if topic_code not in done_topics]
+
+    with result_writer.ResultWriter(csv_file_path, 'csv', flush_interval,
+                                    checkpoint_dir=run_checkpoint.directory) as writer:
+        with Pool(processes=min(cpu_count(), 8), initializer=result_writer.init_worker,
+                  initargs=(writer.queue,)) as pool:  # Increased processes for better performance
+            results = pool.map(download_topic_pdfs, args_list)
+    run_checkpoint.remove()
+    return results
+
+def run_async(csv_file_path, concurrency=arxiv_async.DEFAULT_CONCURRENCY,
+              parser=listing_parser.DEFAULT_PARSER, delta=False,
+              flush_interval=result_writer.FLUSH_INTERVAL):
+    """Crawl all topics on one event loop, fetching up to `concurrency` pages at once."""
+    watermarks = paper_store.watermarks() if delta else {}
+
+    def on_topic(topic_code, entries):
+        if delta:
+            fetched = len(entries)
+            entries = new_entries(topic_code, entries)
+            print(f'{topic_code} : {len(entries)} new of {fetched} fetched')
+        if entries:
+            writer.put(topic_code, entries)
+            store_entries(entries)
+        return len(entries)
 
-            if num_result:
-                total_entries_past_week = int(num_result.group(1))
-                sum_of_papers += total_entries_past_week
+    def topic_page_size(topic_code):
+        return DELTA_PAGE_SIZE if topic_code in watermarks else PAGE_SIZE
 
-            print(f'{topic_code} : {total_entries_past_week}')
-            topic_entries_list.append((topic_code, str(total_entries_past_week)))
+    def topic_listing_url(topic_code, skip):
+        return listing_url(topic_code, skip, topic_page_size(topic_code))
 
-        except Exception as e:
-            print(f"Error scanning {topic_code}: {e}")
-            topic_entries_list.append((topic_code, "0"))
+    def stop_paging(topic_code, page_entries):
+        return topic_code in watermarks and reached_watermark(page_entries, watermarks[topic_code])
 
-    print(f'sum of papers {sum_of_papers}')
-    return topic_entries_list
+    parse_page = functools.partial(parse_listing_page, parser=parser)
+    with result_writer.ResultWriter(csv_file_path, 'csv', flush_interval) as writer:
+        return arxiv_async.run_crawl(topic_codes, topic_listing_url, parse_page, on_topic,
+                                     page_size=topic_page_size, concurrency=concurrency,
+                                     stop_paging=stop_paging if delta else None)
 
 if __name__ == '__main__':
-    os.makedirs('data', exist_ok=True)
-    csv_file_path = f'data/arxiv_{execution_timestamp}.csv'
-
-    # Create the CSV file with headers
-    with open(csv_file_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Title', 'Status', 'Paper PDF URL', 'Topic', 'Published Date'])
+    parser = argparse.ArgumentParser(description='Collect recent arXiv listings into a CSV file.')
+    parser.add_argument('--engine', choices=['pool', 'async'], default='pool',
+                        help='multiprocessing Pool (default) or asyncio crawl engine')
+    parser.add_argument('--concurrency', type=int, default=arxiv_async.DEFAULT_CONCURRENCY,
+                        help='maximum simultaneous requests for the async engine')
+    parser.add_argument('--parser', choices=sorted(listing_parser.PARSERS), default=listing_parser.DEFAULT_PARSER,
+                        help='listing page parser backend')
+    parser.add_argument('--stream', action='store_true',
+                        help='pool engine: parse each listing page incrementally as it downloads')
+    parser.add_argument('--delta', action='store_true',
+                        help='stop paging at papers already in the paper store and write only new ones')
+    parser.add_argument('--flush-interval', type=float, default=result_writer.FLUSH_INTERVAL,
+                        help='seconds between CSV file flushes')
+    parser.add_argument('--resume', metavar='CSV',
+                        help='pool engine: continue an interrupted run from the checkpoint next to its CSV')
+    cli_args = parser.parse_args()
+    if cli_args.stream and cli_args.engine != 'pool':
+        parser.error('--stream requires the pool engine')
+    if cli_args.resume and cli_args.engine != 'pool':
+        parser.error('--resume requires the pool engine')
+    if cli_args.resume and not os.path.isdir(checkpoint.checkpoint_dir(cli_args.resume)):
+        # The checkpoint is removed once a run completes; resuming would crawl everything again
+        parser.error(f'no checkpoint for {cli_args.resume}: the run completed or never started')
+    retry.start_run()
 
-    topic_entries = scan_topics()
-
-    if not topic_entries:
+    os.makedirs('data', exist_ok=True)
+    done_topics = set()
+    if cli_args.resume:
+        csv_file_path = cli_args.resume
+        # Keep the interrupted run's id so its papers stay attributed to one run
+        execution_timestamp = os.path.basename(csv_file_path)[len('arxiv_'):-len('.csv')]
+        done_topics = checkpoint.prepare_resume(csv_file_path)
+        print(f'Resuming {csv_file_path}: {len(done_topics)} topics already done')
+    else:
+        csv_file_path = f'data/arxiv_{execution_timestamp}.csv'
+
+        # Create the CSV file with headers
+        with open(csv_file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Title', 'Status', 'Paper PDF URL', 'Topic', 'Published Date'])
+
+    if not topic_codes:
         print("No topics to process")
         exit(1)
 
-    with Manager() as manager:
-        shared_counter = manager.Value('i', 0)
-        shared_lock = manager.Lock()
-
-        args_list = [(topic_code, count, shared_counter, shared_lock, csv_file_path)
-                     for topic_code, count in topic_entries]
-
-        with Pool(processes=min(cpu_count(), 8)) as pool:  # Increased processes for better performance
-            try:
-                results = pool.map(download_topic_pdfs, args_list)
-
-                end_time = datetime.now()
-                total_downloaded = sum(results)
-
-                print(f'Papers processed: {total_downloaded}')
-                print(f'Duration: {end_time - start_time}')
-                print(f'CSV saved to: {csv_file_path}')
-
-            except Exception as error:
-                print(f"Pool execution error: {error}")
+    try:
+        if cli_args.engine == 'async':
+            results = run_async(csv_file_path, cli_args.concurrency, cli_args.parser, cli_args.delta,
+                                cli_args.flush_interval)
+        else:
+            results = run_pool(csv_file_path, cli_args.parser, cli_args.stream, cli_args.delta,
+                               cli_args.flush_interval, done_topics)
+
+        end_time = datetime.now()
+        total_downloaded = sum(results)
+
+        print(f'Papers processed: {total_downloaded}')
+        print(f'Duration: {end_time - start_time}')
+        print(f'CSV saved to: {csv_file_path}')
+        print(f'Paper store: {paper_store.DEFAULT_DB_PATH}')
+        print(f'New ids in {paper_index.DEFAULT_INDEX_PATH}: {paper_index.build([csv_file_path])}')
+        print(retry.summary())
+
+    except Exception as error:
+        print(f"Crawl execution error: {error}")
@@ -1,12 +1,17 @@
+import argparse
 import os
-from multiprocessing import Pool, cpu_count, Manager
-import requests
+from multiprocessing import Pool, cpu_count
+import http_client
+import keyword_matcher
+import paper_store
+import retry
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, quote_plus
 from datetime import datetime
 import re
-import time
 import csv
+import functools
+import math
 
 start_time = datetime.now()
 
@@ -26,31 +31,38 @@ search_config = {
     'classification': 'computer_science',  # 'computer_science', 'physics', 'mathematics', etc.
     'date_filter': 'past_12',  # 'past_12', 'past_6', 'past_3', 'all_dates', etc.
     'size': 200,  # Number of results per page
+    'max_results': 1000,  # Results kept per search term (--max-results)
+    'batch_size': 1,  # Search terms OR-combined into one query (--batch-size)
     'order': '-announced_date_first',  # Sort order
 }
 
 execution_timestamp = datetime.today().strftime("%d_%m_%Y_%H_%M")
 
-def build_search_url(term, start=0):
-    """Build the ArXiv advanced search URL for a given term."""
-    base_url = "https://arxiv.org/search/advanced"
+SEARCH_BASE_URL = os.environ.get('ARXIV_SEARCH_BASE_URL', 'https://arxiv.org')
 
-    params = {
-        'advanced': '',
-        'terms-0-operator': 'AND',
-        'terms-0-term': term,
-        'terms-0-field': search_config['field'],
+def build_search_url(terms, start=0):
+    """Build the ArXiv advanced search URL for a term, or for a list of terms
+    combined into one OR query with abstracts shown for `attribute_terms`."""
+    base_url = f"{SEARCH_BASE_URL}/search/advanced"
+    terms = [terms] if isinstance(terms, str) else list(terms)
+
+    params = {'advanced': ''}
+    for index, term in enumerate(terms):
+        params[f'terms-{index}-operator'] = 'AND' if index == 0 else 'OR'
+        params[f'terms-{index}-term'] = term
+        params[f'terms-{index}-field'] = search_config['field']
+    params.update({
         'classification-include_cross_list': 'include',
         'date-filter_by': search_config['date_filter'],
         'date-year': '',
         'date-from_date': '',
         'date-to_date': '',
         'date-date_type': 'submitted_date',
-        'abstracts': 'hide',
+        'abstracts': 'show' if len(terms) > 1 else 'hide',
         'size': search_config['size'],
         'order': search_config['order'],
         'start': start
-    }
+    })
 
     # Add classification
     if search_config['classification'] == 'computer_science':
@@ -106,117 +118,238 @@ def extract_paper_info(result_item):
         print(f"Error extracting paper info: {e}")
         return None
 
-def search_arxiv_term(args):
-    """Search ArXiv for a specific term and extract papers."""
-    search_term, shared_counter, shared_lock, log_file_path = args
-
-    useragent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.75 Safari/537.36"
-
+def extract_abstract(result_item):
+    """Text of the result's abstract, or '' when the page hides abstracts."""
+    abstract_tag = result_item.find('span', class_='abstract-full')
+    return abstract_tag.get_text(' ').strip() if abstract_tag else ''
+
+def parse_results_page(html):
+    """Return the "of N results" total and the `(row, abstract)` pairs of one results page."""
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Find total number of results
+    total_results_tag = soup.find('h1', class_='title')
+    total_results = 0
+    if total_results_tag:
+        total_match = re.search(r'of\s+([\d,]+)\s+results', total_results_tag.get_text())
+        if total_match:
+            total_results = int(total_match.group(1).replace(',', ''))
+
+    entries = []
+    for result_item in soup.find_all('li', class_='arxiv-result'):
+        paper_info = extract_paper_info(result_item)
+        if paper_info:
+            entries.append((paper_info, extract_abstract(result_item)))
+    return total_results, entries
+
+def batch_terms(terms, batch_size):
+    """Split `terms` into queries of up to `batch_size` terms each."""
+    batch_size = max(1, batch_size)
+    return [tuple(terms[index:index + batch_size]) for index in range(0, len(terms), batch_size)]
+
+def describe_query(query):
+    return ' OR '.join(f"'{term}'" for term in query)
+
+def attribute_terms(query, row, abstract):
+    """Terms of `query` a result matched, checked locally on its title and abstract.
+
+    A single-term query needs no check. For an OR query each term matches
+    case-insensitively as a whole-word phrase (see `keyword_matcher`); a
+    result arXiv matched on another field, such as the authors or comments,
+    matches no term here.
+    """
+    if len(query) == 1:
+        return list(query)
+    matched = query_classifier(query).classify(f'{row[0]} {abstract}')
+    return [term for term in query if term in matched]
+
+@functools.lru_cache(maxsize=None)
+def query_classifier(query):
+    """One compiled matcher per OR query, reused for every result of it."""
+    return keyword_matcher.KeywordClassifier({term: [term] for term in query})
+
+def fetch_results_page(args):
+    """Fetch one (query, start) results page; returns `(query, start, total, entries)`.
+
+    `query` is a tuple of terms and each entry a `(row, matched terms)` pair.
+    """
+    query, start = args
     try:
-        url = build_search_url(search_term, start=0)
-        print(f"Searching for: {search_term}")
-
-        response = requests.get(url, headers={"User-Agent": useragent}, timeout=30)
+        response = http_client.get(build_search_url(query, start=start))
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Find total number of results
-        total_results_tag = soup.find('h1', class_='title')
-        total_results = 0
-        if total_results_tag:
-            total_match = re.search(r'of\s+([\d,]+)\s+results', total_results_tag.get_text())
-            if total_match:
-                total_results = int(total_match.group(1).replace(',', ''))
-
-        print(f"Found {total_results} results for '{search_term}'")
-
-        if total_results == 0:
-            return 0
-
-        local_count = 0
-        entries = []
-
-        # Process first page
-        results = soup.find_all('li', class_='arxiv-result')
-        for result_item in results:
-            paper_info = extract_paper_info(result_item)
-            if paper_info:
-                # Add search term to the entry
-                paper_info.append(search_term)
-                entries.append(paper_info)
-                local_count += 1
-
-        # Calculate if we need to fetch more pages
-        pages_needed = min((total_results // search_config['size']) + 1, 5)  # Limit to 5 pages max
-
-        # Fetch additional pages if needed
-        for page in range(1, pages_needed):
-            start_index = page * search_config['size']
-            if start_index >= total_results:
-                break
-
-            print(f"Fetching page {page + 1} for '{search_term}'...")
-            time.sleep(1)  # Be respectful to the server
-
-            url = build_search_url(search_term, start=start_index)
-            response = requests.get(url, headers={"User-Agent": useragent}, timeout=30)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            results = soup.find_all('li', class_='arxiv-result')
-            for result_item in results:
-                paper_info = extract_paper_info(result_item)
-                if paper_info:
-                    paper_info.append(search_term)
-                    entries.append(paper_info)
-                    local_count += 1
-
-        # Write all entries at once with lock
-        if entries:
-            with shared_lock:
-                shared_counter.value += local_count
-                with open(log_file_path, 'a', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerows(entries)
-
-        print(f"Completed '{search_term}': {local_count} papers extracted")
-        return local_count
-
+        total_results, entries = parse_results_page(response.text)
+        return query, start, total_results, [(row, attribute_terms(query, row, abstract)) for row, abstract in entries]
     except Exception as e:
-        print(f"Error processing '{search_term}': {e}")
-        return 0
+        print(f"Error processing {describe_query(query)} from {start}: {e}")
+        return query, start, 0, []
+
+def later_page_starts(total_results, max_results, first_start=None):
+    """Start offsets of the pages from `first_start` (the second page by default)
+    up to `max_results` results."""
+    first_start = search_config['size'] if first_start is None else first_start
+    return range(first_start, min(total_results, max_results), search_config['size'])
+
+def own_search_pages(need, found):
+    """Pages a term's own search needs for `need` results when the first
+    `found` are already known, starting at the page holding the next one."""
+    size = search_config['size']
+    return math.ceil((need - found // size * size) / size) if found < need else 0
+
+def or_query_window(first_page, max_results):
+    """How many results of an OR query to fetch, estimated from its first page.
+
+    Each term's share of the first page estimates its number of results and
+    how deep the OR query must go to give it `max_results` of them. The
+    window minimises the OR pages plus the pages the terms it leaves short
+    then need on their own: deep when the terms share the results evenly,
+    shallow when one term crowds out rare ones.
+    """
+    _, _, total_results, entries = first_page
+    size = search_config['size']
+    if not entries:
+        return size
+    shares = {}
+    for _, matched in entries:
+        for term in matched:
+            shares[term] = shares.get(term, 0) + 1 / len(entries)
+    needs = {term: min(max_results, share * total_results) for term, share in shares.items()}
+
+    def cost(window):
+        return math.ceil(window / size) + sum(own_search_pages(needs[term], share * window)
+                                              for term, share in shares.items())
+
+    windows = {size} | {min(total_results, math.ceil(needs[term] / share)) for term, share in shares.items()}
+    return min(windows, key=lambda window: (cost(window), window))
+
+def fetch_query_pages(pool, queries, max_results, first_starts=None):
+    """Fetch the results pages of `queries`, up to `max_results` results per term.
+
+    The first page of each query (at offset `first_starts[query]`, 0 by
+    default) carries its total, so the first pages are fetched together,
+    then every remaining (query, start) page is scheduled at once, as far as
+    `or_query_window` for OR queries. `http_client` keeps the whole pool
+    within arxiv.org's rate limit.
+    """
+    first_starts = first_starts or {}
+    first_pages = pool.map(fetch_results_page, [(query, first_starts.get(query, 0)) for query in queries])
+    for query, _, total_results, _ in first_pages:
+        print(f"Found {total_results} results for {describe_query(query)}")
+
+    later_pages = [(page[0], start) for page in first_pages
+                   for start in later_page_starts(page[2], max_results if len(page[0]) == 1
+                                                  else or_query_window(page, max_results),
+                                                  page[1] + search_config['size'])]
+    print(f"Fetching {len(later_pages)} more pages")
+    return first_pages + pool.map(fetch_results_page, later_pages)
+
+def short_terms(query, pages, max_results):
+    """`{term: results found}` for the terms of an OR query with fewer than
+    `max_results` results in its fetched pages, while the query has results
+    left unfetched."""
+    fetched = max(start for _, start, _, _ in pages) + search_config['size']
+    if fetched >= max(total for _, _, total, _ in pages):
+        return {}
+    papers = {term: set() for term in query}
+    for _, _, _, entries in pages:
+        for row, matched in entries:
+            for term in matched:
+                papers[term].add(paper_store.paper_id_from_url(row[2]))
+    return {term: len(papers[term]) for term in query if len(papers[term]) < max_results}
+
+def search_arxiv_terms(pool, queries, max_results):
+    """Fetch the results pages of every query, at most `max_results` results per term.
+
+    Terms of one OR query seldom have equally many results, so a rare term
+    may get fewer than `max_results` results from the query's pages while a
+    common one fills them. Paging the OR query further could mean walking
+    the common term's results to the end, so each short term is searched on
+    its own instead. Both searches list results newest first, so the term's
+    own search starts at the page holding its first result not seen yet.
+    Returns the pages as `(query, start, total, entries)`.
+    """
+    pages = fetch_query_pages(pool, queries, max_results)
+
+    by_query = {}
+    for page in pages:
+        by_query.setdefault(page[0], []).append(page)
+    first_starts = {(term,): found // search_config['size'] * search_config['size']
+                    for query, query_pages in by_query.items() if len(query) > 1
+                    for term, found in short_terms(query, query_pages, max_results).items()}
+    if first_starts:
+        print(f"Searching {len(first_starts)} terms short of {max_results} results on their own")
+        pages += fetch_query_pages(pool, list(first_starts), max_results, first_starts)
+    return pages
+
+def merge_results(terms, pages, max_results):
+    """Merge result rows by paper id into one row per paper listing every matching term.
+
+    Keeps at most `max_results` results per term, counting a paper once per
+    term even when several queries returned it. Rows follow the order of
+    `terms`, then of the result pages. Returns the CSV rows, the number of
+    results kept per term and the number of results matching none of the
+    terms of their query.
+    """
+    term_order = {term: index for index, term in enumerate(terms)}
+    papers = {}
+    term_counts = dict.fromkeys(terms, 0)
+    unmatched = 0
+    for _, _, _, entries in sorted(pages, key=lambda page: (term_order[page[0][0]], page[1])):
+        for (title, status, pdf_url, subject, date), matched in entries:
+            if not matched:
+                unmatched += 1
+            paper_id = paper_store.paper_id_from_url(pdf_url)
+            for search_term in matched:
+                if term_counts[search_term] >= max_results:
+                    continue
+                paper = papers.setdefault(paper_id, [title, status, pdf_url, subject, date, []])
+                if search_term not in paper[5]:
+                    term_counts[search_term] += 1
+                    paper[5].append(search_term)
+    rows = [paper[:5] + ['; '.join(paper[5])] for paper in papers.values()]
+    return rows, term_counts, unmatched
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Search arXiv for each search term and collect the results into a CSV file.')
+    parser.add_argument('--max-results', type=int, default=search_config['max_results'],
+                        help='results kept per search term')
+    parser.add_argument('--batch-size', type=int, default=search_config['batch_size'],
+                        help='search terms combined into one OR query, matched back to each result locally')
+    cli_args = parser.parse_args()
+    retry.start_run()
     os.makedirs('data', exist_ok=True)
     csv_file_path = f'data/arxiv_search_{execution_timestamp}.csv'
 
-    # Create the CSV file with headers
-    with open(csv_file_path, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['Title', 'Status', 'Paper PDF URL', 'Topic', 'Published Date', 'Search Term'])
-
     if not search_terms:
         print("No search terms to process")
         exit(1)
 
-    with Manager() as manager:
-        shared_counter = manager.Value('i', 0)
-        shared_lock = manager.Lock()
-
-        args_list = [(term, shared_counter, shared_lock, csv_file_path)
-                     for term in search_terms]
-
+    try:
         # Use fewer processes to avoid overwhelming the server
         with Pool(processes=min(cpu_count(), 4)) as pool:
-            try:
-                results = pool.map(search_arxiv_term, args_list)
+            pages = search_arxiv_terms(pool, batch_terms(search_terms, cli_args.batch_size), cli_args.max_results)
+
+        rows, term_counts, unmatched = merge_results(search_terms, pages, cli_args.max_results)
+        for search_term, count in term_counts.items():
+            print(f"Completed '{search_term}': {count} papers extracted")
+
+        with open(csv_file_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Title', 'Status', 'Paper PDF URL', 'Topic', 'Published Date', 'Search Term'])
+            writer.writerows(rows)
+
+        paper_store.record([(paper_store.paper_id_from_url(pdf_url), title, subject, date)
+                            for title, _, pdf_url, subject, date, _ in rows],
+                           execution_timestamp, advance_watermarks=False)
 
-                end_time = datetime.now()
-                total_downloaded = sum(results)
+        end_time = datetime.now()
 
-                print(f'\nPapers processed: {total_downloaded}')
-                print(f'Duration: {end_time - start_time}')
-                print(f'CSV saved to: {csv_file_path}')
+        print(f'\nPapers processed: {len(rows)} unique of {sum(term_counts.values())} results')
+        if unmatched:
+            print(f'Skipped {unmatched} results matching no search term in their title or abstract')
+        print(f'Duration: {end_time - start_time}')
+        print(f'CSV saved to: {csv_file_path}')
+        print(f'Paper store: {paper_store.DEFAULT_DB_PATH}')
+        print(retry.summary())
 
-            except Exception as error:
-                print(f"Pool execution error: {error}")
+    except Exception as error:
+        print(f"Pool execution error: {error}")
@@ -1,12 +1,14 @@
-import threading
 from multiprocessing import Pool, cpu_count
-import requests
+import http_client
+import paper_index
+import pdf_download
+import retry
+from download_manager import DownloadManager
 from bs4 import BeautifulSoup
 import os
-from urllib.parse import urljoin
 from datetime import datetime
+from collections import defaultdict
 import re
-import time
 
 start_time = datetime.now()
 
@@ -40,45 +42,50 @@ topic_codes = [
   ]
 
 sum_of_papers = 0
-download_count = 0
 
-def download_topic_pdfs(topic_entry):
+download_folder = '/Users/apple/Downloads/papers/script/downloads'
+downloads_per_host = 4
+# per-topic index of papers already downloaded into the topic's folder
+downloaded_index_name = '.downloaded.idx'
+
+def downloaded_index_path(topic_code):
+  return os.path.join(download_folder, topic_code, downloaded_index_name)
+
+def list_topic_pdfs(topic_entry):
   """
-  download pdf of a particular topic
+  list the (topic, paper id) download jobs of a particular topic,
+  and the paper ids found complete on disk but missing from the index
   """
   topic_code = topic_entry[0]
   total_entries_past_week = topic_entry[1]
   url = f'https://export.arxiv.org/list/{topic_code}/pastweek?show={total_entries_past_week}'
 
-  folder_location = f'/Users/apple/Downloads/papers/script/downloads/{topic_code}'
-  if not os.path.exists(folder_location):os.mkdir(folder_location)
+  folder_location = os.path.join(download_folder, topic_code)
 
-  time.sleep(0.5)
-  useragent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.75 Safari/537.36"
-  response = requests.get(url, headers={"User-Agent": useragent})
+  response = http_client.get(url)
   soup = BeautifulSoup(response.text, 'html.parser')
 
   pdf_links = soup.findAll('a', attrs={"title": "Download PDF"})
   pdf_links.reverse()
-  for a in pdf_links:
-    pdf_link = a.get('href')
-    filename = os.path.join(folder_location,pdf_link.split('/')[-1] + '.pdf')
-    # print(len(pdf_links))
-
-    # if file does not exists or file size equal to zero
-    if not os.path.exists(filename) or not (os.path.getsize(filename) > 10240):
-      time.sleep(0.25)
-
-      lock.acquire()
-      global download_count
-      download_count = download_count + 1
-      print(f"{time.strftime('%H:%M:%S')} {download_count} {topic_code} {a.get('href')}")
-      lock.release()
-
-      with open(filename, 'wb') as f:
-        f.write(requests.get(urljoin(url,pdf_link)).content)
-
-lock = threading.Lock()
+  paper_ids = [a.get('href').split('/')[-1] for a in pdf_links]
+  with paper_index.PaperIndex(downloaded_index_path(topic_code)) as index:
+    downloaded = index.contains_many(paper_ids)
+
+  jobs = []
+  present = []
+  for paper_id in paper_ids:
+    if paper_id in downloaded:
+      continue
+    filename = os.path.join(folder_location, paper_id + '.pdf')
+
+    # if file does not exist or is a truncated/corrupt pdf
+    if not pdf_download.is_complete_pdf(filename):
+      jobs.append((topic_code, paper_id))
+    else:
+      present.append(paper_id)
+
+  print(f'{topic_code} : {len(jobs)} to download, {len(downloaded)} already indexed')
+  return jobs, present
 
 def scan_topics():
   """
@@ -87,11 +94,9 @@ def scan_topics():
 
   topic_entries_list = []
   for topic_code in topic_codes: 
-    time.sleep(2)
     recent_url = f'https://export.arxiv.org/list/{topic_code}/recent'
 
-    useragent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.75 Safari/537.36"
-    response = requests.get(recent_url, headers={"User-Agent": useragent})
+    response = http_client.get(recent_url)
 
     num_result = re.search('total of (.+?) entries', response.text)
     total_entries_past_week = 0
@@ -107,14 +112,29 @@ def scan_topics():
   return topic_entries_list
 
 if __name__ == '__main__':
+  retry.start_run()
   topic_entries = scan_topics()
-  time.sleep(1)
   pool = Pool(processes=cpu_count())
   try:
-    pool.map(download_topic_pdfs, topic_entries)
+    # listing stage: one flat queue of papers across all topics
+    listings = pool.map(list_topic_pdfs, topic_entries)
+    jobs = [job for topic_jobs, _ in listings for job in topic_jobs]
+
+    manager = DownloadManager(download_folder, per_host_concurrency=downloads_per_host)
+    stats = manager.run(jobs)
+
+    # remember finished papers so later runs skip them without touching the files
+    finished = defaultdict(list)
+    for (topic_code, _), (_, present) in zip(topic_entries, listings):
+      finished[topic_code].extend(present)
+    for topic_code, paper_id in stats.completed:
+      finished[topic_code].append(paper_id)
+    for topic_code, paper_ids in finished.items():
+      paper_index.add(paper_ids, downloaded_index_path(topic_code))
+
     end_time = datetime.now()
-    # print(f'files downloaded {download_count}')
     print('Duration: {}'.format(end_time - start_time))
+    print(retry.summary())
   except Exception as error:
     print(error) 
 
@@ -0,0 +1,84 @@
+"""Measure the cloud function's cold-start cost: importing main.py in a fresh interpreter.
+
+    python bench_cold_start.py --runs 10 --top 10
+
+Each run starts a new interpreter, imports `cloud-function/main.py` and
+creates its storage client, reporting the import time main.py measures
+itself and the time to the first client. The client is the fake bucket
+store unless `--real-storage` is passed, which needs Google credentials
+(or times out probing for them). `--top N` lists the slowest imports of
+one run from `python -X importtime`.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+FUNCTION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cloud-function')
+
+PROBE = '''
+import json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter() - started
+main.get_storage_client()
+print(json.dumps({'import': imported, 'reported': main._startup['import_seconds'],
+                  'client': main._startup['storage_client_seconds']}))
+'''
+
+
+def run_probe(env):
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=FUNCTION_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def slowest_imports(env, top):
+    """Return the `top` modules with the largest cumulative import time, in microseconds."""
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import main'], cwd=FUNCTION_DIR,
+                            env=env, capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            name = parts[2].rstrip()
+            rows.append((int(parts[1]), name.strip(), len(name) - len(name.lstrip())))
+    # Only modules main.py imports directly (listed before it, one level deeper),
+    # so nested modules do not repeat their parent's time
+    main_depth = next(depth for _, name, depth in rows if name == 'main')
+    direct = [(micros, name) for micros, name, depth in rows if depth == main_depth + 2]
+    return sorted(direct, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='fresh interpreters to time')
+    parser.add_argument('--top', type=int, default=0, help='also list the N slowest imports')
+    parser.add_argument('--real-storage', action='store_true', help='create a real google-cloud-storage client')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, 'PYTHONDONTWRITEBYTECODE': '1'}
+        env.pop('LOCAL_BUCKET_DIR', None)
+        if not args.real_storage:
+            env['LOCAL_BUCKET_DIR'] = tmp
+
+        run_probe(env)  # warm the OS file cache so runs compare imports, not disk reads
+        results = [run_probe(env) for _ in range(args.runs)]
+        for name, key in (('import main', 'import'), ('reported by main', 'reported'),
+                          ('storage client', 'client')):
+            values = [result[key] * 1000 for result in results]
+            print(f'{name:>16}: median {statistics.median(values):7.1f} ms  '
+                  f'min {min(values):7.1f} ms  max {max(values):7.1f} ms')
+
+        if args.top:
+            print('slowest imports:')
+            for micros, module in slowest_imports(env, args.top):
+                print(f'  {micros / 1000:7.1f} ms  {module}')
+
+
+if __name__ == '__main__':
+    main()
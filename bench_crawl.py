@@ -0,0 +1,62 @@
+"""Compare the Pool and asyncio listing crawls against a local mock server.
+
+    python bench_crawl.py --latency 0.2 --entries 300 --concurrency 16 --rate 1000
+
+`--fault-rate 0.2` makes the mock server answer a fifth of requests with
+429/503 and Retry-After, and prints the retry counters for each engine.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import mock_arxiv
+import rate_limit
+import retry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds of server delay per page')
+    parser.add_argument('--entries', type=int, default=300, help='papers per topic')
+    parser.add_argument('--concurrency', type=int, default=16, help='async engine request limit')
+    parser.add_argument('--rate', type=float, default=1000.0, help='requests/s allowed to the mock server')
+    parser.add_argument('--fault-rate', type=float, default=0.0, help='fraction of requests answered 429/503')
+    args = parser.parse_args()
+
+    rate_limit.configure('127.0.0.1', args.rate, max(1, int(args.rate)))
+    # Keep injected faults from stretching the run: short backoff and breaker pause
+    retry.BACKOFF_BASE = 0.05
+    retry.BREAKER_PAUSE = 1.0
+    server = mock_arxiv.start_server(latency=args.latency, entries_per_topic=args.entries,
+                                     fault_rate=args.fault_rate, retry_after=0)
+    os.environ['ARXIV_LISTING_BASE_URL'] = f'http://127.0.0.1:{server.server_port}'
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            # Keep synthetic papers out of the real paper store
+            os.environ['PAPER_DB_PATH'] = os.path.join(tmp, 'papers.db')
+            # Imported after the environment is set so Pool workers pick it up too
+            import arxiv_links_v3
+
+            for engine in ('pool', 'async'):
+                csv_file_path = os.path.join(tmp, f'{engine}.csv')
+                retry.start_run()
+                started = time.perf_counter()
+                if engine == 'async':
+                    results = arxiv_links_v3.run_async(csv_file_path, args.concurrency)
+                else:
+                    results = arxiv_links_v3.run_pool(csv_file_path)
+                elapsed = time.perf_counter() - started
+
+                papers = sum(results)
+                print(f'{engine:>5}: {len(results)} topics, {papers} papers in {elapsed:.2f}s '
+                      f'({papers / elapsed:.0f} papers/s)')
+                if args.fault_rate:
+                    print(f'       {retry.summary()}')
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""Compare the old Hacker News page walk with the time-sliced fetcher on a local mock Algolia server.
+
+    python bench_hn.py --stories 20000 --days 30 --slices 8
+
+The page walk (`page=0..9`, 100 hits each, as hacker_news.py used to do)
+can only reach the newest 1000 hits; the sliced fetch must return every
+story of the window. A second, incremental run after `--new` more stories
+are published must return exactly those.
+
+The filtered comparison fetches the AI/ML stories of hacker_news_generic.py
+and the github.io stories of hacker_news.py twice: every story of the window
+filtered locally, and the Algolia-side queries from `hn_fetch.plan_queries`
+with the same local check, reporting the requests and bytes saved.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import mock_algolia
+import rate_limit
+import retry
+
+LEGACY_HITS_PER_PAGE = 100
+LEGACY_MAX_PAGES = 10
+
+
+def legacy_fetch(base_url, params):
+    """The sequential page walk hacker_news.py and hacker_news_generic.py used before."""
+    import http_client
+    hits = []
+    for page in range(LEGACY_MAX_PAGES):
+        resp = http_client.get(base_url, params={**params, 'hitsPerPage': LEGACY_HITS_PER_PAGE, 'page': page})
+        page_hits = resp.json().get('hits', [])
+        if not page_hits:
+            break
+        hits.extend(page_hits)
+    return hits
+
+
+def measure(server, label, fetch):
+    """Run `fetch`, print what it cost and return `(hits, requests, bytes)`."""
+    requests_before, bytes_before = server.requests, server.bytes_sent
+    started = time.perf_counter()
+    hits = fetch()
+    elapsed = time.perf_counter() - started
+    requests, sent = server.requests - requests_before, server.bytes_sent - bytes_before
+    print(f'{label:>16}: {len(hits):6d} stories, {requests:4d} requests, {sent / 1e6:7.2f} MB in {elapsed:.2f}s')
+    return hits, requests, sent
+
+
+def compare_filtered(server, label, since, until, queries, predicate, slices):
+    """Fetch everything and filter locally, then fetch only the planned candidates."""
+    import hn_fetch
+    everything, requests_all, bytes_all = measure(
+        server, f'{label} all', lambda: hn_fetch.fetch_stories({'tags': 'story'}, since, until, slices))
+    planned, requests_planned, bytes_planned = measure(
+        server, f'{label} planned', lambda: [hit for params, numeric_filters in queries
+                                             for hit in hn_fetch.fetch_stories(params, since, until, 1, numeric_filters)])
+
+    local = {hit['objectID'] for hit in everything if predicate(hit)}
+    found = {hit['objectID'] for hit in planned if predicate(hit)}
+    assert found <= local, f'{label}: planned queries returned stories the local check rejects'
+    # Algolia matches whole words (or their prefixes), so substring hits such as
+    # "gan" in "organic" are no longer returned
+    print(f'{label:>16}: {len(found)} matches ({len(local - found)} substring-only matches dropped); '
+          f'saved {requests_all - requests_planned} requests and {(bytes_all - bytes_planned) / 1e6:.2f} MB')
+    assert requests_planned < requests_all, f'{label}: planned queries saved no requests'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stories', type=int, default=20000, help='stories held by the mock server')
+    parser.add_argument('--days', type=int, default=30, help='time window to fetch')
+    parser.add_argument('--slices', type=int, default=8, help='time slices fetched concurrently')
+    parser.add_argument('--new', type=int, default=250, help='stories published before the incremental run')
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds of server delay per request')
+    parser.add_argument('--rate', type=float, default=1000.0, help='requests/s allowed to the mock server')
+    args = parser.parse_args()
+
+    rate_limit.configure('127.0.0.1', args.rate, max(1, int(args.rate)))
+    now = int(time.time())
+    interval = args.days * 86400 // args.stories  # spread the stories over the window
+    # Leave room before `now` for the stories published ahead of the incremental run
+    published = now - 2 * args.new * interval - 1
+    server = mock_algolia.start_server(mock_algolia.make_stories(args.stories, published, interval), args.latency)
+    base_url = f'http://127.0.0.1:{server.server_port}'
+    os.environ['HN_ALGOLIA_BASE_URL'] = base_url
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            os.environ['HN_CURSOR_PATH'] = os.path.join(tmp, 'cursors.json')
+            # Imported after the environment is set so the module picks up the mock
+            import hn_fetch
+
+            retry.start_run()
+            params = {'tags': 'story'}
+            since = published - args.days * 86400
+            expected = {story['objectID'] for story in server.stories if story['created_at_i'] >= since}
+
+            measure(server, 'page walk', lambda: legacy_fetch(hn_fetch.BASE_URL, params))
+            hits, _, _ = measure(server, 'sliced', lambda: hn_fetch.fetch_stories(params, since, published, args.slices))
+            ids = [hit['objectID'] for hit in hits]
+            assert len(ids) == len(set(ids)), 'duplicate stories across slices'
+            assert set(ids) == expected, f'{len(expected - set(ids))} stories missing'
+
+            cursor = hn_fetch.next_cursor(hits)
+            mock_algolia.add_stories(server, args.new, now, interval)
+            fresh = {story['objectID'] for story in server.stories[:args.new]}
+            hits, _, _ = measure(server, 'incremental', lambda: hn_fetch.fetch_new_stories(params, cursor, slices=args.slices))
+            assert {hit['objectID'] for hit in hits} == fresh, 'incremental run did not return exactly the new stories'
+            print('sliced and incremental results match the server')
+
+            import hacker_news
+            import hacker_news_generic
+            until = now
+            compare_filtered(server, 'AI/ML', since, until,
+                             hn_fetch.plan_queries(keywords=hacker_news_generic.AI_ML_KEYWORDS),
+                             lambda hit: hacker_news_generic.is_interesting(hit['title'] or ''), args.slices)
+            compare_filtered(server, 'github.io', since, until,
+                             hn_fetch.plan_queries(domains=[hacker_news.QUERY]),
+                             lambda hit: hacker_news.QUERY in (hit['url'] or ''), args.slices)
+            print(retry.summary())
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
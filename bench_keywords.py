@@ -0,0 +1,84 @@
+"""Compare substring keyword checks with the compiled `keyword_matcher.KeywordClassifier`.
+
+    python bench_keywords.py --titles 100000 --extra-terms 500
+
+Titles come from `mock_algolia.make_stories`. Three classifiers are timed
+on them: the substring loop hacker_news_generic.py used to run, one
+word-boundary regex per term, and the single compiled pattern. `--extra-terms`
+adds synthetic categories of that many terms to show how each approach
+scales with the size of the term set.
+"""
+import argparse
+import random
+import re
+import string
+import time
+
+import hacker_news_generic
+import keyword_matcher
+import mock_algolia
+
+
+def substring_classify(categories, titles):
+    results = []
+    for title in titles:
+        lowered = title.lower()
+        results.append({category for category, terms in categories.items()
+                        if any(term in lowered for term in terms)})
+    return results
+
+
+def per_term_classify(categories, titles):
+    patterns = [(re.compile(rf'(?<![a-z0-9]){re.escape(term)}(?:e?s)?(?![a-z0-9])', re.IGNORECASE), category)
+                for category, terms in categories.items() for term in terms]
+    return [{category for pattern, category in patterns if pattern.search(title)} for title in titles]
+
+
+def synthetic_terms(count, seed=0):
+    """`count` made-up terms, about a third of them two-word phrases."""
+    rng = random.Random(seed)
+    word = lambda: ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+    return [f'{word()} {word()}' if rng.random() < 0.3 else word() for _ in range(count)]
+
+
+def timed(label, titles, classify):
+    started = time.perf_counter()
+    results = classify(titles)
+    elapsed = time.perf_counter() - started
+    matched = sum(1 for categories in results if categories)
+    print(f'{label:>12}: {elapsed:6.3f}s  {len(titles) / elapsed:10.0f} titles/s  {matched} titles matched')
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--titles', type=int, default=100000, help='titles to classify')
+    parser.add_argument('--extra-terms', type=int, default=500, help='synthetic terms added to the AI/ML set')
+    args = parser.parse_args()
+
+    titles = [story['title'] for story in mock_algolia.make_stories(args.titles)]
+    categories = dict(hacker_news_generic.AI_ML_CATEGORIES)
+    if args.extra_terms:
+        extra = synthetic_terms(args.extra_terms)
+        for index in range(0, len(extra), 50):
+            categories[f'synthetic_{index // 50}'] = extra[index:index + 50]
+    term_count = sum(len(terms) for terms in categories.values())
+    print(f'{len(titles)} titles, {term_count} terms in {len(categories)} categories')
+
+    substring = timed('substring', titles, lambda titles: substring_classify(categories, titles))
+    per_term = timed('per-term re', titles, lambda titles: per_term_classify(categories, titles))
+    started = time.perf_counter()
+    classifier = keyword_matcher.KeywordClassifier(categories)
+    print(f'{"compile":>12}: {time.perf_counter() - started:6.3f}s')
+    compiled = timed('compiled', titles, classifier.classify_many)
+
+    # Phrases may be spelt with hyphens or line breaks, which per-term patterns do not
+    # accept, so compare on titles made only of single spaces
+    differing = sum(1 for title, a, b in zip(titles, per_term, compiled) if a != b and '-' not in title)
+    assert not differing, f'{differing} titles classified differently from per-term patterns'
+    dropped = sum(1 for a, b in zip(substring, compiled) if a and not b)
+    print(f'compiled matches per-term patterns; {dropped} substring-only matches (e.g. "gan" in "organic") dropped')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Check that every listing parser backend agrees, and time each one per page.
+
+Includes the incremental `ListingStream` parser used by `arxiv_links_v3.py --stream`.
+
+    python bench_parsers.py                          # synthetic pages from mock_arxiv
+    python bench_parsers.py --record fixtures cs.AI cs.LG   # save live listing pages
+    python bench_parsers.py --fixtures fixtures      # compare on recorded pages
+
+Recorded pages are named `<topic>__<skip>.html`, so the topic code is known
+when they are parsed again.
+"""
+import argparse
+import glob
+import os
+import time
+
+import listing_parser
+import mock_arxiv
+
+
+def record(directory, topic_codes, page_size):
+    # Imported here so comparing parsers needs no network setup
+    import arxiv_links_v3
+    import http_client
+
+    os.makedirs(directory, exist_ok=True)
+    for topic_code in topic_codes:
+        url = f'{arxiv_links_v3.LISTING_BASE_URL}/list/{topic_code}/recent?skip=0&show={page_size}'
+        response = http_client.get(url)
+        response.raise_for_status()
+        path = os.path.join(directory, f'{topic_code}__0.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        print(f'Recorded {path}')
+
+
+def load_corpus(directory, pages, entries):
+    if directory:
+        corpus = []
+        for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+            topic_code = os.path.basename(path).split('__')[0]
+            with open(path, encoding='utf-8') as f:
+                corpus.append((topic_code, f.read()))
+        return corpus
+
+    topics = ['cs.AI', 'cs.LG', 'math.OC', 'physics.optics', 'q-fin.MF']
+    return [(topics[i % len(topics)], mock_arxiv.listing_html(topics[i % len(topics)], 0, 1000, entries))
+            for i in range(pages)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures', help='directory of recorded listing pages')
+    parser.add_argument('--record', metavar='DIR', help='record live listing pages into DIR and exit')
+    parser.add_argument('topics', nargs='*', default=['cs.AI'], help='topics to record')
+    parser.add_argument('--pages', type=int, default=5, help='synthetic pages when no fixtures are given')
+    parser.add_argument('--entries', type=int, default=1000, help='entries per synthetic page / recorded page')
+    parser.add_argument('--repeat', type=int, default=3, help='timing runs per backend')
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record, args.topics, args.entries)
+        return
+
+    corpus = load_corpus(args.fixtures, args.pages, args.entries)
+    if not corpus:
+        print('No pages to parse')
+        return
+
+    reference = None
+    for name, parse in listing_parser.PARSERS.items():
+        results = [parse(html, topic_code) for topic_code, html in corpus]
+        if reference is None:
+            reference_name, reference = name, results
+        elif results != reference:
+            for page, (got, expected) in enumerate(zip(results, reference)):
+                if got != expected:
+                    diff = next((i for i, (a, b) in enumerate(zip(got, expected)) if a != b),
+                                min(len(got), len(expected)))
+                    print(f'{name} differs from {reference_name} on page {page} at entry {diff}')
+                    break
+            raise SystemExit(1)
+
+        best = float('inf')
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            for topic_code, html in corpus:
+                parse(html, topic_code)
+            best = min(best, time.perf_counter() - started)
+
+        entries = sum(len(result) for result in results)
+        print(f'{name:>5}: {best / len(corpus) * 1000:7.1f} ms/page '
+              f'({entries / len(corpus):.0f} entries/page, {len(corpus)} pages)')
+
+    # The incremental parser, fed 16 KiB chunks as arxiv_links_v3 --stream does
+    def parse_stream(html, topic_code):
+        data = html.encode('utf-8')
+        chunks = (data[i:i + 16 * 1024] for i in range(0, len(data), 16 * 1024))
+        return list(listing_parser.parse_entries_stream(chunks, topic_code))
+
+    if [parse_stream(html, topic_code) for topic_code, html in corpus] != reference:
+        print(f'stream differs from {reference_name}')
+        raise SystemExit(1)
+    started = time.perf_counter()
+    for topic_code, html in corpus:
+        parse_stream(html, topic_code)
+    print(f'stream: {(time.perf_counter() - started) / len(corpus) * 1000:6.1f} ms/page')
+
+    print(f'All backends produced identical entries on {len(corpus)} pages')
+
+
+if __name__ == '__main__':
+    main()
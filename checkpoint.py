@@ -0,0 +1,84 @@
+"""Checkpoints that let an interrupted crawl resume where it stopped.
+
+A run writing `data/arxiv_<ts>.csv` keeps its checkpoint in
+`data/arxiv_<ts>.csv.checkpoint/`:
+
+- `pages/<topic>__<skip>.json`: every listing page fetched so far, saved by
+  the worker as soon as it is parsed, so a resumed run never fetches it again.
+- `state.json`: the topics whose rows are in the CSV and the CSV size right
+  after they were flushed. Only the result writer updates it, after an
+  fsync, so it never claims rows that are not on disk.
+
+On resume the CSV is truncated back to the recorded size, which drops rows a
+crash left behind for unfinished topics, and finished topics are skipped.
+Every file is written to a temporary name and renamed into place.
+"""
+import json
+import os
+import shutil
+
+CHECKPOINT_SUFFIX = '.checkpoint'
+
+
+def checkpoint_dir(output_path):
+    return output_path + CHECKPOINT_SUFFIX
+
+
+def _write_json(path, data):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class RunCheckpoint:
+    def __init__(self, directory):
+        self.directory = directory
+        self.pages_dir = os.path.join(directory, 'pages')
+        self.state_path = os.path.join(directory, 'state.json')
+        os.makedirs(self.pages_dir, exist_ok=True)
+
+    def _page_path(self, topic_code, skip):
+        return os.path.join(self.pages_dir, f'{topic_code}__{skip}.json')
+
+    def load_page(self, topic_code, skip):
+        """Return the saved `(total, entries)` of a listing page, or None."""
+        try:
+            with open(self._page_path(topic_code, skip), encoding='utf-8') as f:
+                page = json.load(f)
+        except FileNotFoundError:
+            return None
+        return page['total'], page['entries']
+
+    def save_page(self, topic_code, skip, total, entries):
+        _write_json(self._page_path(topic_code, skip), {'total': total, 'entries': entries})
+
+    def state(self):
+        """Return `{'offset': bytes of output known good, 'done': [finished topics]}`."""
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'offset': None, 'done': []}
+
+    def save_state(self, offset, done):
+        _write_json(self.state_path, {'offset': offset, 'done': sorted(done)})
+
+    def remove(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def prepare_resume(output_path):
+    """Truncate `output_path` to its last checkpointed size; returns the finished topics.
+
+    Raises FileNotFoundError when `output_path` has no checkpoint, e.g. because
+    its run already completed.
+    """
+    directory = checkpoint_dir(output_path)
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f'no checkpoint at {directory}')
+    state = RunCheckpoint(directory).state()
+    if state['offset'] is not None:
+        with open(output_path, 'r+b') as f:
+            f.truncate(state['offset'])
+    return set(state['done'])
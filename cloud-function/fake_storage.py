@@ -0,0 +1,98 @@
+"""Filesystem-backed stand-in for the parts of `google.cloud.storage` main.py uses.
+
+Set `LOCAL_BUCKET_DIR` to run the function locally without GCS:
+
+    LOCAL_BUCKET_DIR=/tmp/buckets functions-framework --target arxiv_scraper
+
+Objects of bucket `b` are files under `$LOCAL_BUCKET_DIR/b/`. A file's
+`st_mtime_ns` stands in for the object generation, so `if_generation_match`
+preconditions behave like they do on GCS.
+"""
+import os
+import shutil
+
+from google.api_core.exceptions import NotFound, PreconditionFailed
+
+
+class Blob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.path = os.path.join(bucket.root, name)
+
+    @property
+    def generation(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def _check_generation(self, if_generation_match):
+        if if_generation_match is not None and (self.generation or 0) != if_generation_match:
+            raise PreconditionFailed(f'{self.name}: generation does not match {if_generation_match}')
+
+    def _replace_with(self, tmp_path):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        os.replace(tmp_path, self.path)
+
+    def upload_from_string(self, data, content_type=None, if_generation_match=None):
+        self._check_generation(if_generation_match)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f'{self.path}.upload'
+        with open(tmp_path, 'wb') as f:
+            f.write(data.encode('utf-8') if isinstance(data, str) else data)
+        self._replace_with(tmp_path)
+
+    def upload_from_filename(self, filename, if_generation_match=None):
+        self._check_generation(if_generation_match)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        shutil.copyfile(filename, f'{self.path}.upload')
+        self._replace_with(f'{self.path}.upload')
+
+    def download_to_filename(self, filename):
+        if not self.exists():
+            raise NotFound(self.name)
+        shutil.copyfile(self.path, filename)
+
+    def download_as_text(self):
+        if not self.exists():
+            raise NotFound(self.name)
+        with open(self.path, encoding='utf-8') as f:
+            return f.read()
+
+    def delete(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            raise NotFound(self.name)
+
+
+class Bucket:
+    def __init__(self, root, name):
+        self.name = name
+        self.root = os.path.join(root, name)
+
+    def blob(self, name):
+        return Blob(self, name)
+
+    def get_blob(self, name):
+        blob = Blob(self, name)
+        return blob if blob.exists() else None
+
+    def list_blobs(self, prefix=''):
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in sorted(filenames):
+                name = os.path.relpath(os.path.join(dirpath, filename), self.root).replace(os.sep, '/')
+                if name.startswith(prefix) and not name.endswith('.upload'):
+                    yield Blob(self, name)
+
+
+class Client:
+    def __init__(self, root):
+        self.root = root
+
+    def bucket(self, name):
+        return Bucket(self.root, name)
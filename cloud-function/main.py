@@ -1,14 +1,147 @@
+import time
+_import_started = time.perf_counter()
+
 import os
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
+import functools
+import json
+import random
 import re
-import time
-from google.cloud import storage
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
 import functions_framework
 
-# Initialize GCS client
-storage_client = storage.Client()
+# Cold-start cost of this instance, reported in every JSON response.
+# requests, bs4 and google-cloud-storage are imported on first use, and the
+# GCS client (whose credential discovery is the slowest part of a cold start)
+# and the HTTP session are only created when a request needs them.
+_startup = {'import_seconds': None, 'storage_client_seconds': None, 'http_session_seconds': None,
+            'cold_start': True}
+_storage = {'client': None}
+_http = {'session': None}
+
+def get_storage_client():
+    """Return the instance's GCS client, creating it on first use.
+
+    A directory-backed fake is used when LOCAL_BUCKET_DIR is set.
+    """
+    if _storage['client'] is None:
+        started = time.perf_counter()
+        if os.environ.get('LOCAL_BUCKET_DIR'):
+            import fake_storage
+            _storage['client'] = fake_storage.Client(os.environ['LOCAL_BUCKET_DIR'])
+        else:
+            from google.cloud import storage
+            _storage['client'] = storage.Client()
+        _startup['storage_client_seconds'] = round(time.perf_counter() - started, 3)
+    return _storage['client']
+
+# Keep-alive HTTP session shared by every fetch, and reused across warm
+# invocations, so arxiv.org connections skip the TCP+TLS handshake.
+# The function deploys on its own, so this mirrors http_client.py at the repo root.
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.75 Safari/537.36"
+
+def get_http_session():
+    """Return the instance's keep-alive session, importing requests and creating it on first use."""
+    if _http['session'] is None:
+        started = time.perf_counter()
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        session.headers.update({"User-Agent": USER_AGENT})
+        session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=4))
+        _http['session'] = session
+        _startup['http_session_seconds'] = round(time.perf_counter() - started, 3)
+    return _http['session']
+
+# Token bucket for arxiv.org requests (same limits as rate_limit.HOST_LIMITS):
+# arXiv's polite rate of one request every 3 seconds unless ARXIV_RATE_LIMIT
+# and ARXIV_RATE_BURST raise it. The function fetches serially from one
+# process, so in-memory state is enough.
+RATE_LIMIT = float(os.environ.get('ARXIV_RATE_LIMIT', 1 / 3))
+RATE_BURST = int(os.environ.get('ARXIV_RATE_BURST', '1'))
+# Parallel shards each get RATE_LIMIT / shards, so the whole run stays within it
+_bucket = {'tokens': float(RATE_BURST), 'updated': time.monotonic(), 'rate': RATE_LIMIT}
+
+# Retry/backoff and circuit breaker settings (same as retry.py)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+THROTTLE_STATUSES = {429, 503}
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+BREAKER_THRESHOLD = 3
+BREAKER_PAUSE = 60.0
+retry_counts = {'retries': 0, 'dropped': 0, 'breaker_trips': 0}
+_throttled = {'count': 0}
+
+def _refill_bucket():
+    now = time.monotonic()
+    _bucket['tokens'] = min(float(RATE_BURST), _bucket['tokens'] + (now - _bucket['updated']) * _bucket['rate'])
+    _bucket['updated'] = now
+
+def _pause_requests(seconds):
+    """Hold back every following request for at least `seconds`."""
+    _refill_bucket()
+    _bucket['tokens'] = min(_bucket['tokens'], 1 - seconds * _bucket['rate'])
+
+def _retry_delay(attempt, status=None, retry_after=None):
+    """Seconds to wait before retrying a failed attempt, or None to give up."""
+    try:
+        retry_after = min(max(float(retry_after), 0.0), 300.0) if retry_after else None
+    except ValueError:
+        retry_after = None
+    if retry_after:
+        _pause_requests(retry_after)
+
+    if status in THROTTLE_STATUSES:
+        _throttled['count'] += 1
+        if _throttled['count'] >= BREAKER_THRESHOLD:
+            print(f"arxiv.org keeps answering {status}, pausing for {BREAKER_PAUSE:.0f}s")
+            _throttled['count'] = 0
+            _pause_requests(BREAKER_PAUSE)
+            retry_counts['breaker_trips'] += 1
+
+    if attempt + 1 >= MAX_ATTEMPTS:
+        retry_counts['dropped'] += 1
+        return None
+    retry_counts['retries'] += 1
+    return max(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)), retry_after or 0.0)
+
+def rate_limited_get(url):
+    """GET `url` on the shared session once a rate-limit token is available.
+
+    429/5xx responses and connection errors are retried with jittered
+    exponential backoff and Retry-After; the last response is returned (or
+    the last error raised) once attempts run out.
+    """
+    session = get_http_session()
+    import requests
+    attempt = 0
+    while True:
+        while True:
+            _refill_bucket()
+            if _bucket['tokens'] >= 1:
+                _bucket['tokens'] -= 1
+                break
+            time.sleep((1 - _bucket['tokens']) / _bucket['rate'])
+
+        try:
+            response = session.get(url, timeout=30)
+        except (requests.ConnectionError, requests.Timeout):
+            delay = _retry_delay(attempt)
+            if delay is None:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUSES:
+                _throttled['count'] = 0
+                return response
+            delay = _retry_delay(attempt, response.status_code, response.headers.get('Retry-After'))
+            if delay is None:
+                return response
+
+        time.sleep(delay)
+        attempt += 1
 
 topic_codes = [
     'cs.AI', 'cs.CL', 'cs.CC', 'cs.CE', 'cs.CG', 'cs.GT', 'cs.CV', 'cs.CR',
@@ -24,96 +157,461 @@ topic_codes = [
     'q-fin.MF', 'econ.TH'
 ]
 
-def get_paper_title(paper_id):
-    """Get the title of a paper from its abstract page."""
-    url = f'https://export.arxiv.org/abs/{paper_id}'
-    useragent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.75 Safari/537.36"
-    
-    try:
-        time.sleep(0.2)  # Rate limiting
-        response = requests.get(url, headers={"User-Agent": useragent}, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        title_tag = soup.find('h1', class_='title')
-        if title_tag:
-            return title_tag.text.replace('Title:', '').strip()
-    except Exception as e:
-        print(f"Error getting title for {paper_id}: {e}")
-    return None
+PAGE_SIZE = 1000
+LISTING_BASE_URL = os.environ.get('ARXIV_LISTING_BASE_URL', 'https://export.arxiv.org')
 
-def download_topic_pdfs(topic_code, total_entries_past_week, entries):
-    """Process a single topic and collect paper information."""
-    if int(total_entries_past_week) == 0:
-        return 0
-    
-    page_size = 1000
-    url = f'https://export.arxiv.org/list/{topic_code}/pastweek?show={page_size}'
-    useragent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.75 Safari/537.36"
+API_BATCH_SIZE = 200
+ATOM_NS = {'atom': 'http://www.w3.org/2005/Atom'}
+
+def get_paper_titles(paper_ids):
+    """Get titles for many papers with batched arXiv API `id_list` queries.
+
+    Only used for ids whose title was missing from the listing page, so in
+    practice this rarely issues more than one request per run.
+    """
+    titles = {}
+    for i in range(0, len(paper_ids), API_BATCH_SIZE):
+        batch = paper_ids[i:i + API_BATCH_SIZE]
+        url = f'https://export.arxiv.org/api/query?id_list={",".join(batch)}&max_results={len(batch)}'
+        
+        try:
+            response = rate_limited_get(url)
+            response.raise_for_status()
+            feed = ElementTree.fromstring(response.content)
+            for entry in feed.findall('atom:entry', ATOM_NS):
+                entry_id = entry.findtext('atom:id', '', ATOM_NS)
+                title = entry.findtext('atom:title', '', ATOM_NS)
+                # <id> is the abs URL with a version suffix, e.g. .../abs/2506.17522v1
+                paper_id = re.sub(r'v\d+$', '', entry_id.rsplit('/abs/', 1)[-1])
+                if title:
+                    titles[paper_id] = ' '.join(title.split())
+        except Exception as e:
+            print(f"Error getting titles for {batch[0]}..{batch[-1]}: {e}")
+    return titles
+
+def parse_listing_page(soup):
+    """Return (paper_id, title) pairs from a listing page, title None if absent."""
+    papers = []
+    for dt in soup.find_all('dt'):
+        pdf_link_tag = dt.find('a', attrs={"title": "Download PDF"})
+        if not pdf_link_tag or not pdf_link_tag.get('href'):
+            continue
+        paper_id = pdf_link_tag.get('href').split('/')[2]
+        
+        title = None
+        dd = dt.find_next_sibling('dd')
+        title_div = dd.find('div', class_='list-title') if dd else None
+        if title_div:
+            title = ' '.join(title_div.get_text().replace('Title:', '').split()) or None
+        papers.append((paper_id, title))
+    return papers
+
+def fetch_listing_page(topic_code, skip, checkpoint=None):
+    """Return the "Total of N entries" count and papers of one listing page.
+
+    Pages already saved in the run's checkpoint are not requested again.
+    """
+    page = checkpoint.load_page(topic_code, skip) if checkpoint else None
+    if page is not None:
+        return page
+
+    url = f'{LISTING_BASE_URL}/list/{topic_code}/pastweek?skip={skip}&show={PAGE_SIZE}'
+    response = rate_limited_get(url)
+    response.raise_for_status()
+
+    num_result = re.search(r'Total of (\d+) entries', response.text, re.IGNORECASE)
+    total = int(num_result.group(1)) if num_result else 0
+    from bs4 import BeautifulSoup
+    papers = parse_listing_page(BeautifulSoup(response.text, 'html.parser'))
+    if checkpoint:
+        checkpoint.save_page(topic_code, skip, total, papers)
+    return total, papers
+
+def download_topic_pdfs(topic_code, entries, checkpoint=None):
+    """Process a single topic and collect paper information.
+
+    The first listing page also carries the "Total of N entries" count, so
+    further pages are only requested when the total exceeds a page. Titles
+    come from the same listing pages; any that are missing are looked up in
+    bulk through the arXiv API.
+    """
     
     try:
-        time.sleep(0.1)
-        response = requests.get(url, headers={"User-Agent": useragent}, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        papers = []
+        skip = 0
+        total_entries_past_week = None
         
-        pdf_links = soup.findAll('a', attrs={"title": "Download PDF"})
-        pdf_links.reverse()
+        while total_entries_past_week is None or skip < total_entries_past_week:
+            total, page_papers = fetch_listing_page(topic_code, skip, checkpoint)
+            
+            if total_entries_past_week is None:
+                total_entries_past_week = total
+                print(f'{topic_code} : {total_entries_past_week}')
+            
+            if not page_papers:
+                break
+            
+            papers.extend(page_papers)
+            skip += PAGE_SIZE
+        
+        papers.reverse()
         
-        local_count = 0
+        missing = [paper_id for paper_id, title in papers if not title]
+        api_titles = get_paper_titles(missing) if missing else {}
         
-        for a in pdf_links:
-            pdf_link = a.get('href')
-            if pdf_link:
-                paper_id = pdf_link.split('/')[2]
-                paper_title = get_paper_title(paper_id)
-                if paper_title:
-                    entries.append(f"{topic_code} | {paper_id} | {paper_title}\n")
-                    local_count += 1
-                else:
-                    entries.append(f"{topic_code} | {paper_id} | [Title not found]\n")
-                    local_count += 1
+        for paper_id, title in papers:
+            paper_title = title or api_titles.get(paper_id) or '[Title not found]'
+            entries.append(f"{topic_code} | {paper_id} | {paper_title}\n")
                 
-        return local_count
+        return len(papers)
         
     except Exception as e:
         print(f"Error processing {topic_code}: {e}")
         return 0
 
-def scan_topics():
-    """Scan all topics and return list of topics with their paper counts."""
-    topic_entries_list = []
-    sum_of_papers = 0
-    
-    for topic_code in topic_codes:
-        time.sleep(0.1)
-        recent_url = f'https://export.arxiv.org/list/{topic_code}/recent'
-        
-        useragent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.75 Safari/537.36"
-        
+# Paper store: the same SQLite schema as paper_store.py at the repo root, kept
+# as a bucket object. Each run downloads it, upserts its papers in one
+# transaction and uploads it back only if nobody else replaced it meanwhile.
+PAPER_DB_BLOB = 'paper_store/papers.db'
+PAPER_DB_PATH = '/tmp/papers.db'
+PAPER_DB_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS papers (
+    paper_id TEXT PRIMARY KEY,
+    title TEXT,
+    announce_date TEXT,
+    first_seen TEXT NOT NULL,
+    run_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS paper_topics (
+    paper_id TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    announce_date TEXT,
+    first_seen TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    PRIMARY KEY (paper_id, topic)
+);
+CREATE INDEX IF NOT EXISTS paper_topics_topic_date ON paper_topics (topic, announce_date);
+'''
+STORE_UPLOAD_ATTEMPTS = 3
+
+def store_papers(bucket, rows, run_id):
+    """Upsert `(topic, paper_id, title)` rows into the bucket's paper store."""
+    from google.api_core.exceptions import PreconditionFailed
+
+    first_seen = datetime.strptime(run_id, "%d_%m_%Y_%H_%M").isoformat(timespec='minutes')
+    papers = [(paper_id, None if title == '[Title not found]' else title, first_seen, run_id)
+              for _, paper_id, title in rows]
+    topics = [(paper_id, topic, first_seen, run_id) for topic, paper_id, _ in rows]
+
+    for attempt in range(STORE_UPLOAD_ATTEMPTS):
+        blob = bucket.get_blob(PAPER_DB_BLOB)
+        if blob:
+            blob.download_to_filename(PAPER_DB_PATH)
+            generation = blob.generation
+        else:
+            if os.path.exists(PAPER_DB_PATH):
+                os.remove(PAPER_DB_PATH)
+            generation = 0  # only create it if it still does not exist
+
+        conn = sqlite3.connect(PAPER_DB_PATH)
         try:
-            response = requests.get(recent_url, headers={"User-Agent": useragent}, timeout=30)
-            response.raise_for_status()
-            
-            num_result = re.search(r'Total of (\d+) entries', response.text, re.IGNORECASE)
-            total_entries_past_week = 0
-            
-            if num_result:
-                total_entries_past_week = int(num_result.group(1))
-                sum_of_papers += total_entries_past_week
-            
-            print(f'{topic_code} : {total_entries_past_week}')
-            topic_entries_list.append((topic_code, str(total_entries_past_week)))
-            
-        except Exception as e:
-            print(f"Error scanning {topic_code}: {e}")
-            topic_entries_list.append((topic_code, "0"))
-    
-    print(f'sum of papers {sum_of_papers}')
-    return topic_entries_list
+            conn.executescript(PAPER_DB_SCHEMA)
+            with conn:
+                conn.executemany('''
+                    INSERT INTO papers (paper_id, title, first_seen, run_id) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (paper_id) DO UPDATE SET title = COALESCE(excluded.title, papers.title)
+                ''', papers)
+                conn.executemany('''
+                    INSERT OR IGNORE INTO paper_topics (paper_id, topic, first_seen, run_id) VALUES (?, ?, ?, ?)
+                ''', topics)
+        finally:
+            conn.close()
+
+        try:
+            bucket.blob(PAPER_DB_BLOB).upload_from_filename(PAPER_DB_PATH, if_generation_match=generation)
+            return len(papers)
+        except PreconditionFailed:
+            print(f"Paper store changed during upload, retrying ({attempt + 1}/{STORE_UPLOAD_ATTEMPTS})")
+    raise RuntimeError("Paper store kept changing during upload")
+
+# Checkpoints: a run keeps its progress under arxiv_papers/checkpoints/<name>/
+# (listing pages, finished topics and the time used so far) and stops
+# between topics once it nears the function timeout, answering 503 so Cloud
+# Scheduler (or the coordinator) calls it again to carry on. A crashed run
+# resumes the same way; nothing already fetched is requested again.
+FUNCTION_TIMEOUT = int(os.environ.get('FUNCTION_TIMEOUT', '540'))
+DEADLINE_MARGIN = 60  # seconds kept for uploading the log and paper store
+# A checkpoint older than this belongs to a run that never finished, not to
+# the current one; keep it below the scheduler's interval (weekly)
+CHECKPOINT_MAX_AGE = float(os.environ.get('CHECKPOINT_MAX_AGE', 6 * 86400))
+CHECKPOINT_PREFIX = 'arxiv_papers/checkpoints'
+
+class RunCheckpoint:
+    """Progress of one run (or one shard of it) kept as bucket objects.
+
+    - `state.json`: run id, creation time, finished topics, seconds used and invocations
+    - `pages/<topic>__<skip>.json`: every listing page fetched so far
+    - `topics/<topic>.log`: log lines of each finished topic
+    """
+
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.prefix = f'{CHECKPOINT_PREFIX}/{name}/'
+
+    def _load(self, name):
+        blob = self.bucket.get_blob(self.prefix + name)
+        return blob.download_as_text() if blob else None
+
+    def _save(self, name, text, content_type='application/json'):
+        self.bucket.blob(self.prefix + name).upload_from_string(text, content_type=content_type)
+
+    def state(self):
+        state = self._load('state.json')
+        return json.loads(state) if state else {'run_id': None, 'created': time.time(), 'done_topics': [],
+                                                'elapsed': 0.0, 'invocations': 0}
+
+    def save_state(self, state):
+        self._save('state.json', json.dumps(state))
+
+    def load_page(self, topic_code, skip):
+        page = self._load(f'pages/{topic_code}__{skip}.json')
+        if page is None:
+            return None
+        page = json.loads(page)
+        return page['total'], [tuple(paper) for paper in page['papers']]
+
+    def save_page(self, topic_code, skip, total, papers):
+        self._save(f'pages/{topic_code}__{skip}.json', json.dumps({'total': total, 'papers': papers}))
+
+    def topic_entries(self, topic_code):
+        return (self._load(f'topics/{topic_code}.log') or '').splitlines(keepends=True)
+
+    def finish_topic(self, state, topic_code, entries):
+        self._save(f'topics/{topic_code}.log', ''.join(entries), content_type='text/plain')
+        state['done_topics'].append(topic_code)
+        self.save_state(state)
+
+    def remove(self):
+        for blob in self.bucket.list_blobs(prefix=self.prefix):
+            blob.delete()
+
+def start_invocation(checkpoint, run_id):
+    """Count this invocation in the checkpoint; returns its state.
+
+    A checkpoint older than CHECKPOINT_MAX_AGE is left over from a run that
+    ran out of retries. It is discarded, so this run starts afresh instead of
+    carrying on with the old run id and its cached pages and results; the
+    state records the discarded run id under `discarded_run_id`.
+    """
+    state = checkpoint.state()
+    if state['run_id'] and time.time() - state.get('created', 0) > CHECKPOINT_MAX_AGE:
+        print(f"Discarding the checkpoint of unfinished run {state['run_id']}")
+        checkpoint.remove()
+        state = {**checkpoint.state(), 'discarded_run_id': state['run_id']}
+    state['run_id'] = state['run_id'] or run_id
+    state['invocations'] += 1
+    checkpoint.save_state(state)
+    return state
+
+def run_progress(state):
+    """Time and invocations used by a run, and the stale run it replaced if any."""
+    progress = {'elapsed': round(state['elapsed'], 1), 'invocations': state['invocations']}
+    if state.get('discarded_run_id'):
+        progress['discarded_run_id'] = state['discarded_run_id']
+    return progress
+
+def incomplete_result(state, extra=None):
+    """503 response for a run that stopped before its deadline and will be resumed."""
+    return {
+        'status': 'incomplete',
+        'run_id': state['run_id'],
+        'done_topics': len(state['done_topics']),
+        **run_progress(state),
+        **(extra or {})
+    }, 503
+
+# Sharded runs: a coordinator invocation splits topic_codes into SHARD_COUNT
+# contiguous slices, invokes this function once per slice in parallel and
+# merges the per-shard logs into the usual arxiv_papers/arxiv_<ts>.log.
+SHARD_COUNT = int(os.environ.get('SHARD_COUNT', '1'))
+FUNCTION_URL = os.environ.get('FUNCTION_URL')
+SHARD_ATTEMPTS = 2  # failed calls per shard before it counts as failed
+LOG_HEADER = ["Topic | Paper ID | Title\n", "-" * 100 + "\n"]
+
+def topics_for_shard(shard, shards):
+    """Contiguous slice of topic_codes, so merged shards keep the topic order."""
+    return topic_codes[shard * len(topic_codes) // shards:(shard + 1) * len(topic_codes) // shards]
+
+def shard_name(shard, shards):
+    return f'shard_{shard:03d}_of_{shards:03d}'
+
+def shard_blob_name(run_id, shard, shards):
+    return f'arxiv_papers/shards/{run_id}/{shard_name(shard, shards)}.log'
+
+def scrape_topics(topics, checkpoint=None, state=None, deadline=None):
+    """Scrape `topics` serially; returns their log lines, paper count and
+    whether every topic is done.
+
+    With a checkpoint, topics finished by earlier invocations are read back
+    from it, each newly finished topic is saved to it, and no new topic is
+    started after `deadline` (a `time.monotonic()` value).
+    """
+    entries = []
+    total_downloaded = 0
+    started = time.monotonic()
+    elapsed = state['elapsed'] if state else 0.0
+    for topic_code in topics:
+        if state and topic_code in state['done_topics']:
+            topic_entries = checkpoint.topic_entries(topic_code)
+            entries.extend(topic_entries)
+            total_downloaded += len(topic_entries)
+            continue
+        if deadline and time.monotonic() >= deadline:
+            print(f'Stopping before the deadline with {len(state["done_topics"])}/{len(topics)} topics done')
+            state['elapsed'] = elapsed + time.monotonic() - started
+            checkpoint.save_state(state)
+            return entries, total_downloaded, False
+
+        topic_entries = []
+        total_downloaded += download_topic_pdfs(topic_code, topic_entries, checkpoint)
+        entries.extend(topic_entries)
+        if checkpoint:
+            state['elapsed'] = elapsed + time.monotonic() - started
+            checkpoint.finish_topic(state, topic_code, topic_entries)
+    return entries, total_downloaded, True
+
+def write_run_log(bucket, bucket_name, run_id, entries, start_time, extra):
+    """Upload the run's log, record it in the paper store and build the response."""
+    blob = bucket.blob(f'arxiv_papers/arxiv_{run_id}.log')
+    blob.upload_from_string(''.join(LOG_HEADER + entries))
+
+    store_papers(bucket, [line.rstrip('\n').split(' | ', 2) for line in entries], run_id)
+
+    return {
+        'duration': str(datetime.now() - start_time),
+        'log_file': f'gs://{bucket_name}/arxiv_papers/arxiv_{run_id}.log',
+        'paper_store': f'gs://{bucket_name}/{PAPER_DB_BLOB}',
+        **extra
+    }
+
+def _invoke_shard(function_url, run_id, shard, shards, deadline):
+    """Call this function for one shard until it finishes.
+
+    A shard that stops before its own deadline is called again to resume
+    from its checkpoint. Returns its JSON result, `{'status': 'incomplete'}`
+    if the coordinator's `deadline` comes first, or None if it failed.
+    """
+    import requests
+    headers = {}
+    try:
+        import google.auth.transport.requests
+        import google.oauth2.id_token
+        token = google.oauth2.id_token.fetch_id_token(google.auth.transport.requests.Request(), function_url)
+        headers['Authorization'] = f'Bearer {token}'
+    except Exception as e:
+        # No service account credentials (e.g. running locally): call without a token
+        print(f"No ID token for shard calls: {e}")
+
+    failures = 0
+    while failures < SHARD_ATTEMPTS:
+        remaining = deadline - time.monotonic()
+        # The shard stops early enough to answer before the coordinator's own deadline
+        budget = remaining - DEADLINE_MARGIN / 2
+        if budget <= 0:
+            return {'status': 'incomplete'}
+        try:
+            response = requests.post(function_url, json={'mode': 'shard', 'run_id': run_id, 'shard': shard,
+                                                         'shards': shards, 'budget': budget},
+                                     headers=headers, timeout=remaining)
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code == 503 and response.headers.get('Content-Type', '').startswith('application/json'):
+                print(f"Shard {shard}/{shards} stopped early, resuming it: {response.json()}")
+                continue
+            print(f"Shard {shard}/{shards} answered {response.status_code}: {response.text[:200]}")
+        except requests.Timeout:
+            # The shard keeps its checkpoint; the coordinator's next invocation resumes it
+            return {'status': 'incomplete'}
+        except requests.RequestException as e:
+            print(f"Shard {shard}/{shards} failed: {e}")
+        failures += 1
+    return None
+
+def run_coordinator(bucket, bucket_name, run_id, shards, function_url, start_time, checkpoint, deadline):
+    """Run every shard, then merge their logs.
+
+    If some shard is still unfinished at the coordinator's deadline, it
+    answers 503 and keeps its checkpoint, so the next invocation reuses the
+    run id: finished shards return their saved result at once and the others
+    resume from their own checkpoints.
+    """
+    started = time.monotonic()
+    state = start_invocation(checkpoint, run_id)
+    run_id = state['run_id']
+    if state.get('discarded_run_id') and state['invocations'] == 1:
+        # The stale run's shards are keyed by its run id; drop their checkpoints too
+        RunCheckpoint(bucket, state['discarded_run_id']).remove()
+    with ThreadPoolExecutor(max_workers=shards) as executor:
+        results = list(executor.map(lambda shard: _invoke_shard(function_url, run_id, shard, shards, deadline),
+                                    range(shards)))
+
+    incomplete_shards = [shard for shard, shard_result in enumerate(results)
+                         if shard_result and shard_result.get('status') == 'incomplete']
+    if incomplete_shards:
+        state['elapsed'] += time.monotonic() - started
+        checkpoint.save_state(state)
+        return incomplete_result(state, {'incomplete_shards': incomplete_shards})
+
+    entries = []
+    totals = {'files_downloaded': 0, **{counter: 0 for counter in retry_counts}}
+    failed_shards = []
+    for shard, shard_result in enumerate(results):
+        blob = bucket.get_blob(shard_blob_name(run_id, shard, shards))
+        if shard_result is None or blob is None:
+            failed_shards.append(shard)
+            continue
+        entries.extend(blob.download_as_text().splitlines(keepends=True))
+        for counter in totals:
+            totals[counter] += shard_result.get(counter, 0)
+        blob.delete()
+
+    print(f'sum of papers {totals["files_downloaded"]} from {shards - len(failed_shards)}/{shards} shards')
+    result = write_run_log(bucket, bucket_name, run_id, entries, start_time,
+                           {**totals, 'shards': shards, 'failed_shards': failed_shards,
+                            **run_progress({**state, 'elapsed': state['elapsed'] + time.monotonic() - started})})
+    for shard in range(shards):
+        RunCheckpoint(bucket, f'{run_id}/{shard_name(shard, shards)}').remove()
+    checkpoint.remove()
+    return result, 500 if failed_shards else 200
+
+def report_startup(handler):
+    """Add the instance's startup timings to every JSON response of `handler`."""
+    @functools.wraps(handler)
+    def wrapper(request):
+        result, status = handler(request)
+        if isinstance(result, dict):
+            result = {**result, 'startup': dict(_startup)}
+        _startup['cold_start'] = False
+        return result, status
+    return wrapper
 
 @functions_framework.http
+@report_startup
 def arxiv_scraper(request):
     """HTTP Cloud Function to scrape arXiv papers.
+
+    Parameters come from the query string or a JSON body:
+
+    - no parameters: scrape every topic, in SHARD_COUNT parallel shards when
+      it is above 1 (coordinator mode), otherwise serially in this invocation.
+    - `mode=coordinator&shards=N`: fan out N shards and merge their logs.
+    - `mode=shard&shard=I&shards=N&run_id=TS`, or `topics=cs.AI,cs.LG`: scrape
+      only that slice and write it to arxiv_papers/shards/<run_id>/.
+
+    Each mode stops early with a 503 `{"status": "incomplete"}` answer when
+    FUNCTION_TIMEOUT is about to run out; calling it again with the same
+    parameters resumes from its checkpoint.
+
     Args:
         request (flask.Request): The request object.
     Returns:
@@ -122,42 +620,79 @@ def arxiv_scraper(request):
     """
     # Get environment variables
     bucket_name = os.environ.get('BUCKET_NAME', 'your-bucket-name')
+    params = {**request.args.to_dict(), **(request.get_json(silent=True) or {})}
     
     try:
         start_time = datetime.now()
-        execution_timestamp = datetime.today().strftime("%d_%m_%Y_%H_%M")
+        deadline = time.monotonic() + FUNCTION_TIMEOUT - DEADLINE_MARGIN
+        execution_timestamp = params.get('run_id') or datetime.today().strftime("%d_%m_%Y_%H_%M")
+        for counter in retry_counts:
+            retry_counts[counter] = 0
+        _bucket['rate'] = RATE_LIMIT
         
-        # Initialize entries list with header
-        entries = ["Topic | Paper ID | Title\n", "-" * 100 + "\n"]
+        if not topic_codes:
+            return "No topics to process", 400
         
-        # Get topic entries
-        topic_entries = scan_topics()
+        bucket = get_storage_client().bucket(bucket_name)
+        shards = int(params.get('shards', SHARD_COUNT))
+        mode = params.get('mode') or ('shard' if 'topics' in params else
+                                      'coordinator' if shards > 1 else 'all')
         
-        if not topic_entries:
-            return "No topics to process", 400
-            
-        # Process each topic
-        total_downloaded = 0
-        for topic_code, count in topic_entries:
-            papers_count = download_topic_pdfs(topic_code, count, entries)
-            total_downloaded += papers_count
-            
-        # Upload results to GCS
-        bucket = storage_client.bucket(bucket_name)
-        blob = bucket.blob(f'arxiv_papers/arxiv_{execution_timestamp}.log')
-        blob.upload_from_string(''.join(entries))
+        if mode == 'coordinator':
+            function_url = FUNCTION_URL or request.base_url
+            return run_coordinator(bucket, bucket_name, execution_timestamp, shards, function_url, start_time,
+                                   RunCheckpoint(bucket, 'coordinator'), deadline)
         
-        end_time = datetime.now()
-        duration = end_time - start_time
+        if mode == 'shard':
+            if 'topics' in params:
+                topics = params['topics'].split(',') if isinstance(params['topics'], str) else params['topics']
+                shard, shards = 0, 1
+            else:
+                shard = int(params['shard'])
+                topics = topics_for_shard(shard, shards)
+                _bucket['rate'] = RATE_LIMIT / shards
+            if 'budget' in params:
+                deadline = min(deadline, time.monotonic() + float(params['budget']))
+            # Kept until the coordinator has merged the shard, which may be a later invocation
+            checkpoint = RunCheckpoint(bucket, f'{execution_timestamp}/{shard_name(shard, shards)}')
+            state = start_invocation(checkpoint, execution_timestamp)
+            if 'result' in state:
+                return state['result'], 200
+            entries, total_downloaded, complete = scrape_topics(topics, checkpoint, state, deadline)
+            if not complete:
+                return incomplete_result(state)
+            shard_blob = shard_blob_name(execution_timestamp, shard, shards)
+            bucket.blob(shard_blob).upload_from_string(''.join(entries))
+            print(f'shard {shard}/{shards}: {total_downloaded} papers from {len(topics)} topics')
+            state['result'] = {
+                'files_downloaded': total_downloaded,
+                'topics': topics,
+                'duration': str(datetime.now() - start_time),
+                'shard_file': f'gs://{bucket_name}/{shard_blob}',
+                **run_progress(state),
+                **retry_counts
+            }
+            if 'topics' in params:
+                checkpoint.remove()  # no coordinator will merge this one
+            else:
+                checkpoint.save_state(state)
+            return state['result'], 200
         
-        result = {
-            'files_downloaded': total_downloaded,
-            'duration': str(duration),
-            'log_file': f'gs://{bucket_name}/arxiv_papers/arxiv_{execution_timestamp}.log'
-        }
+        # Process each topic, resuming an unfinished run if the last invocation stopped early
+        checkpoint = RunCheckpoint(bucket, 'all')
+        state = start_invocation(checkpoint, execution_timestamp)
+        entries, total_downloaded, complete = scrape_topics(topic_codes, checkpoint, state, deadline)
+        if not complete:
+            return incomplete_result(state)
+        print(f'sum of papers {total_downloaded}')
         
+        result = write_run_log(bucket, bucket_name, state['run_id'], entries, start_time,
+                               {'files_downloaded': total_downloaded, **run_progress(state), **retry_counts})
+        checkpoint.remove()
         return result, 200
         
     except Exception as error:
         print(f"Function execution error: {error}")
         return str(error), 500
+
+_startup['import_seconds'] = round(time.perf_counter() - _import_started, 3)
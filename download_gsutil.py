@@ -1,50 +1,85 @@
 import pandas as pd
-import concurrent.futures
-import subprocess
+import argparse
 import os
+import re
+from datetime import datetime
 
-def parse_file(file_path):
-    data = []
+import gcs_dataset
 
-    with open(file_path, 'r') as file:
-        for line in file:
-            subject_code, paper = line.strip().split(' ', 1)
-            data.append((subject_code, paper))
+CHUNK_SIZE = 100_000  # log lines parsed per DataFrame chunk
+DOWNLOAD_DIR = os.path.expanduser('~/Downloads/papers/script/downloads')
 
-    return data
+def run_date(file_path):
+    """Run date encoded in a log name like arxiv_28_01_2024_09_54.log, or None."""
+    match = re.search(r'(\d{2}_\d{2}_\d{4})_\d{2}_\d{2}', os.path.basename(file_path))
+    return datetime.strptime(match.group(1), '%d_%m_%Y').date() if match else None
 
-def download_paper(gs_path, local_path):
-    gsutil_cp_command = ['gsutil', 'cp', gs_path, local_path]
-    subprocess.run(gsutil_cp_command, check=True)
+def paper_number(papers):
+    """Vectorized arXiv id -> yymm * 100000 + number, matching paper_index.encode."""
+    parts = papers.str.split('.', n=1, expand=True)
+    return pd.to_numeric(parts[0], errors='coerce') * 100000 + pd.to_numeric(
+        parts[1].str.replace(r'v\d+$', '', regex=True), errors='coerce')
 
-def paper_link(subject_code, paper, yymm):
-    v2_gs_path = f"gs://arxiv-dataset/arxiv/arxiv/pdf/{paper.split('.')[0]}/{paper}v2.pdf"
-    v1_gs_path = f"gs://arxiv-dataset/arxiv/arxiv/pdf/{paper.split('.')[0]}/{paper}v1.pdf"
+def iter_log_chunks(file_paths, topics=None, id_range=None, run_dates=None, chunksize=CHUNK_SIZE):
+    """Yield DataFrames of the `topic id` log lines matching every given filter.
 
-    local_path = os.path.join(os.path.expanduser(f'~/Downloads/papers/script/downloads/{subject_code}/'), f'{paper}.pdf')
-    # logging.info(f"Downloading {v2_gs_path} or {v1_gs_path} to {local_path}")
-    print(f"Downloading {v2_gs_path} or {v1_gs_path} to {local_path}")
+    Logs are read `chunksize` lines at a time with the topic as a categorical,
+    so memory stays bounded however many logs are scanned.
 
-    try:
-        if subprocess.call(['gsutil', 'ls', v2_gs_path]) == 0:
-            download_paper(v2_gs_path, local_path)
-        else:
-            download_paper(v1_gs_path, local_path)
-    except Exception as e:
-        logging.error(f"Error downloading {v2_gs_path} or {v1_gs_path}: {e}")
+    Args:
+        file_paths: v2 `arxiv_<dd_mm_yyyy_hh_mm>.log` files.
+        topics: keep only these topic codes.
+        id_range: inclusive `(first_id, last_id)`, either end may be None.
+        run_dates: inclusive `(first_date, last_date)` of the run; files outside
+            it are skipped without being opened.
+    """
+    first_date, last_date = run_dates or (None, None)
+    first_id, last_id = id_range or (None, None)
 
+    for file_path in sorted(file_paths):
+        date = run_date(file_path)
+        if (first_date and (date is None or date < first_date)) or (last_date and (date is None or date > last_date)):
+            continue
 
-if __name__ == "__main__":
+        for chunk in pd.read_csv(file_path, sep=' ', header=None, names=['Subject Code', 'Paper'],
+                                 dtype={'Subject Code': 'category', 'Paper': str},
+                                 chunksize=chunksize, on_bad_lines='skip'):
+            mask = pd.Series(True, index=chunk.index)
+            if topics:
+                mask &= chunk['Subject Code'].isin(topics)
+            if first_id or last_id:
+                numbers = paper_number(chunk['Paper'])
+                if first_id:
+                    mask &= numbers >= paper_number(pd.Series([first_id]))[0]
+                if last_id:
+                    mask &= numbers <= paper_number(pd.Series([last_id]))[0]
 
-    filename = 'arxiv_28_01_2024_09_54.log'
-    yymm = "23" + filename.split('_')[2][:4]
+            selected = chunk[mask]
+            if not selected.empty:
+                yield selected.assign(**{'Run Date': date})
 
-    file_path = 'data' + '/' + filename
-    parsed_data = parse_file(file_path)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Download logged papers from the arXiv GCS dataset.')
+    parser.add_argument('files', nargs='*', default=['data/arxiv_28_01_2024_09_54.log'], help='v2 log files')
+    parser.add_argument('--topics', nargs='+', default=['cs.LG'], help='topic codes to download')
+    parser.add_argument('--first-id', help='lowest paper id to download, e.g. 2401.00001')
+    parser.add_argument('--last-id', help='highest paper id to download')
+    parser.add_argument('--since', type=datetime.fromisoformat, help='first run date (YYYY-MM-DD)')
+    parser.add_argument('--until', type=datetime.fromisoformat, help='last run date (YYYY-MM-DD)')
+    parser.add_argument('--list', action='store_true', help='print the matching papers instead of downloading')
+    parser.add_argument('--bucket', default=gcs_dataset.DATASET_BUCKET,
+                        help='gs://bucket, or a local directory with the same layout')
+    parser.add_argument('--download-dir', default=DOWNLOAD_DIR)
+    parser.add_argument('--workers', type=int, default=gcs_dataset.DEFAULT_WORKERS)
+    args = parser.parse_args()
 
-    df = pd.DataFrame(parsed_data, columns=['Subject Code', 'Paper'])
-    filtered_df = df.loc[df['Subject Code'] == 'cs.LG']
-    print(filtered_df)
+    chunks = iter_log_chunks(args.files, topics=set(args.topics), id_range=(args.first_id, args.last_id),
+                             run_dates=(args.since and args.since.date(), args.until and args.until.date()))
 
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        executor.map(paper_link, filtered_df['Subject Code'], df['Paper'], [yymm] * len(df))
+    resolver = None if args.list else gcs_dataset.VersionResolver(gcs_dataset.open_bucket(args.bucket))
+    for filtered_df in chunks:
+        print(filtered_df)
+        if resolver:
+            downloaded, missing, failed = gcs_dataset.download_papers(
+                resolver, zip(filtered_df['Subject Code'], filtered_df['Paper']), args.download_dir, args.workers)
+            print(f'Downloaded {downloaded}, not in dataset {missing}, failed {failed}')
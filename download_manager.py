@@ -0,0 +1,123 @@
+"""Concurrent PDF downloads from a flat (topic, paper_id) work queue.
+
+The listing stage produces one job per paper; the manager runs them on a
+shared thread pool, with at most `per_host_concurrency` downloads in flight
+to any one host. A big topic is therefore spread over every connection
+instead of a single worker, and total wall time tracks bandwidth rather than
+the largest topic. Progress (papers done, failures, MB and MB/s) is printed
+every `progress_interval` seconds.
+"""
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+
+import pdf_download
+import rate_limit
+
+DEFAULT_PER_HOST_CONCURRENCY = 4
+PDF_BASE_URL = 'https://export.arxiv.org'
+
+
+class DownloadStats:
+    """Thread-safe counters for one download run."""
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes = 0
+        self.completed = []  # (topic_code, paper_id) jobs whose PDF is now on disk
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, fetched=0, failed=False, job=None):
+        with self._lock:
+            self.done += 1
+            if failed:
+                self.failed += 1
+            else:
+                if fetched == 0:
+                    self.skipped += 1
+                if job:
+                    self.completed.append(job)
+            self.bytes += fetched
+
+    def summary(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (f"{self.done}/{self.total} papers, {self.skipped} already present, "
+                f"{self.failed} failed, {self.bytes / 1e6:.1f} MB "
+                f"({self.bytes / 1e6 / elapsed:.2f} MB/s)")
+
+
+class DownloadManager:
+    """Download `(topic_code, paper_id)` jobs into `<download_dir>/<topic_code>/<paper_id>.pdf`."""
+
+    def __init__(self, download_dir, per_host_concurrency=DEFAULT_PER_HOST_CONCURRENCY,
+                 base_url=PDF_BASE_URL, progress_interval=5.0):
+        self.download_dir = download_dir
+        self.per_host_concurrency = per_host_concurrency
+        self.base_url = base_url
+        self.progress_interval = progress_interval
+        self._host_slots = defaultdict(lambda: threading.BoundedSemaphore(per_host_concurrency))
+        self._host_slots_lock = threading.Lock()
+
+    def pdf_url(self, paper_id):
+        return f'{self.base_url}/pdf/{paper_id}'
+
+    def _host_slot(self, url):
+        with self._host_slots_lock:
+            return self._host_slots[rate_limit.host_of(url)]
+
+    def _worker(self, jobs, stats):
+        while True:
+            try:
+                topic_code, paper_id = jobs.get_nowait()
+            except queue.Empty:
+                return
+
+            url = self.pdf_url(paper_id)
+            filename = os.path.join(self.download_dir, topic_code, f'{paper_id}.pdf')
+            try:
+                with self._host_slot(url):
+                    fetched = pdf_download.download_pdf(url, filename)
+                stats.record(fetched, job=(topic_code, paper_id))
+            except Exception as e:
+                print(f"Error downloading {topic_code} {paper_id}: {e}")
+                stats.record(failed=True)
+
+    def _report_progress(self, stats, finished):
+        while not finished.wait(self.progress_interval):
+            print(f"{time.strftime('%H:%M:%S')} {stats.summary()}")
+
+    def run(self, jobs, workers=None):
+        """Download every job and return the run's `DownloadStats`.
+
+        `workers` defaults to `per_host_concurrency`, which is enough when all
+        PDFs come from one host; raise it when jobs span several hosts.
+        """
+        jobs = list(jobs)
+        for topic_code in {topic_code for topic_code, _ in jobs}:
+            os.makedirs(os.path.join(self.download_dir, topic_code), exist_ok=True)
+
+        work = queue.Queue()
+        for job in jobs:
+            work.put(job)
+
+        stats = DownloadStats(len(jobs))
+        finished = threading.Event()
+        reporter = threading.Thread(target=self._report_progress, args=(stats, finished), daemon=True)
+        reporter.start()
+
+        threads = [threading.Thread(target=self._worker, args=(work, stats))
+                   for _ in range(workers or self.per_host_concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        finished.set()
+        print(f"{time.strftime('%H:%M:%S')} {stats.summary()}")
+        return stats
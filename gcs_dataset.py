@@ -0,0 +1,148 @@
+"""Bulk access to the arXiv PDF dataset on Google Cloud Storage.
+
+PDFs live at `gs://arxiv-dataset/arxiv/arxiv/pdf/<yymm>/<paper_id>v<N>.pdf`.
+Instead of a `gsutil ls` and a `gsutil cp` subprocess per paper,
+`VersionResolver` lists each `<yymm>/` prefix once and maps every paper id in
+it to its latest version. `download_papers` then fetches the resolved objects
+on a thread pool that shares one storage client.
+
+`LocalBucket` serves the same layout from a directory, so resolution and
+downloads can be exercised without credentials or network access:
+
+    data/fake-bucket/arxiv/arxiv/pdf/2401/2401.00001v2.pdf
+"""
+import concurrent.futures
+import os
+import re
+import shutil
+import threading
+
+import pdf_download
+
+DATASET_BUCKET = 'gs://arxiv-dataset'
+PDF_PREFIX = 'arxiv/arxiv/pdf'
+DEFAULT_WORKERS = 8
+
+_OBJECT_RE = re.compile(r'/(?P<paper_id>[^/]+)v(?P<version>\d+)\.pdf$')
+
+
+class GCSBucket:
+    """A GCS bucket accessed through one shared `storage.Client`."""
+
+    def __init__(self, name, client=None):
+        if client is None:
+            # Imported here so the local fake bucket needs no Google libraries
+            from google.cloud import storage
+            client = storage.Client()
+        self.name = name
+        self._bucket = client.bucket(name)
+
+    def list_names(self, prefix):
+        return (blob.name for blob in self._bucket.list_blobs(prefix=prefix, fields='items(name),nextPageToken'))
+
+    def download(self, name, local_path):
+        self._bucket.blob(name).download_to_filename(local_path)
+
+
+class LocalBucket:
+    """A directory standing in for a bucket: object names are paths below `root`."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def list_names(self, prefix):
+        directory = os.path.join(self.root, os.path.dirname(prefix))
+        if not os.path.isdir(directory):
+            return
+        for dirpath, _, filenames in os.walk(directory):
+            for filename in filenames:
+                name = os.path.relpath(os.path.join(dirpath, filename), self.root).replace(os.sep, '/')
+                if name.startswith(prefix):
+                    yield name
+
+    def download(self, name, local_path):
+        shutil.copyfile(os.path.join(self.root, name), local_path)
+
+
+def open_bucket(location):
+    """`gs://bucket` opens the real bucket; anything else is a `LocalBucket` directory."""
+    if location.startswith('gs://'):
+        return GCSBucket(location[len('gs://'):].rstrip('/'))
+    return LocalBucket(location)
+
+
+class VersionResolver:
+    """Map paper ids to the object holding their latest version, one listing per month."""
+
+    def __init__(self, bucket, prefix=PDF_PREFIX):
+        self.bucket = bucket
+        self.prefix = prefix
+        self._months = {}  # yymm -> {paper_id: (version, object name)}
+        self._lock = threading.Lock()
+
+    def _month(self, yymm):
+        with self._lock:
+            if yymm not in self._months:
+                latest = {}
+                for name in self.bucket.list_names(f'{self.prefix}/{yymm}/'):
+                    match = _OBJECT_RE.search(name)
+                    if not match:
+                        continue
+                    version = int(match.group('version'))
+                    paper_id = match.group('paper_id')
+                    if version > latest.get(paper_id, (0, None))[0]:
+                        latest[paper_id] = (version, name)
+                self._months[yymm] = latest
+            return self._months[yymm]
+
+    def resolve(self, paper_id):
+        """Object name of the latest version of `paper_id`, or None if the dataset lacks it."""
+        entry = self._month(paper_id.split('.')[0]).get(paper_id)
+        return entry[1] if entry else None
+
+    def resolve_many(self, paper_ids):
+        """Return {paper_id: object name}, listing each month prefix only once."""
+        resolved = {}
+        for paper_id in paper_ids:
+            name = self.resolve(paper_id)
+            if name:
+                resolved[paper_id] = name
+        return resolved
+
+
+def _download(bucket, name, local_path):
+    if pdf_download.is_complete_pdf(local_path):
+        return False
+    os.makedirs(os.path.dirname(local_path), exist_ok=True)
+    part_path = local_path + pdf_download.PART_SUFFIX
+    bucket.download(name, part_path)
+    os.replace(part_path, local_path)
+    return True
+
+
+def download_papers(resolver, jobs, download_dir, workers=DEFAULT_WORKERS):
+    """Download `(topic_code, paper_id)` jobs to `<download_dir>/<topic_code>/<paper_id>.pdf`.
+
+    Returns `(downloaded, missing, failed)` job counts; missing papers are not
+    in the dataset (yet).
+    """
+    jobs = list(jobs)
+    resolved = resolver.resolve_many(paper_id for _, paper_id in jobs)
+    downloaded = failed = 0
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_download, resolver.bucket, resolved[paper_id],
+                            os.path.join(download_dir, topic_code, f'{paper_id}.pdf')): (topic_code, paper_id)
+            for topic_code, paper_id in jobs if paper_id in resolved
+        }
+        for future in concurrent.futures.as_completed(futures):
+            topic_code, paper_id = futures[future]
+            try:
+                downloaded += future.result()
+            except Exception as e:
+                print(f"Error downloading {topic_code} {paper_id}: {e}")
+                failed += 1
+
+    missing = sum(1 for _, paper_id in jobs if paper_id not in resolved)
+    return downloaded, missing, failed
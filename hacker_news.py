@@ -1,51 +1,52 @@
-import requests
-import time
+import argparse
+import hn_fetch
+import retry
 import csv
 import os
 from datetime import datetime
 
-BASE_URL = "https://hn.algolia.com/api/v1/search_by_date"
 QUERY = "github.io"
-HITS_PER_PAGE = 100
-MAX_PAGES = 10  # Adjust if needed
+CURSOR_NAME = "github.io"
 
-def fetch_github_io_stories():
-    all_results = []
-    for page in range(MAX_PAGES):
-        params = {
-            "query": QUERY,
-            "tags": "story",
-            "hitsPerPage": HITS_PER_PAGE,
-            "page": page
-        }
-        resp = requests.get(BASE_URL, params=params)
-        if resp.status_code != 200:
-            print(f"Failed at page {page}")
-            break
-        data = resp.json()
-        hits = data.get("hits", [])
-        if not hits:
-            break
+def fetch_github_io_stories(cursor=None, days=hn_fetch.DEFAULT_DAYS, slices=hn_fetch.DEFAULT_SLICES,
+                            min_points=None):
+    """Return github.io stories newer than `cursor` (or from the last `days` days)
+    and the cursor to save once they are written."""
+    # Algolia searches URLs for the domain; the check below keeps exact matches
+    queries = hn_fetch.plan_queries(domains=[QUERY], min_points=min_points)
+    hits = hn_fetch.fetch_planned(queries, cursor, days, slices)
 
-        for hit in hits:
-            url = hit.get("url", "")
-            if "github.io" in url:
-                all_results.append({
-                    "title": hit.get("title"),
-                    "url": url,
-                    "points": hit.get("points"),
-                    "author": hit.get("author"),
-                    "created_at": hit.get("created_at"),
-                    "objectID": hit.get("objectID")
-                })
+    all_results = []
+    for hit in hits:
+        url = hit.get("url") or ""
+        if QUERY in url:
+            all_results.append({
+                "title": hit.get("title"),
+                "url": url,
+                "points": hit.get("points"),
+                "author": hit.get("author"),
+                "created_at": hit.get("created_at"),
+                "objectID": hit.get("objectID")
+            })
 
-        print(f"Fetched page {page}, total stories: {len(all_results)}")
-        time.sleep(0.3)  # to avoid hitting rate limits
+    print(f"Fetched {len(hits)} hits, total stories: {len(all_results)}")
 
-    return all_results
+    return all_results, hn_fetch.next_cursor(hits, cursor)
 
 if __name__ == "__main__":
-    stories = fetch_github_io_stories()
+    parser = argparse.ArgumentParser(description='Collect Hacker News stories linking to github.io pages.')
+    parser.add_argument('--days', type=int, default=hn_fetch.DEFAULT_DAYS,
+                        help='how far back to fetch when there is no saved cursor')
+    parser.add_argument('--slices', type=int, default=hn_fetch.DEFAULT_SLICES,
+                        help='time slices fetched concurrently')
+    parser.add_argument('--full', action='store_true',
+                        help=f'ignore the cursor in {hn_fetch.CURSOR_PATH} and fetch the last --days days')
+    parser.add_argument('--min-points', type=int,
+                        help='only fetch stories with at least this many points when fetched')
+    args = parser.parse_args()
+    retry.start_run()
+    cursor = None if args.full else hn_fetch.load_cursor(CURSOR_NAME)
+    stories, cursor = fetch_github_io_stories(cursor, args.days, args.slices, args.min_points)
 
     output_dir = "data/hackernews"
     os.makedirs(output_dir, exist_ok=True)
@@ -67,5 +68,8 @@ if __name__ == "__main__":
                 s['objectID']
             ])
 
+    # Only once the stories are on disk, so a failed run fetches them again
+    hn_fetch.save_cursor(CURSOR_NAME, cursor)
     print(f"Wrote {len(stories)} stories to {output_file}")
-
+    print(hn_fetch.summary())
+    print(retry.summary())
@@ -1,49 +1,69 @@
+import argparse
+import hn_fetch
+import keyword_matcher
+import retry
 
-import requests
-import time
+CURSOR_NAME = "interesting"
+DEFAULT_DAYS = 7
+AI_ML_CATEGORIES = {
+    "ai": ["ai", "llm", "agentic", "gpt"],
+    "ml": ["ml", "machine learning", "deep learning", "reinforcement learning", "neural", "transformer", "gan"],
+    "vision": ["computer vision"],
+    "nlp": ["natural language processing"],
+    "robotics": ["robotics"],
+}
+AI_ML_KEYWORDS = [keyword for keywords in AI_ML_CATEGORIES.values() for keyword in keywords]
+classifier = keyword_matcher.KeywordClassifier(AI_ML_CATEGORIES)
 
-BASE_URL = "https://hn.algolia.com/api/v1/search_by_date"
-HITS_PER_PAGE = 100
-MAX_PAGES = 10  # Adjust if needed
+def is_interesting(title):
+    """Exact check applied to the candidates Algolia returns."""
+    return classifier.matches(title)
 
-def fetch_interesting_stories():
+def fetch_interesting_stories(cursor=None, days=DEFAULT_DAYS, slices=hn_fetch.DEFAULT_SLICES, min_points=None):
+    """Return AI/ML stories newer than `cursor` (or from the last `days` days)
+    and the cursor to save once they are reported."""
     all_results = []
-    ai_ml_keywords = ["ai", "ml", "llm", "agentic", "reinforcement learning", "neural", "transformer", "gpt", "gan", "deep learning", "machine learning", "computer vision", "natural language processing", "robotics"]
-    for page in range(MAX_PAGES):
-        params = {
-            "tags": "story",
-            "hitsPerPage": HITS_PER_PAGE,
-            "page": page
-        }
-        resp = requests.get(BASE_URL, params=params)
-        if resp.status_code != 200:
-            print(f"Failed at page {page}")
-            break
-        data = resp.json()
-        hits = data.get("hits", [])
-        if not hits:
-            break
+    # All keyword words go out as one title query with optionalWords, so a title
+    # matching any of them comes back as a candidate for classify() below
+    queries = hn_fetch.plan_queries(keywords=AI_ML_KEYWORDS, min_points=min_points)
+    hits = hn_fetch.fetch_planned(queries, cursor, days, slices)
 
-        for hit in hits:
-            title = hit.get("title", "")
-            if any(keyword in title.lower() for keyword in ai_ml_keywords):
-                all_results.append({
-                    "title": title,
-                    "url": hit.get("url"),
-                    "points": hit.get("points"),
-                    "author": hit.get("author"),
-                    "created_at": hit.get("created_at"),
-                    "objectID": hit.get("objectID")
-                })
+    for hit in hits:
+        title = hit.get("title") or ""
+        categories = classifier.classify(title)
+        if categories:
+            all_results.append({
+                "title": title,
+                "categories": sorted(categories),
+                "url": hit.get("url"),
+                "points": hit.get("points"),
+                "author": hit.get("author"),
+                "created_at": hit.get("created_at"),
+                "objectID": hit.get("objectID")
+            })
 
-        print(f"Fetched page {page}, total stories: {len(all_results)}")
-        time.sleep(0.3)  # to avoid hitting rate limits
+    print(f"Fetched {len(hits)} hits, total stories: {len(all_results)}")
 
-    return all_results
+    return all_results, hn_fetch.next_cursor(hits, cursor)
 
 if __name__ == "__main__":
-    stories = fetch_interesting_stories()
+    parser = argparse.ArgumentParser(description='List recent AI/ML stories from Hacker News.')
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS,
+                        help='how far back to fetch when there is no saved cursor')
+    parser.add_argument('--slices', type=int, default=hn_fetch.DEFAULT_SLICES,
+                        help='time slices fetched concurrently')
+    parser.add_argument('--full', action='store_true',
+                        help=f'ignore the cursor in {hn_fetch.CURSOR_PATH} and fetch the last --days days')
+    parser.add_argument('--min-points', type=int,
+                        help='only fetch stories with at least this many points when fetched')
+    args = parser.parse_args()
+    retry.start_run()
+    cursor = None if args.full else hn_fetch.load_cursor(CURSOR_NAME)
+    stories, cursor = fetch_interesting_stories(cursor, args.days, args.slices, args.min_points)
     # sort by points
     stories.sort(key=lambda x: x['points'], reverse=True)
     for s in stories:
-        print(f"[{s['created_at']}] {s['title']} ({s['url']}) - {s['points']} points by {s['author']}")
+        print(f"[{s['created_at']}] [{','.join(s['categories'])}] {s['title']} ({s['url']}) - {s['points']} points by {s['author']}")
+    hn_fetch.save_cursor(CURSOR_NAME, cursor)
+    print(hn_fetch.summary())
+    print(retry.summary())
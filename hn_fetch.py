@@ -0,0 +1,189 @@
+"""Time-sliced, incremental fetches from the Hacker News Algolia API.
+
+`search_by_date` only pages through the first 1000 hits of a query, so
+walking `page=0..N` stops at 1000 stories and fetches all of them again on
+every run. `fetch_stories` instead splits the time range into slices and
+walks each one backwards with a `created_at_i` cursor in `numericFilters`,
+so any range is reachable. Slices are fetched on a thread pool and share the
+`hn.algolia.com` rate limit through `http_client`.
+
+`plan_queries` turns keywords, domains and a points floor into Algolia-side
+`query`, `optionalWords`, `restrictSearchableAttributes`, `tags` and
+`numericFilters`, so only candidate hits come over the wire; callers still
+apply their exact predicate to what comes back. `stats` counts the requests
+and bytes received.
+
+`data/hackernews/cursors.json` keeps the newest `created_at_i` and objectIDs
+seen by each named fetch, so the next run only asks for newer stories:
+
+    cursor = hn_fetch.load_cursor('github.io')
+    hits = hn_fetch.fetch_new_stories({'query': 'github.io', 'tags': 'story'}, cursor)
+    ...  # write the output
+    hn_fetch.save_cursor('github.io', hn_fetch.next_cursor(hits, cursor))
+"""
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+
+BASE_URL = os.environ.get('HN_ALGOLIA_BASE_URL', 'https://hn.algolia.com') + '/api/v1/search_by_date'
+HITS_PER_PAGE = 1000   # Algolia's maximum, so a slice rarely needs a second request
+DEFAULT_SLICES = 8
+DEFAULT_DAYS = 30      # how far back a fetch without a cursor goes
+CURSOR_PATH = os.environ.get('HN_CURSOR_PATH', 'data/hackernews/cursors.json')
+MAX_QUERY_LENGTH = 512  # Algolia ignores query text past this many characters
+
+stats = {'requests': 0, 'bytes': 0}
+_stats_lock = threading.Lock()
+
+
+def _search(params):
+    resp = http_client.get(BASE_URL, params=params)
+    with _stats_lock:
+        stats['requests'] += 1
+        stats['bytes'] += len(resp.content)
+    return resp
+
+
+def summary():
+    return f"Algolia requests: {stats['requests']}, received: {stats['bytes'] / 1e6:.2f} MB"
+
+
+def fetch_slice(params, since, until, numeric_filters=()):
+    """Return every hit created in `[since, until]` (epoch seconds), newest first.
+
+    Each request asks for the newest `HITS_PER_PAGE` hits at or before the
+    cursor; the next one moves the cursor to the oldest second seen, so
+    stories sharing that second are fetched again and dropped by objectID.
+    """
+    hits = []
+    seen = set()
+    cursor = until
+    while True:
+        filters = [f'created_at_i>={since}', f'created_at_i<={cursor}', *numeric_filters]
+        resp = _search({**params, 'numericFilters': ','.join(filters), 'hitsPerPage': HITS_PER_PAGE, 'page': 0})
+        # A silently skipped slice would leave a gap behind the saved cursor
+        resp.raise_for_status()
+        page_hits = resp.json().get('hits', [])
+        new_hits = [hit for hit in page_hits if hit['objectID'] not in seen]
+        hits.extend(new_hits)
+        seen.update(hit['objectID'] for hit in new_hits)
+        if len(page_hits) < HITS_PER_PAGE or not new_hits:
+            return hits
+        cursor = min(hit['created_at_i'] for hit in new_hits)
+
+
+def time_slices(since, until, slices=DEFAULT_SLICES):
+    """Split `[since, until]` into up to `slices` contiguous ranges, newest first."""
+    edges = [since + (until - since + 1) * i // slices for i in range(slices + 1)]
+    return [(edges[i], edges[i + 1] - 1) for i in reversed(range(slices)) if edges[i] < edges[i + 1]]
+
+
+def fetch_stories(params, since, until=None, slices=DEFAULT_SLICES, numeric_filters=()):
+    """Fetch every hit for `params` created between `since` and `until`, newest first.
+
+    The range is split into `slices` time slices fetched concurrently.
+    """
+    until = int(time.time()) if until is None else until
+    ranges = time_slices(since, until, slices)
+    with ThreadPoolExecutor(max_workers=max(1, len(ranges))) as executor:
+        results = executor.map(lambda bounds: fetch_slice(params, *bounds, numeric_filters), ranges)
+        return [hit for slice_hits in results for hit in slice_hits]
+
+
+def load_cursor(name, path=CURSOR_PATH):
+    """Return `{'created_at_i', 'object_ids'}` saved for `name`, or None."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f).get(name)
+    except FileNotFoundError:
+        return None
+
+
+def save_cursor(name, cursor, path=CURSOR_PATH):
+    if cursor is None:
+        return
+    try:
+        with open(path, encoding='utf-8') as f:
+            cursors = json.load(f)
+    except FileNotFoundError:
+        cursors = {}
+    cursors[name] = cursor
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cursors, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def next_cursor(hits, cursor=None):
+    """Cursor after a fetch: the newest second among `hits` and its objectIDs."""
+    if not hits:
+        return cursor
+    newest = max(hit['created_at_i'] for hit in hits)
+    object_ids = {hit['objectID'] for hit in hits if hit['created_at_i'] == newest}
+    if cursor and cursor['created_at_i'] == newest:
+        object_ids.update(cursor['object_ids'])
+    return {'created_at_i': newest, 'object_ids': sorted(object_ids)}
+
+
+def fetch_new_stories(params, cursor=None, days=DEFAULT_DAYS, slices=DEFAULT_SLICES, numeric_filters=()):
+    """Fetch hits newer than `cursor`, or from the last `days` days without one."""
+    since = cursor['created_at_i'] if cursor else int(time.time()) - days * 86400
+    hits = fetch_stories(params, since, slices=slices, numeric_filters=numeric_filters)
+    if cursor:
+        # The cursor's own second is fetched again in case more stories landed in it
+        seen = set(cursor['object_ids'])
+        hits = [hit for hit in hits if not (hit['created_at_i'] == since and hit['objectID'] in seen)]
+    return hits
+
+
+def keyword_groups(keywords, max_length=MAX_QUERY_LENGTH):
+    """The distinct words of `keywords`, packed into space-separated queries of at most `max_length` characters."""
+    words = list(dict.fromkeys(word for keyword in keywords for word in re.findall(r'\w+', keyword.lower())))
+    groups = []
+    for word in words:
+        if groups and len(groups[-1]) + 1 + len(word) <= max_length:
+            groups[-1] += ' ' + word
+        else:
+            groups.append(word)
+    return groups
+
+
+def plan_queries(keywords=(), domains=(), tags='story', min_points=None):
+    """Turn a keyword/domain spec into `(params, numeric_filters)` Algolia queries.
+
+    Algolia ANDs the words of a query unless they are listed in
+    `optionalWords`, so the words of all keywords are sent as one title
+    query with every word optional: a title matching any of them comes
+    back, and one request covers every keyword (more only when the words
+    exceed `MAX_QUERY_LENGTH`). Each domain is its own query searching URLs
+    only, since its parts ("github", "io") must all match. Algolia matches
+    word prefixes and single words of phrases, so hits are candidates for
+    the caller's exact check rather than final results. Without keywords
+    or domains, one query fetches every story.
+    """
+    numeric_filters = [f'points>={min_points}'] if min_points else []
+    queries = [({'query': group, 'optionalWords': ','.join(group.split()), 'tags': tags,
+                 'restrictSearchableAttributes': 'title'}, numeric_filters)
+               for group in keyword_groups(keywords)]
+    queries += [({'query': domain, 'tags': tags, 'restrictSearchableAttributes': 'url'}, numeric_filters)
+                for domain in domains]
+    return queries or [({'tags': tags}, numeric_filters)]
+
+
+def fetch_planned(queries, cursor=None, days=DEFAULT_DAYS, slices=DEFAULT_SLICES):
+    """Run `plan_queries` output concurrently; returns the merged hits, newest first.
+
+    A single query is split into `slices` time slices; several queries run
+    side by side instead, one slice each, since filtered results are small.
+    """
+    slices = slices if len(queries) == 1 else 1
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        results = executor.map(lambda query: fetch_new_stories(query[0], cursor, days, slices, query[1]), queries)
+        hits = {hit['objectID']: hit for query_hits in results for hit in query_hits}
+    return sorted(hits.values(), key=lambda hit: hit['created_at_i'], reverse=True)
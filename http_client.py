@@ -0,0 +1,142 @@
+"""Shared HTTP client for the scrapers.
+
+Every fetch goes through a pooled keep-alive session, so repeated requests to
+arxiv.org or hn.algolia.com reuse an open TCP+TLS connection instead of paying
+a fresh handshake each time.
+
+`get_session()` hands each thread of each process its own `requests.Session`
+(sessions are not thread-safe, and must not be shared across a fork).
+`async_session()` builds the equivalent `aiohttp` session for asyncio code.
+Both take a `rate_limit` token for the target host before each request, and
+transient failures are retried according to `retry`.
+"""
+import asyncio
+import os
+import threading
+import time
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+import rate_limit
+import retry
+
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/86.0.4240.75 Safari/537.36"
+DEFAULT_HEADERS = {"User-Agent": USER_AGENT}
+DEFAULT_TIMEOUT = 30
+
+POOL_CONNECTIONS = 4   # distinct hosts a session keeps pools for
+POOL_MAXSIZE = 16      # idle keep-alive connections kept per host
+
+_local = threading.local()
+
+
+class _Session(requests.Session):
+    """`requests.Session` that waits for the host's rate limit, retries
+    transient failures and applies `DEFAULT_TIMEOUT` unless one is passed.
+
+    Once retries run out, the last response is returned (or the last
+    connection error raised) so callers handle it as before.
+    """
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+        host = rate_limit.host_of(url)
+
+        attempt = 0
+        while True:
+            rate_limit.acquire(host)
+            try:
+                response = super().request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                delay = retry.plan_retry(host, attempt)
+                if delay is None:
+                    raise
+            else:
+                if not retry.is_retryable(response.status_code):
+                    retry.record_success(host)
+                    return response
+                delay = retry.plan_retry(host, attempt, response.status_code,
+                                         response.headers.get('Retry-After'))
+                if delay is None:
+                    return response
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+
+async def _on_request_start(session, context, params):
+    await rate_limit.acquire_async(params.url.host)
+
+
+def new_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+    """Create a session with default headers, timeout and tuned connection pools."""
+    session = _Session()
+    session.headers.update(DEFAULT_HEADERS)
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session():
+    """Return the calling thread's session, creating it on first use.
+
+    The session is recreated after a fork, so Pool workers never reuse a
+    socket inherited from the parent process.
+    """
+    if getattr(_local, 'pid', None) != os.getpid():
+        _local.session = new_session()
+        _local.pid = os.getpid()
+    return _local.session
+
+
+def get(url, **kwargs):
+    """`requests.get` on the calling thread's pooled session."""
+    return get_session().get(url, **kwargs)
+
+
+async def fetch_text(session, url):
+    """GET `url` on an `async_session` with the same retries as `get`, and
+    return the body text; raises for a final error status."""
+    host = rate_limit.host_of(url)
+
+    attempt = 0
+    while True:
+        try:
+            async with session.get(url) as response:
+                if not retry.is_retryable(response.status):
+                    retry.record_success(host)
+                    response.raise_for_status()
+                    return await response.text()
+                delay = retry.plan_retry(host, attempt, response.status,
+                                         response.headers.get('Retry-After'))
+                if delay is None:
+                    response.raise_for_status()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            delay = retry.plan_retry(host, attempt)
+            if delay is None:
+                raise
+
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+def async_session(concurrency=POOL_MAXSIZE, timeout=DEFAULT_TIMEOUT):
+    """Create an `aiohttp.ClientSession` with the same defaults.
+
+    Must be called from a running event loop; `concurrency` caps the number
+    of simultaneous connections. Like `requests`, the timeout bounds connect
+    and read, not the whole call, so time spent waiting for a rate-limit
+    token never counts against it.
+    """
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=30)
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(_on_request_start)
+    return aiohttp.ClientSession(connector=connector,
+                                 timeout=aiohttp.ClientTimeout(total=None, sock_connect=timeout,
+                                                               sock_read=timeout),
+                                 headers=DEFAULT_HEADERS,
+                                 trace_configs=[trace_config])
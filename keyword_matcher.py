@@ -0,0 +1,85 @@
+"""Word-boundary keyword classification compiled into one regular expression.
+
+Checking `any(keyword in title.lower() for keyword in keywords)` costs one
+scan per keyword and matches inside words ("ai" in "maintain", "gan" in
+"organ"). `KeywordClassifier` compiles every term of every category into a
+single pattern. The alternation is built from a prefix trie, so terms sharing
+a prefix share the work. Each title is then scanned once:
+
+    classifier = KeywordClassifier({'ml': ['machine learning', 'gan'], 'ai': ['ai', 'llm']})
+    classifier.classify('GANs for LLM evaluation')   # {'ml', 'ai'}
+    classifier.matches('Organic farming')            # False
+
+Terms match case-insensitively as whole words, with an optional plural
+"s"/"es", and the words of a phrase may be separated by any whitespace or
+hyphens ("reinforcement-learning").
+"""
+import re
+
+_WORD_CHAR = 'a-z0-9'
+_SEPARATOR = re.compile(r'[\s\-]+')
+
+
+def normalize(term):
+    return _SEPARATOR.sub(' ', term.strip().lower())
+
+
+def _trie_pattern(terms):
+    """Regex alternation for `terms` with common prefixes factored out."""
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}  # end of a term
+
+    def pattern(node):
+        ends = '' in node
+        branches = []
+        for char in sorted(char for char in node if char):
+            piece = r'[\s\-]+' if char == ' ' else re.escape(char)
+            branches.append(piece + pattern(node[char]))
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if ends:
+            # Greedy optional tail: the longest term wins, and the word boundary
+            # check backtracks to the shorter one if the longer does not fit
+            body = '(?:' + body + ')?'
+        return body
+
+    return pattern(trie)
+
+
+class KeywordClassifier:
+    """Classify titles into the categories whose terms they contain.
+
+    `categories` maps a category name to its terms; a term may belong to
+    several categories.
+    """
+
+    def __init__(self, categories):
+        self.categories = {}
+        for category, terms in categories.items():
+            for term in terms:
+                self.categories.setdefault(normalize(term), set()).add(category)
+        terms = sorted(self.categories)
+        self.pattern = re.compile(
+            rf'(?<![{_WORD_CHAR}])({_trie_pattern(terms)})(?:e?s)?(?![{_WORD_CHAR}])', re.IGNORECASE)
+
+    def terms(self, title):
+        """Every term found in `title`, normalized, in order of appearance."""
+        return [normalize(match.group(1)) for match in self.pattern.finditer(title)]
+
+    def classify(self, title):
+        """Set of categories matched by `title`."""
+        categories = set()
+        for match in self.pattern.finditer(title):
+            categories |= self.categories[normalize(match.group(1))]
+        return categories
+
+    def matches(self, title):
+        return self.pattern.search(title) is not None
+
+    def classify_many(self, titles):
+        return [self.classify(title) for title in titles]
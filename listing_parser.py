@@ -0,0 +1,236 @@
+"""Parsers for arXiv `/list/<topic>/recent` listing pages.
+
+A listing page has one `dl#articles` per announcement date. Each starts with
+an `h3` date header, followed by `dt` (links, including "Download PDF") and
+`dd` (metadata, including `div.list-title`) pairs.
+
+Every backend takes `(html, topic_code)` and returns `ListingEntry` tuples in
+page order:
+
+- `bs4`: the original BeautifulSoup walk, which calls `find_next_sibling('dd')`
+  for every `dt`.
+- `lxml`: one linear pass over each `dl`'s children, pairing every `dt` with the
+  `dd` that follows it. Several times faster on 1000-entry pages.
+
+`ListingStream` is the incremental form of the `lxml` backend: it is fed the
+response as bytes arrive and emits each entry as soon as its `dd` closes.
+
+`bench_parsers.py` checks that both backends agree and times them.
+"""
+import re
+from collections import namedtuple
+
+from bs4 import BeautifulSoup
+import lxml.etree
+import lxml.html
+
+ListingEntry = namedtuple('ListingEntry', ['title', 'pdf_url', 'topic', 'date'])
+
+DEFAULT_PARSER = 'lxml'
+DATE_NOT_FOUND = "[Date not found]"
+TITLE_NOT_FOUND = "[Title not found]"
+
+_TOTAL_RE = re.compile(r'Total of (\d+) entries', re.IGNORECASE)
+# Date header format like "Mon, 15 Dec 2025 (showing 101 of 101 entries )"
+_DATE_RE = re.compile(r'(\w+,\s+\d{1,2}\s+\w+\s+\d{4})')
+
+
+def parse_total(html):
+    """Return the "Total of N entries" count of a listing page, 0 if absent."""
+    num_result = _TOTAL_RE.search(html)
+    return int(num_result.group(1)) if num_result else 0
+
+
+def _header_date(text, current_date):
+    date_match = _DATE_RE.search(text.strip())
+    return date_match.group(1) if date_match else current_date
+
+
+def _entry(pdf_link, title, topic_code, date):
+    paper_id = pdf_link.split('/')[2]
+    return ListingEntry(title, f"https://arxiv.org/pdf/{paper_id}.pdf", topic_code, date)
+
+
+def parse_entries_bs4(html, topic_code):
+    soup = BeautifulSoup(html, 'html.parser')
+    entries = []
+
+    # Find ALL articles dl elements (there can be multiple, one per date)
+    for articles_dl in soup.find_all('dl', id='articles'):
+        current_date = DATE_NOT_FOUND
+
+        for element in articles_dl.children:
+            # Skip text nodes
+            if not hasattr(element, 'name'):
+                continue
+
+            if element.name == 'h3':
+                current_date = _header_date(element.get_text(), current_date)
+                continue
+
+            if element.name == 'dt':
+                pdf_link_tag = element.find('a', attrs={"title": "Download PDF"})
+                if not pdf_link_tag or not pdf_link_tag.get('href'):
+                    continue
+
+                title = TITLE_NOT_FOUND
+                dd = element.find_next_sibling('dd')
+                if dd:
+                    title_div = dd.find('div', class_='list-title')
+                    if title_div:
+                        title = title_div.get_text().replace('Title:', '').strip()
+
+                entries.append(_entry(pdf_link_tag.get('href'), title, topic_code, current_date))
+
+    return entries
+
+
+def _dt_pdf_link(dt):
+    """The "Download PDF" href inside an lxml `dt` element, or None."""
+    for a in dt.iterfind('.//a[@title]'):
+        if a.get('title') == 'Download PDF' and a.get('href'):
+            return a.get('href')
+    return None
+
+
+def _dd_title(dd):
+    """The `div.list-title` text inside an lxml `dd` element."""
+    for div in dd.iterfind('.//div[@class]'):
+        if 'list-title' in div.get('class').split():
+            return ''.join(div.itertext()).replace('Title:', '').strip()
+    return TITLE_NOT_FOUND
+
+
+def parse_entries_lxml(html, topic_code):
+    tree = lxml.html.fromstring(html)
+    entries = []
+
+    for articles_dl in tree.iterfind(".//dl[@id='articles']"):
+        current_date = DATE_NOT_FOUND
+        pending_link = None  # PDF link of the dt still waiting for its dd
+
+        for element in articles_dl.iterchildren():
+            tag = element.tag
+            if tag == 'h3':
+                current_date = _header_date(''.join(element.itertext()), current_date)
+            elif tag == 'dt':
+                if pending_link:
+                    entries.append(_entry(pending_link, TITLE_NOT_FOUND, topic_code, current_date))
+                pending_link = _dt_pdf_link(element)
+            elif tag == 'dd' and pending_link:
+                entries.append(_entry(pending_link, _dd_title(element), topic_code, current_date))
+                pending_link = None
+
+        if pending_link:
+            entries.append(_entry(pending_link, TITLE_NOT_FOUND, topic_code, current_date))
+
+    return entries
+
+
+class ListingStream:
+    """Incremental listing parser for a response that is still arriving.
+
+    `feed()` takes raw response bytes in chunks of any size and returns the
+    entries whose `dt`/`dd` pair completed within them. Handled elements are
+    dropped straight away, so memory stays flat however long the page is.
+    Produces the same entries as `parse_entries_lxml`; `total` holds the
+    "Total of N entries" count once it has been seen.
+    """
+
+    _TOTAL_RE = re.compile(rb'Total of (\d+) entries', re.IGNORECASE)
+
+    def __init__(self, topic_code, encoding='utf-8'):
+        self.topic_code = topic_code
+        self.total = None
+        self._tail = b''  # end of the previous chunk, for a count split across chunks
+        self._parser = lxml.etree.HTMLPullParser(events=('end',), tag=('dl', 'h3', 'dt', 'dd'),
+                                                 encoding=encoding)
+        self._current_dl = None
+        self._current_date = DATE_NOT_FOUND
+        self._pending_link = None
+
+    def feed(self, chunk):
+        if self.total is None:
+            window = self._tail + chunk
+            match = self._TOTAL_RE.search(window)
+            if match:
+                self.total = int(match.group(1))
+            self._tail = window[-64:]
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self):
+        """Finish parsing and return any remaining entries."""
+        self._parser.close()
+        if self.total is None:
+            self.total = 0
+        return self._drain()
+
+    def _in_articles(self, element):
+        parent = element.getparent()
+        if parent is None or parent.tag != 'dl' or parent.get('id') != 'articles':
+            return False
+        if parent is not self._current_dl:
+            # First child of the next date's dl
+            self._current_dl = parent
+            self._current_date = DATE_NOT_FOUND
+            self._pending_link = None
+        return True
+
+    def _flush_pending(self, entries, title=TITLE_NOT_FOUND):
+        if self._pending_link:
+            entries.append(_entry(self._pending_link, title, self.topic_code, self._current_date))
+            self._pending_link = None
+
+    def _drain(self):
+        entries = []
+        for _, element in self._parser.read_events():
+            tag = element.tag
+            if tag == 'dl':
+                if element is self._current_dl:
+                    self._flush_pending(entries)
+                    self._current_dl = None
+                if element.get('id') == 'articles':
+                    element.clear()
+                    if element.getparent() is not None:
+                        element.getparent().remove(element)
+                continue
+
+            if not self._in_articles(element):
+                continue
+
+            if tag == 'h3':
+                self._current_date = _header_date(''.join(element.itertext()), self._current_date)
+            elif tag == 'dt':
+                self._flush_pending(entries)
+                self._pending_link = _dt_pdf_link(element)
+                continue  # keep the dt until its dd has been seen
+            elif tag == 'dd':
+                self._flush_pending(entries, _dd_title(element))
+
+            # Drop everything in this dl up to and including the handled element
+            parent = element.getparent()
+            while parent[0] is not element:
+                del parent[0]
+            del parent[0]
+
+        return entries
+
+
+def parse_entries_stream(chunks, topic_code):
+    """Yield `ListingEntry` tuples from an iterable of response byte chunks."""
+    stream = ListingStream(topic_code)
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+    yield from stream.close()
+
+
+PARSERS = {
+    'bs4': parse_entries_bs4,
+    'lxml': parse_entries_lxml,
+}
+
+
+def parse_entries(html, topic_code, parser=DEFAULT_PARSER):
+    """Parse a listing page with the named backend."""
+    return PARSERS[parser](html, topic_code)
@@ -0,0 +1,146 @@
+"""Columnar Parquet archive of the scrape logs in `data/`.
+
+`compact` converts every run's output (v2 `topic id` logs, the cloud
+function's `topic | id | title` logs, v3 CSVs and search CSVs) into one
+Parquet file with a common schema, partitioned by run date:
+
+    data/archive/run_date=2024-01-28/arxiv_28_01_2024_09_54.parquet
+
+`topic`, `run_id` and `search_term` are dictionary-encoded, so a year of
+logs stores each topic name once per row group. Runs already in the archive
+are skipped, so compaction can be repeated after every crawl.
+
+`read_archive` loads only the requested columns and prunes partitions and
+row groups with the topic/run-date filters:
+
+    python log_archive.py compact data/*.log data/*.csv
+    python log_archive.py stats
+"""
+import argparse
+import glob
+import os
+import re
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import paper_store
+
+DEFAULT_ARCHIVE_DIR = 'data/archive'
+
+SCHEMA = pa.schema([
+    ('paper_id', pa.string()),
+    ('title', pa.string()),
+    ('topic', pa.dictionary(pa.int32(), pa.string())),
+    ('announce_date', pa.date32()),
+    ('run_id', pa.dictionary(pa.int32(), pa.string())),
+    ('search_term', pa.dictionary(pa.int32(), pa.string())),
+])
+PARTITION_SCHEMA = pa.schema([('run_date', pa.string())])
+PARTITIONING = ds.partitioning(PARTITION_SCHEMA, flavor='hive')
+
+_RUN_ID_RE = re.compile(r'(\d{2}_\d{2}_\d{4}_\d{2}_\d{2})')
+
+
+def read_scrape_file(file_path):
+    """Read one log/CSV into a dict of columns matching `SCHEMA` (without run_id)."""
+    columns = {name: [] for name in ('paper_id', 'title', 'topic', 'announce_date', 'search_term')}
+    for paper_id, title, topic, announce_date, search_term in paper_store.rows_from_file(file_path, True):
+        columns['paper_id'].append(paper_id)
+        columns['title'].append(title if title not in (None, '', '[Title not found]') else None)
+        columns['topic'].append(topic)
+        iso_date = paper_store.normalize_date(announce_date)
+        columns['announce_date'].append(datetime.strptime(iso_date, '%Y-%m-%d').date() if iso_date else None)
+        columns['search_term'].append(search_term)
+    return columns
+
+
+def _column(data_type, values):
+    if pa.types.is_dictionary(data_type):
+        return pa.array(values, data_type.value_type).dictionary_encode()
+    return pa.array(values, data_type)
+
+
+def _output_path(archive_dir, run_id, file_path):
+    run_date = datetime.strptime(run_id, paper_store.RUN_ID_FORMAT).date().isoformat()
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(archive_dir, f'run_date={run_date}', f'{name}.parquet')
+
+
+def compact(file_paths, archive_dir=DEFAULT_ARCHIVE_DIR, overwrite=False):
+    """Convert scrape logs/CSVs to Parquet, one file per run; returns rows written."""
+    written = 0
+    for file_path in sorted(file_paths):
+        match = _RUN_ID_RE.search(os.path.basename(file_path))
+        if not match:
+            print(f"Skipping {file_path}: no run timestamp in file name")
+            continue
+
+        output_path = _output_path(archive_dir, match.group(1), file_path)
+        if os.path.exists(output_path) and not overwrite:
+            continue
+
+        columns = read_scrape_file(file_path)
+        columns['run_id'] = [match.group(1)] * len(columns['paper_id'])
+        table = pa.table([_column(SCHEMA.field(name).type, columns[name]) for name in SCHEMA.names],
+                         schema=SCHEMA)
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        # Write to a hidden file and rename, so readers never see a partial file
+        tmp_path = os.path.join(os.path.dirname(output_path), f'.{os.path.basename(output_path)}.tmp')
+        pq.write_table(table, tmp_path, compression='zstd')
+        os.replace(tmp_path, output_path)
+        written += table.num_rows
+    return written
+
+
+def dataset(archive_dir=DEFAULT_ARCHIVE_DIR):
+    return ds.dataset(archive_dir, format='parquet', partitioning=PARTITIONING,
+                      schema=pa.unify_schemas([SCHEMA, PARTITION_SCHEMA]))
+
+
+def archive_filter(topics=None, run_dates=None):
+    """Build a dataset filter for a topic set and an inclusive (start, end) ISO run-date range."""
+    conditions = []
+    if topics:
+        conditions.append(ds.field('topic').isin(list(topics)))
+    if run_dates:
+        start, end = run_dates
+        if start:
+            conditions.append(ds.field('run_date') >= start)
+        if end:
+            conditions.append(ds.field('run_date') <= end)
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_archive(archive_dir=DEFAULT_ARCHIVE_DIR, columns=None, topics=None, run_dates=None):
+    """Load the archive as a `pyarrow.Table`, reading only `columns` and matching partitions."""
+    return dataset(archive_dir).to_table(columns=columns, filter=archive_filter(topics, run_dates))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compact scrape logs into a Parquet archive.')
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE_DIR, help='archive directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    compact_parser = commands.add_parser('compact', help='convert logs/CSVs to Parquet')
+    compact_parser.add_argument('files', nargs='*', help='defaults to data/*.log and data/*.csv')
+    compact_parser.add_argument('--overwrite', action='store_true', help='rewrite runs already archived')
+
+    commands.add_parser('stats', help='summarize the archive')
+
+    args = parser.parse_args()
+    if args.command == 'compact':
+        start_time = datetime.now()
+        files = args.files or glob.glob('data/*.log') + glob.glob('data/*.csv')
+        count = compact(files, args.archive, args.overwrite)
+        print(f'Archived {count} rows from {len(files)} files in {datetime.now() - start_time}')
+    else:
+        table = read_archive(args.archive, columns=['topic', 'run_id'])
+        print(f'{table.num_rows} rows, {len(table.column("run_id").unique())} runs, '
+              f'{len(table.column("topic").unique())} topics')
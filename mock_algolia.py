@@ -0,0 +1,190 @@
+"""Local stand-in for the Hacker News Algolia API, used by the benchmark scripts.
+
+Serves `/api/v1/search_by_date` over a synthetic set of stories, newest
+first, honouring `query`, `optionalWords`, `restrictSearchableAttributes`,
+`tags`, `numericFilters`, `hitsPerPage` and `page` like hn.algolia.com does, including its limit of 1000 hits reachable by
+paging. `server.requests` and `server.bytes_sent` count what was served.
+Requests with a `numericFilters` condition listed in `server.failing_filters`
+(e.g. `created_at_i>=1735689600`) are always answered with a 503.
+"""
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+PAGINATION_LIMIT = 1000  # hits reachable through `page`, like Algolia's paginationLimitedTo
+MAX_HITS_PER_PAGE = 1000
+
+TOPICS = ['Rust', 'SQLite', 'LLM', 'GPT-5', 'reinforcement learning', 'transformer', 'Postgres',
+          'computer vision', 'robotics', 'maintainers', 'organic farming', 'deep learning', 'Kubernetes',
+          'neural networks', 'GAN', 'machine learning', 'compilers', 'AI agents', 'Zig', 'email',
+          'HTML forms', 'bread baking', 'startup hiring', 'Emacs', 'typography', 'small business taxes',
+          'remote work', 'GPU drivers', 'Linux audio', 'chess engines', 'urban cycling', 'mechanical keyboards',
+          'home networking', 'WebAssembly', 'old game consoles', 'espresso', 'DNS', 'bike repair',
+          'the paint industry', 'domain names']
+TEMPLATES = ['Show HN: A tiny {} toolkit', 'Why {} is hard', 'Ask HN: How do you learn {}?',
+             '{} in 100 lines', 'The state of {} in 2025', 'Notes on {}']
+HOSTS = ['example.github.io', 'blog.example.com', 'github.com/example', 'news.example.org',
+         'someone.github.io', 'arxiv.org']
+
+
+def make_stories(count, newest=None, interval=60, first_id=44000000, seed=0):
+    """`count` synthetic stories, newest first, one every ~`interval` seconds ending at `newest`."""
+    rng = random.Random(seed)
+    newest = int(time.time()) if newest is None else newest
+    stories = []
+    created_at_i = newest
+    for index in range(count):
+        object_id = first_id + count - index
+        title = rng.choice(TEMPLATES).format(rng.choice(TOPICS))
+        url = f'https://{rng.choice(HOSTS)}/{object_id}'
+        stories.append({
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(created_at_i)),
+            'created_at_i': created_at_i,
+            'title': title,
+            'url': url,
+            'author': f'user{object_id % 500}',
+            'points': int(rng.paretovariate(1.2)),
+            'num_comments': rng.randrange(200),
+            'story_text': None,
+            'objectID': str(object_id),
+            '_tags': ['story', f'author_user{object_id % 500}', f'story_{object_id}'],
+        })
+        # Several stories can share a second, as on HN
+        created_at_i -= rng.randrange(0, 2 * interval)
+    return stories
+
+
+def add_stories(server, count, newest=None, interval=60):
+    """Publish `count` stories ending at `newest` (default now).
+
+    Steps are up to `2 * interval` apart, so leave that much room after the
+    server's newest story to keep every new one newer than it.
+    """
+    first_id = int(server.stories[0]['objectID']) if server.stories else 44000000
+    fresh = make_stories(count, newest, interval, first_id, seed=first_id)
+    with server.lock:
+        server.stories = fresh + server.stories
+
+
+_NUMERIC_FILTER = re.compile(r'^\s*(\w+)\s*(<=|>=|!=|<|>|=)\s*(-?\d+)\s*$')
+_OPERATORS = {
+    '<': lambda a, b: a < b, '<=': lambda a, b: a <= b, '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b, '=': lambda a, b: a == b, '!=': lambda a, b: a != b,
+}
+
+
+def _words(text):
+    return re.findall(r'[a-z0-9]+', text.lower())
+
+
+def _matcher(query):
+    """Predicate for `query`'s parameters.
+
+    Like Algolia, every word of `query` must be a prefix of some word of a
+    searchable attribute, so "ai" finds "AI" and "aim" but not "maintain".
+    Words listed in the comma-separated `optionalWords` may be missing, but
+    when every word is optional at least one of them must be found.
+    """
+    words = _words(query.get('query', [''])[0])
+    optional = set(_words(' '.join(query.get('optionalWords', [''])[0].split(','))))
+    required = [word for word in words if word not in optional]
+    optional_words = [word for word in words if word in optional]
+    attributes = (query.get('restrictSearchableAttributes', [''])[0].split(',')
+                  if 'restrictSearchableAttributes' in query else ['title', 'url', 'author', 'story_text'])
+    tags = [tag for tag in query.get('tags', [''])[0].split(',') if tag]
+    numeric = []
+    for condition in ','.join(query.get('numericFilters', [])).split(','):
+        if condition.strip():
+            attribute, operator, value = _NUMERIC_FILTER.match(condition).groups()
+            numeric.append((attribute, _OPERATORS[operator], int(value)))
+
+    def matches(story):
+        if any(tag not in story['_tags'] for tag in tags):
+            return False
+        if any(not op(story.get(attribute) or 0, value) for attribute, op, value in numeric):
+            return False
+        text = _words(' '.join(story.get(attribute) or '' for attribute in attributes))
+        found = lambda word: any(token.startswith(word) for token in text)
+        if not all(found(word) for word in required):
+            return False
+        return bool(required) or not optional_words or any(found(word) for word in optional_words)
+
+    return matches
+
+
+class AlgoliaHandler(BaseHTTPRequestHandler):
+    """Serves `/api/v1/search_by_date` after `server.latency` seconds."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != '/api/v1/search_by_date':
+            self.send_error(404)
+            return
+
+        query = parse_qs(url.query)
+        conditions = {condition.strip() for condition in ','.join(query.get('numericFilters', [])).split(',')}
+        if conditions & self.server.failing_filters:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        try:
+            matches = _matcher(query)
+        except AttributeError:
+            self.send_error(400, 'invalid numericFilters')
+            return
+        hits_per_page = min(int(query.get('hitsPerPage', ['20'])[0]), MAX_HITS_PER_PAGE)
+        page = int(query.get('page', ['0'])[0])
+
+        with self.server.lock:
+            stories = self.server.stories
+        found = [story for story in stories if matches(story)]
+        start = page * hits_per_page
+        end = min(start + hits_per_page, PAGINATION_LIMIT)
+        hits = found[start:end] if start < end else []
+
+        time.sleep(self.server.latency)
+        body = json.dumps({
+            'hits': hits,
+            'nbHits': len(found),
+            'page': page,
+            'nbPages': -(-min(len(found), PAGINATION_LIMIT) // hits_per_page),
+            'hitsPerPage': hits_per_page,
+            'query': query.get('query', [''])[0],
+            'params': url.query,
+        }).encode('utf-8')
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.bytes_sent += len(body)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(stories=None, latency=0.05, handler=AlgoliaHandler):
+    """Start a threaded mock server on a free localhost port and return it.
+
+    Point the fetchers at it with `HN_ALGOLIA_BASE_URL=f'http://127.0.0.1:{server.server_port}'`
+    and call `server.shutdown()` when done.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    server.stories = make_stories(5000) if stories is None else stories
+    server.latency = latency
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.bytes_sent = 0
+    server.failing_filters = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,247 @@
+"""Local stand-in for arxiv.org, used by the benchmark scripts.
+
+Listing pages follow the structure of the real `/list/<topic>/recent` listing:
+a "Total of N entries" heading and one `dl#articles` per announcement date
+holding `dt`/`dd` pairs. `/pdf/<id>` serves a synthetic PDF and honours
+single-range `Range` requests. `/search/advanced` answers advanced searches
+over a fixed corpus of `SEARCH_CORPUS_SIZE` synthetic papers, combining the
+`terms-N-*` rows with their AND/OR/NOT operators and matching each term as a
+case-insensitive phrase in the title and abstract.
+
+With `fault_rate` set, that fraction of requests is answered with a 503 or
+429 carrying `Retry-After: <retry_after>`, to exercise the retry layer.
+Request paths listed in `server.failing_paths` (e.g.
+`/list/cs.AI/recent?skip=1000&show=1000`) are always answered with a 503.
+"""
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+DATES = ['Mon, 15 Dec 2025', 'Fri, 12 Dec 2025', 'Thu, 11 Dec 2025', 'Wed, 10 Dec 2025']
+
+SEARCH_CORPUS_SIZE = 4000
+SEARCH_PHRASES = ['process reward model (PRM)', 'reinforcement learning from human feedback (RLHF)',
+                  'reinforcement learning from human feedback', 'RLHF', 'chain of thought', 'constitutional AI',
+                  'diffusion model', 'graph neural network', 'mixture of experts', 'retrieval augmented generation',
+                  'speculative decoding', 'state space model', 'direct preference optimization', 'reward hacking']
+SEARCH_FILLER = ['scaling', 'evaluation', 'benchmarks', 'robustness', 'efficient training', 'theory', 'agents',
+                 'alignment', 'reasoning', 'multimodal models', 'long context', 'compression']
+SEARCH_SUBJECTS = ['cs.LG', 'cs.CL', 'cs.AI', 'stat.ML', 'cs.CV']
+
+
+def _title(index, topic_code):
+    title = f'Synthetic paper {index} on {topic_code}'
+    if index % 7 == 3:
+        # Real titles carry entities, TeX and line breaks
+        title += ': $\\mathcal{O}(n&lt;k)$ &amp; the\n  A&#246;B bound'
+    return title
+
+
+def listing_html(topic_code, skip=0, show=1000, total=300):
+    """Render one listing page of synthetic papers for `topic_code`."""
+    topic_seed = sum(map(ord, topic_code)) % 100
+    per_date = max(1, -(-total // len(DATES)))
+    end = min(skip + show, total)
+
+    parts = [f'<html><body><div id="dlpage"><h1>{topic_code}</h1>',
+             f'<div class="paging">Total of {total} entries</div>']
+    current_date = None
+    for index in range(skip, end):
+        date = DATES[index // per_date]
+        if date != current_date:
+            if current_date is not None:
+                parts.append('</dl>')
+            parts.append(f'<dl id="articles"><h3>{date} (showing {per_date} of {per_date} entries )</h3>')
+            current_date = date
+
+        # Newest first, like arXiv: a larger `total` adds papers at the top
+        number = total - 1 - index
+        paper_id = f'2512.{topic_seed:02d}{number:03d}'
+        parts.append(
+            f'<dt><a name="item{index + 1}">[{index + 1}]</a>&nbsp;'
+            f'<a href="/abs/{paper_id}" title="Abstract" id="{paper_id}">arXiv:{paper_id}</a> '
+            f'[<a href="/pdf/{paper_id}" title="Download PDF" id="pdf-{paper_id}">pdf</a>, '
+            f'<a href="/html/{paper_id}v1" title="View HTML" id="html-{paper_id}">html</a>]</dt>'
+            f'<dd><div class="meta">'
+            f'<div class="list-title mathjax"><span class="descriptor">Title:</span>\n  '
+            f'{_title(number, topic_code)}\n</div>'
+            f'<div class="list-authors"><a href="/a/doe_j_1">Jane Doe</a>, '
+            f'<a href="/a/roe_r_1">Richard Roe</a></div>'
+            f'<div class="list-subjects"><span class="descriptor">Subjects:</span> '
+            f'<span class="primary-subject">{topic_code}</span></div>'
+            f'</div></dd>'
+        )
+    if current_date is not None:
+        parts.append('</dl>')
+    parts.append('</div></body></html>')
+    return ''.join(parts)
+
+
+def search_corpus(size=SEARCH_CORPUS_SIZE):
+    """Synthetic papers `(paper_id, title, abstract, subject, submitted)`, newest first."""
+    papers = []
+    for index in range(size):
+        rng = random.Random(index)
+        phrases = rng.sample(SEARCH_PHRASES, rng.choice((0, 1, 1, 2)))
+        filler = rng.sample(SEARCH_FILLER, 2)
+        title = f'On {filler[0]} with {phrases[0]}' if phrases else f'Towards {filler[0]} and {filler[1]}'
+        abstract = (f'We study {filler[1]}' + ''.join(f', building on {phrase}' for phrase in phrases[1:])
+                    + '. Experiments show consistent gains.')
+        day = 28 - index * 28 // size
+        papers.append((f'2501.{size - index:05d}', title, abstract, rng.choice(SEARCH_SUBJECTS),
+                       f'{day} January, 2025'))
+    return papers
+
+
+def _search_matches(paper, query):
+    """Apply the `terms-N-*` rows of an advanced search to one corpus paper."""
+    text = f'{paper[1]} {paper[2]}'.lower()
+    result = None
+    for row in range(20):
+        term = query.get(f'terms-{row}-term', [''])[0].lower()
+        if not term:
+            continue
+        found = term in text
+        operator = query.get(f'terms-{row}-operator', ['AND'])[0]
+        if result is None:
+            result = found
+        elif operator == 'OR':
+            result = result or found
+        elif operator == 'NOT':
+            result = result and not found
+        else:
+            result = result and found
+    return bool(result)
+
+
+def search_html(papers, total, start, size, show_abstracts):
+    """Render one advanced-search results page like arxiv.org/search/advanced."""
+    parts = [f'<html><body><h1 class="title is-clearfix">Showing {start + 1}&ndash;{start + len(papers)} '
+             f'of {total:,} results</h1><ol class="breathe-horizontal" start="{start + 1}">']
+    for paper_id, title, abstract, subject, submitted in papers:
+        parts.append(
+            f'<li class="arxiv-result"><div class="is-marginless">'
+            f'<p class="list-title is-inline-block"><a href="https://arxiv.org/abs/{paper_id}">arXiv:{paper_id}</a></p>'
+            f'<div class="tags is-inline-block"><span class="tag is-small">{subject}</span></div></div>'
+            f'<p class="title is-5 mathjax">\n      {title}\n    </p>'
+            f'<p class="authors"><span>Authors:</span><a href="/a/doe_j_1">Jane Doe</a></p>')
+        if show_abstracts:
+            parts.append(f'<p class="abstract mathjax"><span class="abstract-full has-text-grey-dark mathjax">'
+                         f'{abstract}</span></p>')
+        parts.append(f'<p class="is-size-7"><span class="has-text-black-bis">Submitted</span> {submitted}; '
+                     f'{subject}</p></li>')
+    parts.append('</ol></body></html>')
+    return ''.join(parts)
+
+
+def pdf_bytes(paper_id, size=256 * 1024):
+    """A `size`-byte file with a PDF header and `%%EOF` trailer."""
+    header = f'%PDF-1.5\n% {paper_id}\n'.encode('ascii')
+    trailer = b'\n%%EOF\n'
+    return header + b'0' * max(0, size - len(header) - len(trailer)) + trailer
+
+
+class ListingHandler(BaseHTTPRequestHandler):
+    """Serves `/list/<topic>/<period>?skip=&show=` and `/pdf/<id>` after
+    `server.latency` seconds."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path in self.server.failing_paths:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if random.random() < self.server.fault_rate:
+            self.send_response(random.choice((429, 503)))
+            self.send_header('Retry-After', str(self.server.retry_after))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        url = urlparse(self.path)
+        segments = url.path.strip('/').split('/')
+        if len(segments) == 2 and segments[0] == 'pdf':
+            self.send_pdf(segments[1])
+            return
+        if segments == ['search', 'advanced']:
+            self.send_search(parse_qs(url.query, keep_blank_values=True))
+            return
+        if len(segments) != 3 or segments[0] != 'list':
+            self.send_error(404)
+            return
+
+        query = parse_qs(url.query)
+        skip = int(query.get('skip', ['0'])[0])
+        show = int(query.get('show', ['1000'])[0])
+
+        time.sleep(self.server.latency)
+        body = listing_html(segments[1], skip, show, self.server.entries_per_topic).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_search(self, query):
+        found = [paper for paper in self.server.search_corpus if _search_matches(paper, query)]
+        size = int(query.get('size', ['50'])[0])
+        start = int(query.get('start', ['0'])[0])
+        show_abstracts = query.get('abstracts', ['show'])[0] == 'show'
+
+        time.sleep(self.server.latency)
+        body = search_html(found[start:start + size], len(found), start, size, show_abstracts).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_pdf(self, paper_id):
+        body = pdf_bytes(paper_id, self.server.pdf_size)
+        start, status = 0, 200
+        match = re.match(r'bytes=(\d+)-$', self.headers.get('Range', ''))
+        if match:
+            start, status = int(match.group(1)), 206
+            if start >= len(body):
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(body)}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+        time.sleep(self.server.latency)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/pdf')
+        self.send_header('Content-Length', str(len(body) - start))
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{len(body) - 1}/{len(body)}')
+        self.end_headers()
+        self.wfile.write(body[start:])
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(latency=0.1, entries_per_topic=300, pdf_size=256 * 1024,
+                 fault_rate=0.0, retry_after=1, handler=ListingHandler):
+    """Start a threaded mock server on a free localhost port and return it.
+
+    The base URL is `f'http://127.0.0.1:{server.server_port}'`; call
+    `server.shutdown()` when done.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.entries_per_topic = entries_per_topic
+    server.pdf_size = pdf_size
+    server.fault_rate = fault_rate
+    server.retry_after = retry_after
+    server.failing_paths = set()
+    server.search_corpus = search_corpus()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
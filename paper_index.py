@@ -0,0 +1,160 @@
+"""Memory-mapped sorted index of arXiv paper ids.
+
+New-style arXiv ids (`yymm.nnnnn`, optionally with a `vN` suffix) are
+encoded as `yymm * 100000 + nnnnn`, which fits a uint32 and sorts like the
+ids do. The index file is just those integers, sorted and deduplicated, so
+400k ids take 1.6 MB. `PaperIndex` memory-maps the file and binary-searches
+it in place: lookups touch a handful of pages, and nothing is loaded into
+Python objects. Old-style ids (`math/0601001`) are not indexed.
+
+`add()` merges new ids into an index file and atomically replaces it, so
+the index grows run by run; `build()` feeds it the ids from scrape logs.
+
+    python paper_index.py build data/*.log data/*.csv
+    python paper_index.py check 2401.10241 2401.99999
+"""
+import argparse
+import array
+import bisect
+import heapq
+import mmap
+import os
+import sys
+import time
+
+import paper_store
+
+DEFAULT_INDEX_PATH = os.environ.get('PAPER_INDEX_PATH', 'data/paper_ids.idx')
+ITEM_FORMAT = 'I'  # native uint32
+
+
+def encode(paper_id):
+    """'2401.10241' -> 240110241, or None for ids that cannot be indexed."""
+    yymm, _, number = (paper_id or '').partition('.')
+    number = number.split('v', 1)[0]
+    if len(yymm) != 4 or not 4 <= len(number) <= 5 or not (yymm + number).isdigit():
+        return None
+    return int(yymm) * 100000 + int(number)
+
+
+def decode(value):
+    """240110241 -> '2401.10241'. Ids before 1501 have four-digit numbers."""
+    yymm, number = divmod(value, 100000)
+    return f'{yymm:04d}.{number:05d}' if yymm >= 1501 else f'{yymm:04d}.{number:04d}'
+
+
+class PaperIndex:
+    """Read-only view of an index file; a missing file is an empty index."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self._mmap = None
+        self._ids = ()
+        try:
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._ids = memoryview(self._mmap).cast(ITEM_FORMAT)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._mmap is not None:
+            self._ids.release()
+            self._mmap.close()
+            self._mmap = None
+            self._ids = ()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, paper_id):
+        value = encode(paper_id)
+        if value is None:
+            return False
+        position = bisect.bisect_left(self._ids, value)
+        return position < len(self._ids) and self._ids[position] == value
+
+    def contains_many(self, paper_ids):
+        """Return the subset of `paper_ids` present in the index.
+
+        Candidates are looked up in sorted order, so each binary search
+        starts where the previous one ended.
+        """
+        candidates = sorted((value, paper_id) for paper_id in paper_ids
+                            if (value := encode(paper_id)) is not None)
+        found = set()
+        position = 0
+        for value, paper_id in candidates:
+            position = bisect.bisect_left(self._ids, value, position)
+            if position == len(self._ids):
+                break
+            if self._ids[position] == value:
+                found.add(paper_id)
+        return found
+
+    def __iter__(self):
+        return (decode(value) for value in self._ids)
+
+
+def add(paper_ids, path=DEFAULT_INDEX_PATH):
+    """Merge `paper_ids` into the index at `path`; returns how many were new."""
+    new_values = sorted({value for value in map(encode, paper_ids) if value is not None})
+    if not new_values:
+        return 0
+
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    merged = array.array(ITEM_FORMAT)
+    with PaperIndex(path) as index:
+        previous = None
+        for value in heapq.merge(index._ids, new_values):
+            if value != previous:
+                merged.append(value)
+                previous = value
+        added = len(merged) - len(index)
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        merged.tofile(f)
+    os.replace(tmp_path, path)  # open PaperIndex views keep the old file
+    return added
+
+
+def build(file_paths, path=DEFAULT_INDEX_PATH):
+    """Add the ids in scrape logs/CSVs to the index; returns how many were new."""
+    return add((paper_id for file_path in file_paths
+                for paper_id, _, _, _ in paper_store.rows_from_file(file_path)), path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Manage the sorted paper-id index.')
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help='index path')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = commands.add_parser('build', help='add the ids in scrape logs/CSVs')
+    build_parser.add_argument('files', nargs='+')
+
+    check_parser = commands.add_parser('check', help='look up ids (from arguments or stdin)')
+    check_parser.add_argument('ids', nargs='*')
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        added = build(args.files, args.index)
+        with PaperIndex(args.index) as index:
+            print(f'Added {added} ids, {len(index)} in {args.index}')
+    else:
+        paper_ids = args.ids or sys.stdin.read().split()
+        with PaperIndex(args.index) as index:
+            started = time.perf_counter()
+            found = index.contains_many(paper_ids)
+            elapsed = time.perf_counter() - started
+        for paper_id in paper_ids:
+            print(f"{paper_id} {'known' if paper_id in found else 'new'}")
+        print(f'{len(found)}/{len(paper_ids)} known, looked up in {elapsed * 1000:.2f} ms', file=sys.stderr)
@@ -0,0 +1,312 @@
+"""Persistent SQLite store of every paper the scrapers have seen.
+
+One row per paper in `papers` (title, announce date, and the first run that
+saw it) plus one row per (paper, topic) in `paper_topics`, indexed on
+(topic, announce_date). The database runs in WAL mode so Pool workers can
+upsert concurrently while readers keep working.
+
+Scrapers call `record()` once per topic/term with a batch of
+`(paper_id, title, topic, announce_date)` rows, which is committed as one
+transaction. Batches from listing crawls also advance the per-topic
+high-watermark (the highest arXiv id recorded for the topic), which
+`arxiv_links_v3.py --delta` uses to stop paging once it reaches papers it
+already has. Existing history is loaded with `import_files()`, and
+`export_csv()` writes the v3 CSV layout for tools that still read files.
+
+    python paper_store.py import data/*.log data/*.csv
+    python paper_store.py export papers.csv [--run-id 28_01_2024_09_54] [--topic cs.LG]
+"""
+import argparse
+import csv
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+DEFAULT_DB_PATH = os.environ.get('PAPER_DB_PATH', 'data/papers.db')
+RUN_ID_FORMAT = "%d_%m_%Y_%H_%M"  # same as the execution_timestamp in file names
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS papers (
+    paper_id TEXT PRIMARY KEY,
+    title TEXT,
+    announce_date TEXT,
+    first_seen TEXT NOT NULL,
+    run_id TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS paper_topics (
+    paper_id TEXT NOT NULL,
+    topic TEXT NOT NULL,
+    announce_date TEXT,
+    first_seen TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    PRIMARY KEY (paper_id, topic)
+);
+CREATE INDEX IF NOT EXISTS paper_topics_topic_date ON paper_topics (topic, announce_date);
+CREATE TABLE IF NOT EXISTS watermarks (
+    topic TEXT PRIMARY KEY,
+    paper_id TEXT NOT NULL,
+    run_id TEXT NOT NULL
+);
+'''
+
+UPSERT_PAPER = '''
+INSERT INTO papers (paper_id, title, announce_date, first_seen, run_id)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (paper_id) DO UPDATE SET
+    title = COALESCE(excluded.title, papers.title),
+    announce_date = COALESCE(papers.announce_date, excluded.announce_date)
+'''
+
+UPSERT_WATERMARK = '''
+INSERT INTO watermarks (topic, paper_id, run_id) VALUES (?, ?, ?)
+ON CONFLICT (topic) DO UPDATE SET paper_id = excluded.paper_id, run_id = excluded.run_id
+'''
+
+UPSERT_TOPIC = '''
+INSERT INTO paper_topics (paper_id, topic, announce_date, first_seen, run_id)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (paper_id, topic) DO UPDATE SET
+    announce_date = COALESCE(paper_topics.announce_date, excluded.announce_date)
+'''
+
+_DATE_FORMATS = (
+    '%a, %d %b %Y',   # listing pages: "Mon, 15 Dec 2025"
+    '%d %B, %Y',      # search results: "15 December, 2024"
+    '%d %B %Y',
+    '%Y-%m-%d',
+)
+_PLACEHOLDERS = {"[Title not found]", "[Date not found]", ""}
+
+
+def connect(path=DEFAULT_DB_PATH):
+    """Open the store, creating the schema on first use."""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=60)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def normalize_date(text):
+    """Convert a scraped date string to ISO `YYYY-MM-DD`, or None."""
+    if not text or text in _PLACEHOLDERS:
+        return None
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), date_format).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def listing_date(iso_date):
+    """Format a stored ISO date the way listing pages show it: 'Mon, 15 Dec 2025'."""
+    if not iso_date:
+        return "[Date not found]"
+    return datetime.strptime(iso_date, '%Y-%m-%d').strftime('%a, %d %b %Y')
+
+
+def paper_id_from_url(url):
+    """'https://arxiv.org/pdf/2512.01234.pdf' -> '2512.01234'"""
+    match = re.search(r'/(?:pdf|abs)/([^/]+?)(?:v\d+)?(?:\.pdf)?$', url)
+    return match.group(1) if match else None
+
+
+def paper_id_key(paper_id):
+    """Sort key for arXiv ids: `yymm.nnnnn` ids are assigned in increasing order.
+
+    Old-style ids (`math/0601001`) sort before every new-style id.
+    """
+    match = re.match(r'(\d{4})\.(\d{4,5})', paper_id or '')
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+
+def run_first_seen(run_id):
+    """ISO timestamp of the run encoded in `run_id`."""
+    return datetime.strptime(run_id, RUN_ID_FORMAT).isoformat(timespec='minutes')
+
+
+def upsert(conn, rows, run_id, advance_watermarks=True):
+    """Upsert `(paper_id, title, topic, announce_date)` rows in one transaction.
+
+    `first_seen`/`run_id` keep the first run that saw a paper; titles and
+    dates only fill in values that are still missing. Pass
+    `advance_watermarks=False` for rows that are not a complete listing of
+    their topics' newest papers, such as search results.
+    """
+    first_seen = run_first_seen(run_id)
+    papers, topics, highest = [], [], {}
+    for paper_id, title, topic, announce_date in rows:
+        title = None if title in _PLACEHOLDERS else title
+        announce_date = normalize_date(announce_date)
+        papers.append((paper_id, title, announce_date, first_seen, run_id))
+        topics.append((paper_id, topic, announce_date, first_seen, run_id))
+        if advance_watermarks and paper_id_key(paper_id) > paper_id_key(highest.get(topic)):
+            highest[topic] = paper_id
+
+    with conn:
+        conn.executemany(UPSERT_PAPER, papers)
+        conn.executemany(UPSERT_TOPIC, topics)
+        current = _watermarks(conn, highest)
+        conn.executemany(UPSERT_WATERMARK, [
+            (topic, paper_id, run_id) for topic, paper_id in highest.items()
+            if paper_id_key(paper_id) > paper_id_key(current.get(topic))
+        ])
+    return len(papers)
+
+
+def record(rows, run_id, path=DEFAULT_DB_PATH, advance_watermarks=True):
+    """Open the store, upsert one batch of rows and close it again.
+
+    Meant for Pool workers, which each record their own topic.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    conn = connect(path)
+    try:
+        return upsert(conn, rows, run_id, advance_watermarks)
+    finally:
+        conn.close()
+
+
+def _watermarks(conn, topics=None):
+    if topics is None:
+        return dict(conn.execute('SELECT topic, paper_id FROM watermarks'))
+    topics = list(topics)
+    placeholders = ','.join('?' * len(topics))
+    return dict(conn.execute(f'SELECT topic, paper_id FROM watermarks WHERE topic IN ({placeholders})', topics))
+
+
+def watermarks(path=DEFAULT_DB_PATH):
+    """Return {topic: highest paper id recorded for it}."""
+    conn = connect(path)
+    try:
+        return _watermarks(conn)
+    finally:
+        conn.close()
+
+
+def known_papers(topic, paper_ids, path=DEFAULT_DB_PATH):
+    """Return the subset of `paper_ids` already recorded under `topic`."""
+    paper_ids = list(paper_ids)
+    if not paper_ids:
+        return set()
+    conn = connect(path)
+    try:
+        conn.execute('CREATE TEMP TABLE candidates (paper_id TEXT PRIMARY KEY)')
+        conn.executemany('INSERT OR IGNORE INTO candidates VALUES (?)', ((paper_id,) for paper_id in paper_ids))
+        return {paper_id for paper_id, in conn.execute(
+            'SELECT paper_id FROM candidates JOIN paper_topics USING (paper_id) WHERE topic = ?', (topic,))}
+    finally:
+        conn.close()
+
+
+def rows_from_file(file_path, with_search_term=False):
+    """Yield `(paper_id, title, topic, announce_date)` rows from a scrape log or CSV.
+
+    Understands the v2 `topic id` logs, the cloud function's
+    `topic | id | title` logs and the v3/search CSVs. With
+    `with_search_term`, each row also ends with the search CSVs'
+    `Search Term` (None for other files).
+    """
+    def row(*values, search_term=None):
+        return values + (search_term,) if with_search_term else values
+
+    with open(file_path, newline='', encoding='utf-8') as f:
+        if file_path.endswith('.csv'):
+            for csv_row in csv.DictReader(f):
+                paper_id = paper_id_from_url(csv_row.get('Paper PDF URL', ''))
+                if paper_id:
+                    yield row(paper_id, csv_row.get('Title'), csv_row.get('Topic'), csv_row.get('Published Date'),
+                              search_term=csv_row.get('Search Term'))
+            return
+
+        for line in f:
+            if ' | ' in line:
+                parts = [part.strip() for part in line.split(' | ', 2)]
+                if len(parts) == 3 and parts[0] != 'Topic':
+                    yield row(parts[1], parts[2], parts[0], None)
+            else:
+                parts = line.split()
+                if len(parts) == 2:
+                    yield row(parts[1], None, parts[0], None)
+
+
+def import_files(conn, file_paths, batch_size=10000):
+    """Import historical scrape files, using the timestamp in each file name as its run id."""
+    imported = 0
+    for file_path in sorted(file_paths):
+        match = re.search(r'(\d{2}_\d{2}_\d{4}_\d{2}_\d{2})', os.path.basename(file_path))
+        if not match:
+            print(f"Skipping {file_path}: no run timestamp in file name")
+            continue
+        # Search results are not complete topic listings
+        is_listing = not os.path.basename(file_path).startswith('arxiv_search_')
+
+        batch = []
+        for row in rows_from_file(file_path):
+            batch.append(row)
+            if len(batch) >= batch_size:
+                imported += upsert(conn, batch, match.group(1), is_listing)
+                batch = []
+        imported += upsert(conn, batch, match.group(1), is_listing)
+    return imported
+
+
+def export_csv(conn, csv_file_path, run_id=None, topic=None):
+    """Write papers in the v3 CSV layout, optionally limited to one run or topic."""
+    query = '''
+        SELECT COALESCE(p.title, '[Title not found]'), t.paper_id, t.topic, t.announce_date
+        FROM paper_topics t JOIN papers p USING (paper_id)
+    '''
+    conditions, params = [], []
+    if run_id:
+        conditions.append('t.run_id = ?')
+        params.append(run_id)
+    if topic:
+        conditions.append('t.topic = ?')
+        params.append(topic)
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    query += ' ORDER BY t.topic, t.announce_date, t.paper_id'
+
+    count = 0
+    with open(csv_file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Title', 'Status', 'Paper PDF URL', 'Topic', 'Published Date'])
+        for title, paper_id, paper_topic, announce_date in conn.execute(query, params):
+            writer.writerow([title, '', f"https://arxiv.org/pdf/{paper_id}.pdf", paper_topic,
+                             listing_date(announce_date)])
+            count += 1
+    return count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Manage the SQLite paper store.')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='database path')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help='import scrape logs/CSVs')
+    import_parser.add_argument('files', nargs='+')
+
+    export_parser = commands.add_parser('export', help='export papers as CSV')
+    export_parser.add_argument('csv_file')
+    export_parser.add_argument('--run-id')
+    export_parser.add_argument('--topic')
+
+    args = parser.parse_args()
+    conn = connect(args.db)
+    try:
+        if args.command == 'import':
+            start_time = datetime.now()
+            count = import_files(conn, args.files)
+            print(f'Imported {count} rows from {len(args.files)} files in {datetime.now() - start_time}')
+        else:
+            count = export_csv(conn, args.csv_file, args.run_id, args.topic)
+            print(f'Exported {count} rows to {args.csv_file}')
+    finally:
+        conn.close()
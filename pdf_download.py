@@ -0,0 +1,96 @@
+"""Streaming, resumable PDF downloads.
+
+A PDF is streamed in `CHUNK_SIZE` pieces to `<filename>.part`, so memory per
+download stays constant whatever the file size. If a run is killed, the next
+attempt resumes the `.part` file with an HTTP Range request. The file is only
+renamed into place once its size matches the server's Content-Length and it
+starts with a PDF header and ends with a `%%EOF` trailer, so a file at the
+final path is always complete.
+"""
+import os
+import re
+
+import http_client
+
+CHUNK_SIZE = 64 * 1024
+PART_SUFFIX = '.part'
+
+PDF_HEADER = b'%PDF-'
+PDF_TRAILER = b'%%EOF'
+TRAILER_WINDOW = 1024  # %%EOF may be followed by a few bytes of whitespace
+
+
+class DownloadError(Exception):
+    """The downloaded file failed the length or PDF structure checks."""
+
+
+def is_complete_pdf(path):
+    """True if `path` exists, starts with `%PDF-` and has `%%EOF` near its end."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(PDF_HEADER)) != PDF_HEADER:
+                return False
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - TRAILER_WINDOW))
+            return PDF_TRAILER in f.read()
+    except OSError:
+        return False
+
+
+def _expected_size(response, offset):
+    """Full file size announced by the server, or None if it did not say."""
+    if response.status_code == 206:
+        match = re.search(r'/(\d+)$', response.headers.get('Content-Range', ''))
+        return int(match.group(1)) if match else None
+    length = response.headers.get('Content-Length')
+    return int(length) if length is not None else None
+
+
+def download_pdf(url, filename, chunk_size=CHUNK_SIZE):
+    """Download `url` to `filename`, resuming a previous partial download.
+
+    Returns the number of bytes fetched, 0 if `filename` was already a
+    complete PDF. Raises `DownloadError` if the result fails verification;
+    a short `.part` file is kept so the next call can resume it.
+    """
+    if is_complete_pdf(filename):
+        return 0
+
+    part_path = filename + PART_SUFFIX
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+    # identity encoding keeps Content-Length equal to the bytes written
+    headers = {'Accept-Encoding': 'identity'}
+    if offset:
+        headers['Range'] = f'bytes={offset}-'
+
+    with http_client.get(url, headers=headers, stream=True) as response:
+        if response.status_code == 416:
+            # The .part file is not a prefix of the current remote file
+            os.remove(part_path)
+            return download_pdf(url, filename, chunk_size)
+        response.raise_for_status()
+
+        if response.status_code != 206:
+            # Server ignored the Range header and is sending the whole file
+            offset = 0
+        expected_size = _expected_size(response, offset)
+
+        fetched = 0
+        with open(part_path, 'ab' if offset else 'wb') as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+                fetched += len(chunk)
+
+    size = os.path.getsize(part_path)
+    if expected_size is not None and size != expected_size:
+        if size > expected_size:
+            os.remove(part_path)
+        raise DownloadError(f'{url}: got {size} of {expected_size} bytes')
+
+    if not is_complete_pdf(part_path):
+        os.remove(part_path)
+        raise DownloadError(f'{url}: response is not a complete PDF')
+
+    os.replace(part_path, filename)
+    return fetched
@@ -0,0 +1,119 @@
+"""Per-host token bucket shared by every process and thread on the machine.
+
+Each host's bucket is a 16-byte state file under `RATE_LIMIT_DIR`, updated
+under an exclusive `flock`. Pool workers, threads and asyncio tasks therefore
+all draw from one budget per host without passing locks around, and the
+scrapers can run at the polite rate instead of sleeping blindly between calls.
+
+`http_client` calls `acquire()` before every request, so nothing else in the
+repo needs to sleep for throttling.
+"""
+import asyncio
+import fcntl
+import os
+import struct
+import tempfile
+import time
+from urllib.parse import urlparse
+
+DEFAULT_RATE = 4.0   # requests per second
+DEFAULT_BURST = 4    # requests allowed back to back after an idle period
+
+# arXiv asks automated clients for no more than one request every 3 seconds.
+# Raise it explicitly with ARXIV_RATE_LIMIT (requests per second) and ARXIV_RATE_BURST.
+ARXIV_RATE = float(os.environ.get('ARXIV_RATE_LIMIT', 1 / 3))
+ARXIV_BURST = int(os.environ.get('ARXIV_RATE_BURST', '1'))
+
+# (rate, burst) for the hosts the scrapers talk to
+HOST_LIMITS = {
+    'arxiv.org': (ARXIV_RATE, ARXIV_BURST),
+    'export.arxiv.org': (ARXIV_RATE, ARXIV_BURST),
+    'hn.algolia.com': (3.0, 3),
+}
+
+RATE_LIMIT_DIR = os.environ.get('SCRAPER_RATE_LIMIT_DIR', tempfile.gettempdir())
+
+_STATE = struct.Struct('dd')  # tokens left, time.time() of last update
+
+
+def configure(host, rate, burst):
+    """Set the rate and burst for `host`; call before starting worker processes."""
+    HOST_LIMITS[host] = (rate, burst)
+
+
+def host_of(url):
+    return urlparse(url).hostname or ''
+
+
+def _state_path(host):
+    return os.path.join(RATE_LIMIT_DIR, f'scrape-sk-ratelimit-{host}')
+
+
+def _update_bucket(host, update):
+    """Refill `host`'s bucket and apply `update(tokens) -> (tokens, result)`
+    while holding the state file lock; returns `result`."""
+    rate, burst = HOST_LIMITS.get(host, (DEFAULT_RATE, DEFAULT_BURST))
+
+    fd = os.open(_state_path(host), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        now = time.time()
+        data = os.pread(fd, _STATE.size, 0)
+        if len(data) == _STATE.size:
+            tokens, updated = _STATE.unpack(data)
+            tokens = min(float(burst), tokens + max(0.0, now - updated) * rate)
+        else:
+            tokens = float(burst)
+
+        tokens, result = update(tokens)
+        os.pwrite(fd, _STATE.pack(tokens, now), 0)
+        return result
+    finally:
+        # Closing the descriptor releases the flock
+        os.close(fd)
+
+
+def try_acquire(host):
+    """Take one token for `host` if one is available.
+
+    Returns 0.0 when a token was taken, otherwise the number of seconds until
+    the next token is due.
+    """
+    rate, _ = HOST_LIMITS.get(host, (DEFAULT_RATE, DEFAULT_BURST))
+
+    def take(tokens):
+        if tokens >= 1:
+            return tokens - 1, 0.0
+        return tokens, (1 - tokens) / rate
+
+    return _update_bucket(host, take)
+
+
+def acquire(host):
+    """Block until a token for `host` is available and take it."""
+    while True:
+        wait = try_acquire(host)
+        if not wait:
+            return
+        time.sleep(wait)
+
+
+async def acquire_async(host):
+    """Like `acquire`, but waits with `asyncio.sleep` so the event loop keeps running."""
+    while True:
+        wait = try_acquire(host)
+        if not wait:
+            return
+        await asyncio.sleep(wait)
+
+
+def pause(host, seconds):
+    """Stop handing out tokens for `host` for at least `seconds`, in every process.
+
+    Used by the retry layer to honour Retry-After and to back off from a host
+    that keeps answering 429/503.
+    """
+    rate, _ = HOST_LIMITS.get(host, (DEFAULT_RATE, DEFAULT_BURST))
+
+    # A balance below 1 makes try_acquire wait (1 - tokens) / rate seconds
+    _update_bucket(host, lambda tokens: (min(tokens, 1 - seconds * rate), None))
@@ -0,0 +1,131 @@
+"""Single writer process for crawl output.
+
+Pool workers used to take a `Manager().Lock()`, bump a proxied counter and
+reopen the output file for every topic. Instead, workers hand their rows to a
+`ResultWriter` through a queue and carry on: `Queue.put` returns as soon as
+the rows are buffered, so no worker waits on another process. The writer
+keeps the output file open, writes rows in batches, flushes at least every
+`flush_interval` seconds and counts rows per key (topic or search term).
+With a `checkpoint_dir`, each flush is fsynced and recorded in the run's
+checkpoint together with the keys whose rows are now safely on disk.
+
+    with ResultWriter(csv_file_path, 'csv') as writer:
+        with Pool(initializer=result_writer.init_worker, initargs=(writer.queue,)) as pool:
+            pool.map(crawl_topic, topic_codes)   # workers call result_writer.submit(...)
+    print(writer.counts)
+"""
+import csv
+import multiprocessing
+import os
+import queue
+import time
+
+from checkpoint import RunCheckpoint
+
+FLUSH_INTERVAL = 1.0  # seconds between flushes while rows keep arriving
+BATCH_SIZE = 5000     # rows buffered before a write regardless of the interval
+
+_worker_queue = None
+
+
+def init_worker(writer_queue):
+    """Pool initializer: remember the writer's queue for `submit()`."""
+    global _worker_queue
+    _worker_queue = writer_queue
+
+
+def submit(key, rows):
+    """Send `rows` for `key` to the writer from a Pool worker."""
+    _worker_queue.put((key, list(rows)))
+
+
+def _write(f, writer, rows):
+    if writer:
+        writer.writerows(rows)
+    else:
+        f.writelines(rows)
+
+
+def _run(writer_queue, result_conn, path, fmt, flush_interval, batch_size, checkpoint_dir):
+    counts = {}
+    pending = []
+    pending_keys = set()
+    checkpoint = RunCheckpoint(checkpoint_dir) if checkpoint_dir else None
+    done = set(checkpoint.state()['done']) if checkpoint else set()
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f) if fmt == 'csv' else None
+        next_flush = time.monotonic() + flush_interval
+        if checkpoint:
+            checkpoint.save_state(os.fstat(f.fileno()).st_size, done)
+
+        while True:
+            try:
+                item = writer_queue.get(timeout=max(0.0, next_flush - time.monotonic()))
+            except queue.Empty:
+                item = ()
+
+            if item:
+                key, rows = item
+                counts[key] = counts.get(key, 0) + len(rows)
+                pending.extend(rows)
+                pending_keys.add(key)
+
+            if item is None or len(pending) >= batch_size or time.monotonic() >= next_flush:
+                _write(f, writer, pending)
+                f.flush()
+                if checkpoint and pending_keys:
+                    os.fsync(f.fileno())
+                    done |= pending_keys
+                    checkpoint.save_state(os.fstat(f.fileno()).st_size, done)
+                pending = []
+                pending_keys = set()
+                next_flush = time.monotonic() + flush_interval
+
+            if item is None:
+                break
+
+    result_conn.send(counts)
+    result_conn.close()
+
+
+class ResultWriter:
+    """Owns the output file of one crawl in a dedicated process.
+
+    `fmt` is 'csv' for lists of CSV fields or 'lines' for ready-made log
+    lines. `counts` holds rows written per key once the writer is closed.
+    Each key's rows must arrive in a single `put`/`submit` for the
+    checkpoint to mark the key done.
+    """
+
+    def __init__(self, path, fmt='csv', flush_interval=FLUSH_INTERVAL, batch_size=BATCH_SIZE,
+                 checkpoint_dir=None):
+        self.queue = multiprocessing.Queue()
+        self.counts = {}
+        self._result_conn, child_conn = multiprocessing.Pipe(duplex=False)
+        self._process = multiprocessing.Process(
+            target=_run, args=(self.queue, child_conn, path, fmt, flush_interval, batch_size, checkpoint_dir),
+            name='result-writer', daemon=True)
+
+    def __enter__(self):
+        self._process.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def put(self, key, rows):
+        """Send `rows` for `key` from the process that created the writer."""
+        self.queue.put((key, list(rows)))
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def close(self):
+        """Write everything still queued, stop the writer and collect its counts."""
+        if not self._process.is_alive():
+            return self.counts
+        self.queue.put(None)
+        self.counts = self._result_conn.recv()
+        self._process.join()
+        return self.counts
@@ -0,0 +1,146 @@
+"""Retries with exponential backoff, Retry-After support and a per-host circuit breaker.
+
+`http_client` runs every request through this module. A 429, a 5xx or a
+connection error is retried up to `MAX_ATTEMPTS` times, waiting a jittered
+exponential backoff or the server's Retry-After, whichever is longer.
+Retry-After also pauses the whole host via `rate_limit.pause`, so every
+process backs off, not just the one that got the response.
+
+After `BREAKER_THRESHOLD` consecutive 429/503 responses from one host, the
+circuit breaker pauses that host for `BREAKER_PAUSE` seconds instead of
+continuing to hammer it.
+
+Retries, dropped requests (out of attempts) and breaker trips are counted
+per run across all worker processes; `summary()` formats them for the end
+of a run.
+"""
+import fcntl
+import os
+import random
+import struct
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import rate_limit
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+THROTTLE_STATUSES = frozenset({429, 503})
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 1.0     # seconds; attempt n waits up to BACKOFF_BASE * 2**n
+BACKOFF_MAX = 60.0
+RETRY_AFTER_MAX = 300.0
+
+BREAKER_THRESHOLD = 3  # consecutive 429/503 responses that trip the breaker
+BREAKER_PAUSE = 60.0   # seconds the host is paused once tripped
+
+COUNTERS = ('retries', 'dropped', 'breaker_trips')
+_COUNTER_STATE = struct.Struct('qqq')
+
+_throttled = {}  # host -> consecutive 429/503 responses seen by this process
+_throttled_lock = threading.Lock()
+
+
+def start_run():
+    """Start a fresh set of run counters, shared with worker processes started after this call."""
+    os.environ['SCRAPER_RUN_ID'] = str(os.getpid())
+    try:
+        os.remove(_counter_path())
+    except FileNotFoundError:
+        pass
+
+
+def _counter_path():
+    run_id = os.environ.get('SCRAPER_RUN_ID', str(os.getpid()))
+    return os.path.join(rate_limit.RATE_LIMIT_DIR, f'scrape-sk-retries-{run_id}')
+
+
+def _increment(name):
+    fd = os.open(_counter_path(), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        data = os.pread(fd, _COUNTER_STATE.size, 0)
+        values = list(_COUNTER_STATE.unpack(data)) if len(data) == _COUNTER_STATE.size else [0] * len(COUNTERS)
+        values[COUNTERS.index(name)] += 1
+        os.pwrite(fd, _COUNTER_STATE.pack(*values), 0)
+    finally:
+        os.close(fd)
+
+
+def counters():
+    """Return this run's {'retries', 'dropped', 'breaker_trips'} counts."""
+    try:
+        with open(_counter_path(), 'rb') as f:
+            data = f.read(_COUNTER_STATE.size)
+    except FileNotFoundError:
+        data = b''
+    values = _COUNTER_STATE.unpack(data) if len(data) == _COUNTER_STATE.size else [0] * len(COUNTERS)
+    return dict(zip(COUNTERS, values))
+
+
+def summary():
+    counts = counters()
+    return (f"Retries: {counts['retries']}, dropped requests: {counts['dropped']}, "
+            f"circuit breaker trips: {counts['breaker_trips']}")
+
+
+def retry_after_seconds(value):
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), RETRY_AFTER_MAX)
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Seconds to wait before attempt `attempt + 1`: full-jitter exponential backoff,
+    but never less than the server's Retry-After."""
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    return max(delay, retry_after or 0.0)
+
+
+def is_retryable(status):
+    return status in RETRY_STATUSES
+
+
+def record_success(host):
+    """Reset the breaker count for `host` after a non-throttled response."""
+    with _throttled_lock:
+        _throttled.pop(host, None)
+
+
+def plan_retry(host, attempt, status=None, retry_after=None):
+    """Decide what to do after failed attempt number `attempt` (0-based).
+
+    `status` is the HTTP status, or None for a connection error or timeout.
+    Returns the seconds to wait before retrying, or None when the request is
+    out of attempts and should be given up (counted as dropped).
+    """
+    retry_after = retry_after_seconds(retry_after)
+    if retry_after:
+        rate_limit.pause(host, retry_after)
+
+    if status in THROTTLE_STATUSES:
+        with _throttled_lock:
+            _throttled[host] = _throttled.get(host, 0) + 1
+            tripped = _throttled[host] >= BREAKER_THRESHOLD
+            if tripped:
+                _throttled[host] = 0
+        if tripped:
+            print(f"{host} keeps answering {status}, pausing it for {BREAKER_PAUSE:.0f}s")
+            rate_limit.pause(host, BREAKER_PAUSE)
+            _increment('breaker_trips')
+
+    if attempt + 1 >= MAX_ATTEMPTS:
+        _increment('dropped')
+        return None
+
+    _increment('retries')
+    return backoff_delay(attempt, retry_after)
@@ -54,13 +54,17 @@ resource "google_storage_bucket" "arxiv_papers" {
   uniform_bucket_level_access = true
 }
 
+locals {
+  function_timeout = 540
+}
+
 # Create Cloud Function
 resource "google_cloudfunctions_function" "arxiv_scraper" {
   name                  = var.function_name
   description           = "Function to scrape ArXiv papers weekly"
   runtime               = "python39"
   available_memory_mb   = 512
-  timeout               = 540
+  timeout               = local.function_timeout
   entry_point          = "arxiv_scraper"
   
   source_archive_bucket = google_storage_bucket.function_bucket.name
@@ -69,7 +73,14 @@ resource "google_cloudfunctions_function" "arxiv_scraper" {
   trigger_http = true
 
   environment_variables = {
-    BUCKET_NAME = google_storage_bucket.arxiv_papers.name
+    BUCKET_NAME      = google_storage_bucket.arxiv_papers.name
+    SHARD_COUNT      = var.shard_count
+    # Runs stop before this and answer 503 so the scheduler retries and resumes them
+    FUNCTION_TIMEOUT = local.function_timeout
+    # Checkpoints older than this are from an earlier week's unfinished run and are discarded
+    CHECKPOINT_MAX_AGE = 6 * 86400
+    # The coordinator invokes its own URL once per shard
+    FUNCTION_URL = "https://${var.region}-${var.project_id}.cloudfunctions.net/${var.function_name}"
   }
 }
 
@@ -79,6 +90,15 @@ resource "google_cloud_scheduler_job" "arxiv_scheduler" {
   description = "Runs every Saturday at 23:00 UTC to collect weekly arXiv papers"
   schedule    = "0 23 * * 6"
   time_zone   = "UTC"
+  attempt_deadline = "${local.function_timeout + 60}s"
+
+  # A run that nears the function timeout answers 503 and resumes from its
+  # checkpoint on the next attempt
+  retry_config {
+    retry_count          = 5
+    min_backoff_duration = "30s"
+    max_backoff_duration = "120s"
+  }
 
   http_target {
     http_method = "GET"
@@ -104,3 +124,12 @@ resource "google_cloudfunctions_function_iam_member" "invoker" {
   role          = "roles/cloudfunctions.invoker"
   member        = "serviceAccount:${google_service_account.scheduler_invoker.email}"
 }
+
+# Let the function invoke itself for its shards (runs as the default App Engine service account)
+resource "google_cloudfunctions_function_iam_member" "shard_invoker" {
+  project        = google_cloudfunctions_function.arxiv_scraper.project
+  region         = google_cloudfunctions_function.arxiv_scraper.region
+  cloud_function = google_cloudfunctions_function.arxiv_scraper.name
+  role          = "roles/cloudfunctions.invoker"
+  member        = "serviceAccount:${var.project_id}@appspot.gserviceaccount.com"
+}
@@ -33,3 +33,9 @@ variable "service_account_id" {
   type        = string
   default     = "arxiv-papers-scheduler-sa"
 }
+
+variable "shard_count" {
+  description = "Number of parallel shards the scheduled run fans out to (1 runs every topic in one invocation)"
+  type        = number
+  default     = 4
+}
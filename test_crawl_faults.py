@@ -0,0 +1,75 @@
+"""Listing crawls against the fault-injecting mock arXiv server.
+
+    python -m pytest -q test_crawl_faults.py
+
+Both engines must recover every paper when a share of requests is answered
+429/503, and a page that keeps failing must be counted as dropped without
+losing the rest of its topic.
+"""
+import collections
+import csv
+import os
+import tempfile
+
+import pytest
+
+# Keep synthetic papers out of the real paper store; set before the imports read it
+os.environ['PAPER_DB_PATH'] = os.path.join(tempfile.mkdtemp(), 'papers.db')
+
+import arxiv_links_v3
+import mock_arxiv
+import rate_limit
+import retry
+
+TOPICS = ['cs.AI', 'cs.CL', 'cs.LG']
+ENTRIES = 2500  # three listing pages per topic
+
+
+@pytest.fixture
+def server(monkeypatch):
+    rate_limit.configure('127.0.0.1', 1000.0, 1000)
+    # Keep injected faults from stretching the run: short backoff and breaker pause
+    monkeypatch.setattr(retry, 'BACKOFF_BASE', 0.01)
+    monkeypatch.setattr(retry, 'BREAKER_PAUSE', 0.1)
+    server = mock_arxiv.start_server(latency=0, entries_per_topic=ENTRIES, retry_after=0)
+    monkeypatch.setattr(arxiv_links_v3, 'LISTING_BASE_URL', f'http://127.0.0.1:{server.server_port}')
+    monkeypatch.setattr(arxiv_links_v3, 'topic_codes', TOPICS)
+    yield server
+    server.shutdown()
+
+
+def crawl(engine, csv_file_path):
+    """Run one crawl and return the CSV row count per topic and the retry counters."""
+    retry.start_run()
+    if engine == 'async':
+        arxiv_links_v3.run_async(str(csv_file_path))
+    else:
+        arxiv_links_v3.run_pool(str(csv_file_path))
+    with open(csv_file_path, newline='', encoding='utf-8') as f:
+        counts = collections.Counter(row[3] for row in csv.reader(f))
+    return counts, retry.counters()
+
+
+@pytest.mark.parametrize('engine', ['pool', 'async'])
+def test_faults_are_retried(server, engine, monkeypatch, tmp_path):
+    server.fault_rate = 0.3
+    # Enough attempts that no request runs out of them
+    monkeypatch.setattr(retry, 'MAX_ATTEMPTS', 20)
+
+    counts, counters = crawl(engine, tmp_path / 'papers.csv')
+
+    assert counts == dict.fromkeys(TOPICS, ENTRIES)
+    assert counters['retries'] > 0
+    assert counters['dropped'] == 0
+
+
+@pytest.mark.parametrize('engine', ['pool', 'async'])
+def test_dropped_page_keeps_rest_of_topic(server, engine, tmp_path):
+    skip, show = arxiv_links_v3.PAGE_SIZE, arxiv_links_v3.PAGE_SIZE
+    server.failing_paths.add(f'/list/cs.AI/recent?skip={skip}&show={show}')
+
+    counts, counters = crawl(engine, tmp_path / 'papers.csv')
+
+    assert counts == {'cs.AI': ENTRIES - show, 'cs.CL': ENTRIES, 'cs.LG': ENTRIES}
+    assert counters['dropped'] == 1
+    assert counters['retries'] == retry.MAX_ATTEMPTS - 1
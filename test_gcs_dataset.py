@@ -0,0 +1,62 @@
+"""Version resolution and downloads against a `LocalBucket` directory.
+
+    python -m pytest -q test_gcs_dataset.py
+
+The latest version of each paper must win, a second run must find every PDF
+already in place, and papers missing from the dataset must be counted once
+per job, even when a paper is logged under several topics.
+"""
+import os
+
+import pytest
+
+import gcs_dataset
+
+
+def write_pdf(path, body):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.5\n' + body + b'\n%%EOF\n')
+
+
+@pytest.fixture
+def bucket(tmp_path):
+    root = tmp_path / 'bucket'
+    month = root / gcs_dataset.PDF_PREFIX / '2401'
+    write_pdf(str(month / '2401.00001v1.pdf'), b'v1')
+    write_pdf(str(month / '2401.00001v2.pdf'), b'v2')
+    write_pdf(str(month / '2401.00002v1.pdf'), b'v1')
+    return gcs_dataset.LocalBucket(str(root))
+
+
+def test_latest_version_wins(bucket):
+    resolver = gcs_dataset.VersionResolver(bucket)
+
+    assert resolver.resolve('2401.00001') == f'{gcs_dataset.PDF_PREFIX}/2401/2401.00001v2.pdf'
+    assert resolver.resolve('2401.00003') is None
+    assert resolver.resolve('2402.00001') is None
+
+
+def test_second_run_downloads_nothing(bucket, tmp_path):
+    jobs = [('cs.AI', '2401.00001'), ('cs.CL', '2401.00002')]
+    download_dir = tmp_path / 'papers'
+
+    first = gcs_dataset.download_papers(gcs_dataset.VersionResolver(bucket), jobs, str(download_dir))
+    second = gcs_dataset.download_papers(gcs_dataset.VersionResolver(bucket), jobs, str(download_dir))
+
+    assert first == (2, 0, 0)
+    assert second == (0, 0, 0)
+    assert b'v2' in (download_dir / 'cs.AI' / '2401.00001.pdf').read_bytes()
+
+
+def test_missing_and_duplicate_ids_are_counted_per_job(bucket, tmp_path):
+    jobs = [
+        ('cs.AI', '2401.00001'),
+        ('cs.LG', '2401.00001'),  # one paper logged under two topics
+        ('cs.AI', '2401.00003'),
+        ('cs.LG', '2401.00003'),  # missing under both
+    ]
+
+    counts = gcs_dataset.download_papers(gcs_dataset.VersionResolver(bucket), jobs, str(tmp_path / 'papers'))
+
+    assert counts == (2, 2, 0)
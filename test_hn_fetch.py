@@ -0,0 +1,90 @@
+"""Time-sliced and incremental Hacker News fetches against the mock Algolia server.
+
+    python -m pytest -q test_hn_fetch.py
+
+A sliced fetch must return every story in its window exactly once, an
+incremental run only the stories published after the saved cursor, and a
+slice that keeps failing must raise before the cursor can move past it.
+"""
+import importlib
+import time
+
+import pytest
+import requests
+
+import hn_fetch
+import mock_algolia
+import rate_limit
+import retry
+
+STORIES = 3000
+DAYS = 7
+INTERVAL = DAYS * 86400 // STORIES  # spread the stories over the window
+NEW = 100
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    rate_limit.configure('127.0.0.1', 1000.0, 1000)
+    # Keep the failing-slice case from waiting out real backoffs
+    monkeypatch.setattr(retry, 'BACKOFF_BASE', 0.01)
+    monkeypatch.setattr(retry, 'BREAKER_PAUSE', 0.1)
+    # Leave room before now for the stories published ahead of the incremental run
+    server = mock_algolia.start_server(
+        mock_algolia.make_stories(STORIES, int(time.time()) - 2 * NEW * INTERVAL - 1, INTERVAL), latency=0)
+    server.window = (server.stories[-1]['created_at_i'], server.stories[0]['created_at_i'])
+    monkeypatch.setenv('HN_ALGOLIA_BASE_URL', f'http://127.0.0.1:{server.server_port}')
+    monkeypatch.setenv('HN_CURSOR_PATH', str(tmp_path / 'cursors.json'))
+    # Module constants are read from the environment at import
+    importlib.reload(hn_fetch)
+    yield server
+    server.shutdown()
+    monkeypatch.undo()
+    importlib.reload(hn_fetch)
+
+
+def test_sliced_fetch_returns_every_story_once(server):
+    since, until = server.window
+    hits = hn_fetch.fetch_stories({'tags': 'story'}, since, until, slices=8)
+
+    ids = [hit['objectID'] for hit in hits]
+    assert len(ids) == len(set(ids))
+    assert set(ids) == {story['objectID'] for story in server.stories}
+
+
+def test_incremental_run_returns_only_new_stories(server):
+    since, until = server.window
+    cursor = hn_fetch.next_cursor(hn_fetch.fetch_stories({'tags': 'story'}, since, until))
+    mock_algolia.add_stories(server, NEW, interval=INTERVAL)
+
+    hits = hn_fetch.fetch_new_stories({'tags': 'story'}, cursor)
+
+    assert {hit['objectID'] for hit in hits} == {story['objectID'] for story in server.stories[:NEW]}
+
+
+def test_cursor_round_trip(server):
+    since, until = server.window
+    cursor = hn_fetch.next_cursor(hn_fetch.fetch_stories({'tags': 'story'}, since, until))
+
+    hn_fetch.save_cursor('stories', cursor)
+    hn_fetch.save_cursor('other', {'created_at_i': 1, 'object_ids': ['1']})
+
+    assert hn_fetch.load_cursor('stories') == cursor
+    assert hn_fetch.load_cursor('missing') is None
+    assert cursor['created_at_i'] == until
+
+
+def test_failing_slice_raises_and_keeps_cursor(server):
+    since, until = server.window
+    cursor = hn_fetch.next_cursor(hn_fetch.fetch_stories({'tags': 'story'}, since, until))
+    hn_fetch.save_cursor('stories', cursor)
+    mock_algolia.add_stories(server, NEW, interval=INTERVAL)
+    # Every request of the oldest slice after the cursor fails
+    oldest_since, _ = hn_fetch.time_slices(cursor['created_at_i'], int(time.time()))[-1]
+    server.failing_filters.add(f'created_at_i>={oldest_since}')
+
+    with pytest.raises(requests.HTTPError):
+        hits = hn_fetch.fetch_new_stories({'tags': 'story'}, hn_fetch.load_cursor('stories'))
+        hn_fetch.save_cursor('stories', hn_fetch.next_cursor(hits, cursor))
+
+    assert hn_fetch.load_cursor('stories') == cursor
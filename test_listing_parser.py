@@ -0,0 +1,60 @@
+"""Listing parser backends on the listing pages kept under `fixtures/`.
+
+    python -m pytest -q test_listing_parser.py
+
+Every backend, and the incremental parser fed small chunks, must produce the
+same entries. `cs.AI__0.html` spans three announcement dates; on
+`cs.LG__0.html` one paper has no `list-title` div.
+"""
+import glob
+import os
+
+import pytest
+
+import listing_parser
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+PAGES = sorted(glob.glob(os.path.join(FIXTURES, '*.html')))
+
+
+def load(path):
+    """Return `(topic_code, html)` for a page recorded as `<topic>__<skip>.html`."""
+    with open(path, encoding='utf-8') as f:
+        return os.path.basename(path).split('__')[0], f.read()
+
+
+def parse_stream(html, topic_code, chunk_size=256):
+    data = html.encode('utf-8')
+    chunks = (data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+    return list(listing_parser.parse_entries_stream(chunks, topic_code))
+
+
+@pytest.mark.parametrize('path', PAGES, ids=os.path.basename)
+def test_backends_agree(path):
+    topic_code, html = load(path)
+    reference = listing_parser.parse_entries_bs4(html, topic_code)
+
+    assert reference
+    for name, parse in listing_parser.PARSERS.items():
+        assert parse(html, topic_code) == reference, name
+    assert parse_stream(html, topic_code) == reference
+
+
+def test_dates_follow_their_headers():
+    topic_code, html = load(os.path.join(FIXTURES, 'cs.AI__0.html'))
+    entries = listing_parser.parse_entries(html, topic_code)
+
+    dates = [entry.date for entry in entries]
+    assert dates == ['Fri, 12 Dec 2025'] * 4 + ['Thu, 11 Dec 2025'] * 3 + ['Wed, 10 Dec 2025'] * 2
+    assert entries[2].title == 'A $\\mathcal{O}(n \\log n)$ Solver for Constraint Satisfaction with Soft Clauses'
+    assert entries[3].title == 'Tool Use & Self-Verification in Small Language Models'
+    assert listing_parser.parse_total(html) == 812
+
+
+def test_missing_title():
+    topic_code, html = load(os.path.join(FIXTURES, 'cs.LG__0.html'))
+    entries = listing_parser.parse_entries(html, topic_code)
+
+    missing = [entry for entry in entries if entry.title == listing_parser.TITLE_NOT_FOUND]
+    assert [entry.pdf_url for entry in missing] == ['https://arxiv.org/pdf/2512.10988.pdf']
+    assert len(entries) == 5